@@ -1,21 +1,42 @@
 """
 Agente Insights Package
 ======================
-Versão: 1.5.3
+Versão: 1.6.0
+
+As funções públicas vêm de analise_insights, carregado no primeiro acesso a
+qualquer uma delas: `import agenteinsights` não importa pandas, nem as
+dependências pesadas (ver dependencias.py).
 """
 
-from .analise_insights import (
-    chat_ia_loop,
-    executar_pipeline,
-    analisar_alocacao,
-    mapear_estrutura_org,
-    carregar_dados,
-    gerar_analise_consultiva,
-    formatar_analise_consultiva,
-    gerar_resposta_contextualizada,
-    identificar_entidade_consulta,
-    preparar_dados_consulta,
-    extrair_metricas_ageis
-)
-
-__version__ = '1.5.3'
\ No newline at end of file
+import importlib
+
+_EXPORTACOES = {
+    'chat_ia_loop': 'analise_insights',
+    'executar_pipeline': 'analise_insights',
+    'analisar_alocacao': 'analise_insights',
+    'mapear_estrutura_org': 'analise_insights',
+    'carregar_dados': 'analise_insights',
+    'gerar_analise_consultiva': 'analise_insights',
+    'formatar_analise_consultiva': 'analise_insights',
+    'gerar_resposta_contextualizada': 'analise_insights',
+    'identificar_entidade_consulta': 'analise_insights',
+    'identificar_entidades_consulta': 'analise_insights',
+    'preparar_dados_consulta': 'analise_insights',
+    'extrair_metricas_ageis': 'analise_insights'
+}
+
+__all__ = list(_EXPORTACOES)
+__version__ = '1.6.0'
+
+
+def __getattr__(nome):
+    modulo = _EXPORTACOES.get(nome)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+    valor = getattr(importlib.import_module(f'.{modulo}', __name__), nome)
+    globals()[nome] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
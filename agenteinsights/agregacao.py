@@ -0,0 +1,377 @@
+"""
+Agente Insights - Módulo de Agregação de Métricas
+================================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+- 1.1.0 (Release 8): montar_insight compartilhado com a junção pré-agregada
+- 1.2.0 (Release 8): agregar_dataframe, motor vetorizado de gerar_estrutura_e_insights
+- 1.3.0 (Release 8): p85 nas estatísticas; modo de esboços de quantis (ver quantis.py)
+- 1.4.0 (Release 8): agregar_dataframe por nível, para a agregação particionada
+- 1.5.0 (Release 8): coluna opcional de peso nos blocos (ver cruzar_dados_em_blocos)
+- 1.6.0 (Release 8): estatísticas por grupo pelo kernel de computacao.py
+
+Descrição:
+Agregação incremental das métricas de fluxo por tribo e squad. Permite que
+gerar_estrutura_e_insights consuma o cruzamento em blocos: em vez das linhas
+cruzadas, cada entidade guarda apenas pares (valor, ocorrências) por métrica
+e os conjuntos distintos de squads, pessoas e PBIs, de modo que a memória
+cresce com a quantidade de valores distintos e não com o histórico. Com
+erro_quantis, cada entidade guarda um esboço t-digest por métrica, e a
+memória das métricas passa a ser limitada por 1 / erro_quantis centroides.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .computacao import BackendCalculo, BackendNumpy
+from .quantis import EsbocoQuantis
+
+# Métrica -> coluna do DataFrame cruzado
+COLUNAS_METRICAS = {
+    'lead_time': '[SumLead_Time]',
+    'cycle_time': '[SumCycle_Time]',
+    'story_points': '[SumStory_Points]'
+}
+COLUNA_PBI = 'PBI_Concuidos_Executivo[Key]'
+# Coluna opcional dos blocos: vezes que a linha ocorreria no cruzamento completo
+COLUNA_PESO = 'peso'
+# Percentis de agregar_dataframe (a mediana é o p50)
+PERCENTIS_GRUPO = (50, 75, 85, 95)
+
+# Nível -> (coluna da entidade, colunas relacionadas guardadas na estrutura)
+NIVEIS = {
+    'tribos': ('Tribo', ['squad', 'person']),
+    'squads': ('squad', ['Tribo', 'person'])
+}
+
+
+def percentis_ponderados(valores: np.ndarray, pesos: np.ndarray, percentis: Iterable[float]) -> List[float]:
+    """
+    Percentis (interpolação linear) de valores que ocorrem pesos[i] vezes,
+    equivalentes a np.percentile sobre o array expandido. Valores não vazios.
+    """
+    ordem = np.argsort(valores, kind='stable')
+    v = np.asarray(valores, dtype=float)[ordem]
+    acumulado = np.cumsum(np.asarray(pesos, dtype=np.int64)[ordem])
+    n = int(acumulado[-1])
+    resultado = []
+    for q in percentis:
+        posicao = q / 100 * (n - 1)
+        inferior = int(np.floor(posicao))
+        superior = min(inferior + 1, n - 1)
+        x_inf = v[np.searchsorted(acumulado, inferior, side='right')]
+        x_sup = v[np.searchsorted(acumulado, superior, side='right')]
+        resultado.append(float(x_inf + (x_sup - x_inf) * (posicao - inferior)))
+    return resultado
+
+
+def estatisticas_ponderadas(valores: np.ndarray, pesos: np.ndarray) -> Dict[str, float]:
+    """
+    Calcula média, mediana, p75, p85 e p95 de valores que ocorrem pesos[i] vezes.
+
+    O resultado equivale a np.mean/np.median/np.percentile (interpolação
+    linear) aplicados ao array expandido, sem materializá-lo.
+    """
+    if len(valores) == 0:
+        return {'medio': 0, 'mediana': 0, 'p75': 0, 'p85': 0, 'p95': 0}
+    ordem = np.argsort(valores, kind='stable')
+    v = np.asarray(valores, dtype=float)[ordem]
+    c = np.asarray(pesos, dtype=np.int64)[ordem]
+    mediana, p75, p85, p95 = percentis_ponderados(v, c, (50, 75, 85, 95))
+    return {
+        'medio': float(np.dot(v, c) / int(c.sum())),
+        'mediana': mediana,
+        'p75': p75,
+        'p85': p85,
+        'p95': p95
+    }
+
+
+def montar_insight(nivel: str, stats: Dict[str, Dict[str, float]], throughput: int,
+                   total_pessoas: int, total_relacionados: int) -> Dict[str, Any]:
+    """Monta o dicionário de insight de uma tribo ou squad a partir das estatísticas por métrica"""
+    insight = {
+        'lead_time_medio': stats['lead_time']['medio'],
+        'lead_time_mediana': stats['lead_time']['mediana'],
+        'lead_time_p75': stats['lead_time']['p75'],
+        'lead_time_p85': stats['lead_time']['p85'],
+        'lead_time_p95': stats['lead_time']['p95'],
+        'cycle_time_medio': stats['cycle_time']['medio'],
+        'cycle_time_mediana': stats['cycle_time']['mediana'],
+        'cycle_time_p75': stats['cycle_time']['p75'],
+        'cycle_time_p85': stats['cycle_time']['p85'],
+        'cycle_time_p95': stats['cycle_time']['p95'],
+        'story_points_medio': stats['story_points']['medio'],
+        'throughput': throughput,
+        'total_pessoas': total_pessoas
+    }
+    if nivel == 'tribos':
+        insight['total_squads'] = total_relacionados
+    else:
+        insight['total_tribos'] = total_relacionados
+    return insight
+
+
+class AcumuladorInsights:
+    """
+    Acumula blocos do DataFrame cruzado e produz o mesmo formato de saída de
+    gerar_estrutura_e_insights: (estrutura, insights_tribos, insights_squads).
+
+    Com erro_quantis, os valores das métricas de cada bloco são resumidos em
+    esboços por entidade (mesclados bloco a bloco) em vez de pares (valor,
+    ocorrências); os percentis passam a ser aproximados, com erro de posto
+    limitado por erro_quantis, e a média continua exata.
+
+    Blocos com a coluna COLUNA_PESO contam cada linha pelo seu peso, em vez
+    de uma vez (ver cruzar_dados_em_blocos).
+
+    Com metricas=False, apenas a estrutura (pessoas e vínculos) é acumulada;
+    as métricas e o throughput ficam a cargo de quem consome os mesmos blocos
+    (por exemplo, o cubo de métricas) e os insights saem zerados.
+    """
+
+    def __init__(self, limite_compactacao: int = 16, erro_quantis: Optional[float] = None,
+                 metricas: bool = True):
+        self.limite_compactacao = limite_compactacao
+        self.erro_quantis = erro_quantis
+        self.metricas = metricas
+        self._esbocos = {nivel: {m: {} for m in COLUNAS_METRICAS} for nivel in NIVEIS}
+        self._organizacao = {m: EsbocoQuantis(erro_quantis) for m in COLUNAS_METRICAS} if erro_quantis else {}
+        self._ordem = {nivel: {} for nivel in NIVEIS}
+        self._relacionados = {nivel: {col: [] for col in cols} for nivel, (_, cols) in NIVEIS.items()}
+        self._pbis = {nivel: [] for nivel in NIVEIS}
+        self._contagens = {nivel: {m: [] for m in COLUNAS_METRICAS} for nivel in NIVEIS}
+
+    def _compactar_pares(self, lista: List[pd.DataFrame]) -> None:
+        if len(lista) >= self.limite_compactacao:
+            unico = pd.concat(lista, ignore_index=True).drop_duplicates()
+            lista[:] = [unico]
+
+    def _compactar_contagens(self, lista: List[pd.Series]) -> None:
+        if len(lista) >= self.limite_compactacao:
+            unico = pd.concat(lista).groupby(level=[0, 1], sort=False).sum()
+            lista[:] = [unico]
+
+    def adicionar(self, df: pd.DataFrame) -> None:
+        """Incorpora um bloco do DataFrame cruzado"""
+        for nivel, (col_entidade, relacionados) in NIVEIS.items():
+            if col_entidade not in df.columns:
+                continue
+            df_nivel = df[df[col_entidade].notna()]
+            for entidade in df_nivel[col_entidade].unique():
+                self._ordem[nivel].setdefault(entidade, None)
+            for col in relacionados:
+                if col in df_nivel.columns:
+                    pares = df_nivel[[col_entidade, col]].dropna().drop_duplicates()
+                    self._relacionados[nivel][col].append(pares)
+                    self._compactar_pares(self._relacionados[nivel][col])
+            if not self.metricas:
+                continue
+            if COLUNA_PBI in df_nivel.columns:
+                pares = df_nivel[[col_entidade, COLUNA_PBI]].dropna().drop_duplicates()
+                self._pbis[nivel].append(pares)
+                self._compactar_pares(self._pbis[nivel])
+            for metrica, coluna in COLUNAS_METRICAS.items():
+                if coluna not in df_nivel.columns:
+                    continue
+                if COLUNA_PESO in df_nivel.columns:
+                    valores = df_nivel[[col_entidade, coluna, COLUNA_PESO]].dropna()
+                    valores = valores[valores[COLUNA_PESO] > 0]
+                else:
+                    valores = df_nivel[[col_entidade, coluna]].dropna()
+                if valores.empty:
+                    continue
+                valores[coluna] = valores[coluna].astype(float)
+                agrupado = valores.groupby([col_entidade, coluna], sort=False)
+                contagem = (agrupado[COLUNA_PESO].sum().astype(np.int64) if COLUNA_PESO in valores.columns
+                            else agrupado.size())
+                if self.erro_quantis:
+                    self._adicionar_esbocos(nivel, metrica, contagem)
+                else:
+                    self._contagens[nivel][metrica].append(contagem)
+                    self._compactar_contagens(self._contagens[nivel][metrica])
+
+    def _adicionar_esbocos(self, nivel: str, metrica: str, contagem: pd.Series) -> None:
+        esbocos = self._esbocos[nivel][metrica]
+        for entidade, serie in contagem.groupby(level=0, sort=False):
+            valores = serie.index.get_level_values(1).to_numpy(dtype=float)
+            esboco = esbocos.get(entidade)
+            if esboco is None:
+                esboco = esbocos[entidade] = EsbocoQuantis(self.erro_quantis)
+            esboco.adicionar(valores, serie.to_numpy())
+            # A organização é a união das tribos, mesma base das linhas por tribo
+            if nivel == 'tribos':
+                self._organizacao[metrica].adicionar(valores, serie.to_numpy())
+
+    def estatisticas_organizacao(self) -> Dict[str, Dict[str, float]]:
+        """
+        Estatísticas de cada métrica sobre todas as tribos (apenas com
+        erro_quantis); resultado() as inclui em estrutura['organizacao'].
+        """
+        return {m: esboco.estatisticas() for m, esboco in self._organizacao.items()}
+
+    @staticmethod
+    def _listas_por_entidade(lista: List[pd.DataFrame]) -> Dict:
+        if not lista:
+            return {}
+        pares = pd.concat(lista, ignore_index=True).drop_duplicates()
+        col_entidade, col_valor = pares.columns
+        return pares.groupby(col_entidade, sort=False)[col_valor].agg(list).to_dict()
+
+    @staticmethod
+    def _valores_por_entidade(lista: List[pd.Series]) -> Dict:
+        if not lista:
+            return {}
+        contagem = pd.concat(lista).groupby(level=[0, 1], sort=False).sum()
+        resultado = {}
+        for entidade, serie in contagem.groupby(level=0, sort=False):
+            resultado[entidade] = (serie.index.get_level_values(1).to_numpy(dtype=float),
+                                   serie.to_numpy())
+        return resultado
+
+    def resultado(self) -> Tuple[Dict, Dict, Dict]:
+        """Retorna (estrutura, insights_tribos, insights_squads)"""
+        estrutura = {'tribos': {}, 'squads': {}, 'pessoas': set()}
+        insights = {}
+        for nivel, (_, relacionados) in NIVEIS.items():
+            listas = {col: self._listas_por_entidade(self._relacionados[nivel][col]) for col in relacionados}
+            pbis = self._listas_por_entidade(self._pbis[nivel])
+            valores = {m: self._valores_por_entidade(self._contagens[nivel][m]) for m in COLUNAS_METRICAS}
+            insights[nivel] = {}
+            for entidade in self._ordem[nivel]:
+                pessoas = listas['person'].get(entidade, [])
+                outro = 'squad' if nivel == 'tribos' else 'Tribo'
+                relacionados_entidade = listas[outro].get(entidade, [])
+                if nivel == 'tribos':
+                    estrutura['tribos'][entidade] = {'squads': relacionados_entidade, 'pessoas': pessoas}
+                else:
+                    estrutura['squads'][entidade] = {'tribos': relacionados_entidade, 'pessoas': pessoas}
+                estrutura['pessoas'].update(pessoas)
+                stats = {}
+                for metrica in COLUNAS_METRICAS:
+                    if self.erro_quantis:
+                        esboco = self._esbocos[nivel][metrica].get(entidade)
+                        stats[metrica] = (esboco.estatisticas() if esboco is not None
+                                          else estatisticas_ponderadas(np.array([]), np.array([])))
+                        continue
+                    v, c = valores[metrica].get(entidade, (np.array([]), np.array([])))
+                    stats[metrica] = estatisticas_ponderadas(v, c)
+                insights[nivel][entidade] = montar_insight(
+                    nivel, stats, len(pbis.get(entidade, [])), len(pessoas), len(relacionados_entidade))
+        estrutura['pessoas'] = list(estrutura['pessoas'])
+        if self._organizacao and self.metricas:
+            estrutura['organizacao'] = self.estatisticas_organizacao()
+        return estrutura, insights['tribos'], insights['squads']
+
+
+def agregar_em_blocos(blocos: Iterable[pd.DataFrame], erro_quantis: Optional[float] = None,
+                      metricas: bool = True) -> Tuple[Dict, Dict, Dict]:
+    """
+    Consome um iterável de blocos do cruzamento e retorna estrutura e insights.
+    Com erro_quantis, os percentis vêm de esboços mescláveis (ver quantis.py) e a
+    estrutura traz também as estatísticas da organização em 'organizacao'.
+    Com metricas=False, só a estrutura é calculada (ver AcumuladorInsights).
+    """
+    acumulador = AcumuladorInsights(erro_quantis=erro_quantis, metricas=metricas)
+    for bloco in blocos:
+        acumulador.adicionar(bloco)
+    return acumulador.resultado()
+
+
+def _estatisticas_por_grupo(codigos: np.ndarray, valores: np.ndarray, n_grupos: int,
+                            backend: Optional[BackendCalculo] = None) -> List[Dict[str, float]]:
+    """
+    Média, mediana, p75, p85 e p95 de cada grupo em uma passada, pelo kernel
+    vetorizado do backend de cálculo (ver computacao.BackendCalculo.estatisticas_por_grupo).
+    """
+    backend = backend or BackendNumpy()
+    por_grupo = backend.estatisticas_por_grupo(codigos, valores, n_grupos, PERCENTIS_GRUPO)
+    resultado = [{'medio': 0, 'mediana': 0, 'p75': 0, 'p85': 0, 'p95': 0} for _ in range(n_grupos)]
+    for grupo in np.flatnonzero(por_grupo['contagem']):
+        resultado[grupo] = {
+            'medio': float(por_grupo['media'][grupo]),
+            'mediana': float(por_grupo['p50'][grupo]),
+            'p75': float(por_grupo['p75'][grupo]),
+            'p85': float(por_grupo['p85'][grupo]),
+            'p95': float(por_grupo['p95'][grupo])
+        }
+    return resultado
+
+
+def _pares_distintos(codigos: np.ndarray, serie: pd.Series):
+    """
+    Pares (grupo, valor) distintos e não nulos, na ordem da primeira
+    ocorrência. Retorna (grupos, códigos dos valores, valores únicos).
+    """
+    valores, unicos = pd.factorize(serie)
+    base = max(len(unicos), 1)
+    validos = (codigos >= 0) & (valores >= 0)
+    pares = pd.unique(codigos[validos].astype(np.int64) * base + valores[validos])
+    return pares // base, pares % base, unicos
+
+
+def _unicos_por_grupo(codigos: np.ndarray, serie: pd.Series, n_grupos: int) -> List[list]:
+    """Valores distintos e não nulos de cada grupo, na ordem da primeira ocorrência"""
+    grupos, valores, unicos = _pares_distintos(codigos, serie)
+    ordem = np.argsort(grupos, kind='stable')
+    nomes = np.asarray(unicos.take(valores[ordem]))
+    tamanho = np.bincount(grupos, minlength=n_grupos)
+    return [bloco.tolist() for bloco in np.split(nomes, np.cumsum(tamanho)[:-1])]
+
+
+def agregar_dataframe(df: pd.DataFrame, niveis: Iterable[str] = tuple(NIVEIS),
+                      backend: Optional[BackendCalculo] = None) -> Tuple[Dict, Dict, Dict]:
+    """
+    Motor vetorizado de gerar_estrutura_e_insights para um DataFrame cruzado.
+
+    Cada nível (tribos, squads) é resolvido com uma fatoração da coluna da
+    entidade e operações por grupo sobre arrays ordenados, em tempo linear no
+    número de linhas, em vez de uma máscara booleana do DataFrame inteiro por
+    entidade. A saída é a do laço original, inclusive na ordem das entidades
+    e das listas (as médias, a menos do arredondamento da soma). niveis
+    restringe o cálculo a 'tribos' e/ou 'squads'; os demais ficam vazios na
+    saída. As estatísticas por entidade são calculadas pelo backend informado
+    (ver computacao.obter_backend; padrão: NumPy).
+
+    Returns:
+        Tupla (estrutura, insights_tribos, insights_squads)
+    """
+    estrutura = {'tribos': {}, 'squads': {}, 'pessoas': set()}
+    insights = {nivel: {} for nivel in NIVEIS}
+    for nivel in niveis:
+        col_entidade = NIVEIS[nivel][0]
+        codigos, entidades = pd.factorize(df[col_entidade])
+        n_grupos = len(entidades)
+        outro = 'squad' if nivel == 'tribos' else 'Tribo'
+        relacionados = _unicos_por_grupo(codigos, df[outro], n_grupos)
+        pessoas = _unicos_por_grupo(codigos, df['person'], n_grupos)
+        stats = {}
+        for metrica, coluna in COLUNAS_METRICAS.items():
+            if coluna in df.columns:
+                valores = df[coluna].to_numpy(dtype=float, na_value=np.nan)
+                stats[metrica] = _estatisticas_por_grupo(codigos, valores, n_grupos, backend)
+            else:
+                stats[metrica] = [estatisticas_ponderadas(np.array([]), np.array([]))] * n_grupos
+        if COLUNA_PBI in df.columns:
+            grupos, _, _ = _pares_distintos(codigos, df[COLUNA_PBI])
+            throughput = np.bincount(grupos, minlength=n_grupos)
+        else:
+            throughput = np.zeros(n_grupos, dtype=np.int64)
+        insights[nivel] = {}
+        for i, entidade in enumerate(entidades):
+            if nivel == 'tribos':
+                estrutura['tribos'][entidade] = {'squads': relacionados[i], 'pessoas': pessoas[i]}
+            else:
+                estrutura['squads'][entidade] = {'tribos': relacionados[i], 'pessoas': pessoas[i]}
+            estrutura['pessoas'].update(pessoas[i])
+            insights[nivel][entidade] = montar_insight(
+                nivel, {m: stats[m][i] for m in COLUNAS_METRICAS}, int(throughput[i]),
+                len(pessoas[i]), len(relacionados[i]))
+    estrutura['pessoas'] = list(estrutura['pessoas'])
+    return estrutura, insights['tribos'], insights['squads']
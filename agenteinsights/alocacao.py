@@ -0,0 +1,257 @@
+"""
+Agente Insights - Módulo de Análise de Alocação
+==============================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+- 1.1.0 (Release 8): AlocacaoIndex para consultas repetidas por tribo/squad
+
+Descrição:
+Motor vetorizado de analisar_alocacao. Pessoa, squad, tribo e papel são
+fatorados uma vez (códigos na ordem da primeira ocorrência) e todas as
+métricas saem de bincounts sobre esses códigos: contagem de papéis,
+composição squad × papel, pessoas em mais de um squad (squads distintos por
+pessoa) e média de alocação por squad. O resultado é uma AlocacaoCompacta,
+baseada em arrays, que pode ser convertida no dicionário tradicional com
+para_dict().
+
+Para análises repetidas por entidade, AlocacaoIndex filtra as alocações
+ativas e normaliza o percentual uma única vez e guarda as linhas agrupadas
+por tribo e por squad (permutação estável + offsets). Cada consulta vira uma
+fatia de tamanho k em vez de cópia e varredura do DataFrame inteiro.
+"""
+
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+COLUNAS_BASE = ['endDate', 'role', 'squad', 'tribe', 'person']
+COLUNAS_PERCENTUAL = ['percentageAllocation', 'percetageAllocation', 'percentage', 'alocacao_percentual']
+
+
+def analise_vazia() -> Dict[str, Any]:
+    return {
+        'papeis': {},
+        'alocacao_media': {},
+        'pessoas_multi_squad': [],
+        'composicao_squads': {},
+        'media_pessoas_squad': 0,
+        'pessoas_ativas': [],
+        'squads_ativos': [],
+        'tribos_ativas': [],
+        'alocacoes_ativas': []
+    }
+
+
+def coluna_percentual(df: pd.DataFrame) -> Optional[str]:
+    """Primeira variação conhecida da coluna de percentual de alocação presente em df"""
+    return next((c for c in COLUNAS_PERCENTUAL if c in df.columns), None)
+
+
+def mascara_ativas(end_date: pd.Series, agora: Optional[pd.Timestamp] = None) -> np.ndarray:
+    """Alocações ativas: sem data de término ou com término futuro"""
+    agora = agora or pd.Timestamp.now()
+    return (end_date.isna() | (pd.to_datetime(end_date, errors='coerce') > agora)).to_numpy()
+
+
+def normalizar_percentual(serie: pd.Series) -> np.ndarray:
+    """
+    Converte a coluna de percentual em float: textos como '50%' ou '0,5' são
+    limpos, inválidos viram NaN e valores em escala 0-100 passam para 0-1.
+    """
+    if not pd.api.types.is_numeric_dtype(serie):
+        serie = pd.to_numeric(serie.astype(str).str.replace('%', '').str.replace(',', '.'), errors='coerce')
+    valores = pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    if not np.isnan(valores).all() and np.nanmax(valores) > 1:
+        valores = valores / 100
+    return valores
+
+
+class AlocacaoCompacta:
+    """
+    Análise de alocação em arrays. Os índices (pessoas, squads, tribos,
+    papeis) estão na ordem da primeira ocorrência, e os arrays usam códigos
+    nesses índices.
+
+    Atributos:
+        alocacoes: matriz (n, 3) de códigos (pessoa, squad, tribo) das linhas completas
+        contagem_papeis: linhas por papel
+        composicao: matriz squads × papeis com a contagem de linhas
+        linhas_por_squad: linhas por squad
+        alocacao_media: média do percentual por squad (NaN sem valores), ou None
+        multi_squad: códigos das pessoas alocadas em mais de um squad
+    """
+
+    def __init__(self, df: pd.DataFrame, percentual: Optional[np.ndarray] = None):
+        pessoa, self.pessoas = pd.factorize(df['person'])
+        squad, self.squads = pd.factorize(df['squad'])
+        tribo, self.tribos = pd.factorize(df['tribe'])
+        papel, self.papeis = pd.factorize(df['role'])
+        n_squads, n_papeis = len(self.squads), len(self.papeis)
+
+        completas = (pessoa >= 0) & (squad >= 0) & (tribo >= 0)
+        self.alocacoes = np.column_stack((pessoa[completas], squad[completas], tribo[completas]))
+        self.contagem_papeis = np.bincount(papel[papel >= 0], minlength=n_papeis)
+        self.linhas_por_squad = np.bincount(squad[squad >= 0], minlength=n_squads)
+
+        com_papel = (squad >= 0) & (papel >= 0)
+        celulas = squad[com_papel].astype(np.int64) * max(n_papeis, 1) + papel[com_papel]
+        self.composicao = np.bincount(celulas, minlength=n_squads * n_papeis).reshape(n_squads, n_papeis)
+
+        # Squads distintos por pessoa, a partir dos pares (pessoa, squad) únicos
+        com_squad = (pessoa >= 0) & (squad >= 0)
+        pares = np.unique(pessoa[com_squad].astype(np.int64) * max(n_squads, 1) + squad[com_squad])
+        squads_por_pessoa = np.bincount(pares // max(n_squads, 1), minlength=len(self.pessoas))
+        self.multi_squad = np.flatnonzero(squads_por_pessoa > 1)
+
+        self.alocacao_media = None
+        if percentual is not None:
+            validos = (squad >= 0) & ~np.isnan(percentual)
+            soma = np.bincount(squad[validos], weights=percentual[validos], minlength=n_squads)
+            contagem = np.bincount(squad[validos], minlength=n_squads)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self.alocacao_media = soma / contagem
+
+    def __len__(self) -> int:
+        return len(self.alocacoes)
+
+    def registros(self) -> List[Dict[str, Any]]:
+        """Alocações completas como lista de dicionários {'pessoa', 'squad', 'tribo'}"""
+        pessoas = np.asarray(self.pessoas, dtype=object)[self.alocacoes[:, 0]]
+        squads = np.asarray(self.squads, dtype=object)[self.alocacoes[:, 1]]
+        tribos = np.asarray(self.tribos, dtype=object)[self.alocacoes[:, 2]]
+        return [{'pessoa': p, 'squad': s, 'tribo': t} for p, s, t in zip(pessoas, squads, tribos)]
+
+    def para_dict(self, nome_percentual: Optional[str] = None) -> Dict[str, Any]:
+        """Dicionário no formato tradicional de analisar_alocacao"""
+        ordem_squads = np.argsort(np.asarray(self.squads, dtype=object), kind='stable')
+        squads = np.asarray(self.squads, dtype=object)
+        papeis = np.asarray(self.papeis, dtype=object)
+        ordem_papeis = np.argsort(papeis, kind='stable')
+        composicao_papeis = {}
+        for i in ordem_squads:
+            linha = self.composicao[i]
+            composicao_papeis[squads[i]] = {papeis[j]: int(linha[j]) for j in np.flatnonzero(linha)}
+        analise = {
+            'papeis': {papeis[j]: int(self.contagem_papeis[j]) for j in ordem_papeis},
+            'pessoas_multi_squad': np.asarray(self.pessoas, dtype=object)[self.multi_squad].tolist(),
+            'media_pessoas_squad': float(self.linhas_por_squad.mean()) if len(self.squads) else 0,
+            'pessoas_ativas': list(self.pessoas),
+            'squads_ativos': list(self.squads),
+            'tribos_ativas': list(self.tribos),
+            'alocacoes_ativas': self.registros(),
+            'alocacao_media': {},
+            'composicao_squads': {'role': composicao_papeis} if len(self.squads) else {}
+        }
+        if nome_percentual and self.alocacao_media is not None and len(self.squads):
+            media = {squads[i]: float(self.alocacao_media[i]) for i in ordem_squads}
+            analise['alocacao_media'] = media
+            analise['composicao_squads'][nome_percentual] = dict(media)
+        return analise
+
+
+def analisar_alocacao_vetorizada(dados: pd.DataFrame, tribo: Optional[str] = None,
+                                 squad: Optional[str] = None, compacto: bool = False):
+    """
+    Filtra as alocações ativas (e, se informados, a tribo e o squad) e calcula
+    a análise de alocação.
+
+    Returns:
+        AlocacaoCompacta se compacto=True; senão o dicionário de analisar_alocacao
+    """
+    faltando = [c for c in COLUNAS_BASE if c not in dados.columns]
+    if faltando:
+        logging.warning(f"Colunas base ausentes para análise de alocação: {faltando}")
+        return None if compacto else analise_vazia()
+    nome_percentual = coluna_percentual(dados)
+    if not nome_percentual:
+        logging.warning("Nenhuma coluna de percentual encontrada")
+
+    filtro = mascara_ativas(dados['endDate'])
+    logging.info(f"Alocações ativas encontradas: {int(filtro.sum())}")
+    if tribo:
+        filtro = filtro & (dados['tribe'] == tribo).to_numpy()
+    if squad:
+        filtro = filtro & (dados['squad'] == squad).to_numpy()
+    colunas = COLUNAS_BASE + ([nome_percentual] if nome_percentual else [])
+    df = dados.loc[filtro, colunas]
+    logging.info(f"Registros após filtros de tribo/squad: {len(df)}")
+
+    percentual = normalizar_percentual(df[nome_percentual]) if nome_percentual else None
+    resultado = AlocacaoCompacta(df, percentual)
+    return resultado if compacto else resultado.para_dict(nome_percentual)
+
+
+class AlocacaoIndex:
+    """
+    Alocações ativas agrupadas por tribo e por squad. Dentro de cada grupo as
+    linhas mantêm a ordem original, de modo que consultar(tribo, squad) produz
+    o mesmo resultado de analisar_alocacao_vetorizada com os mesmos filtros
+    (exceto pela escala do percentual, decidida uma vez sobre todas as
+    alocações ativas).
+    """
+
+    def __init__(self, dados: pd.DataFrame, agora: Optional[pd.Timestamp] = None):
+        faltando = [c for c in COLUNAS_BASE if c not in dados.columns]
+        if faltando:
+            raise ValueError(f"Colunas base ausentes para análise de alocação: {faltando}")
+        self.nome_percentual = coluna_percentual(dados)
+        ativas = mascara_ativas(dados['endDate'], agora)
+        colunas = COLUNAS_BASE + ([self.nome_percentual] if self.nome_percentual else [])
+        self.ativas = dados.loc[ativas, colunas].reset_index(drop=True)
+        self.percentual = (normalizar_percentual(self.ativas[self.nome_percentual])
+                           if self.nome_percentual else None)
+        logging.info(f"Índice de alocação: {len(self.ativas)} alocações ativas")
+        self._grupos = {coluna: self._agrupar(self.ativas[coluna]) for coluna in ('tribe', 'squad')}
+
+    @staticmethod
+    def _agrupar(serie: pd.Series) -> Tuple[Dict[Any, int], np.ndarray, np.ndarray]:
+        """(valor -> código, permutação estável das linhas por código, offsets)"""
+        codigos, unicos = pd.factorize(serie)
+        validos = codigos >= 0
+        ordem = np.flatnonzero(validos)[np.argsort(codigos[validos], kind='stable')]
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(codigos[validos], minlength=len(unicos)))))
+        return {valor: i for i, valor in enumerate(unicos)}, ordem, offsets
+
+    def __len__(self) -> int:
+        return len(self.ativas)
+
+    def linhas(self, coluna: str, valor: Any) -> np.ndarray:
+        """Posições (em self.ativas) das linhas com coluna == valor, em ordem original"""
+        codigos, ordem, offsets = self._grupos[coluna]
+        codigo = codigos.get(valor)
+        if codigo is None:
+            return np.array([], dtype=np.int64)
+        return ordem[offsets[codigo]:offsets[codigo + 1]]
+
+    def tribos(self) -> List:
+        return list(self._grupos['tribe'][0])
+
+    def squads(self) -> List:
+        return list(self._grupos['squad'][0])
+
+    def consultar(self, tribo: Optional[str] = None, squad: Optional[str] = None,
+                  compacto: bool = False):
+        """
+        Análise de alocação de uma tribo e/ou squad a partir do índice.
+
+        Returns:
+            AlocacaoCompacta se compacto=True; senão o dicionário de analisar_alocacao
+        """
+        if tribo and squad:
+            linhas = self.linhas('tribe', tribo)
+            linhas = linhas[(self.ativas['squad'].to_numpy()[linhas] == squad)]
+        elif tribo:
+            linhas = self.linhas('tribe', tribo)
+        elif squad:
+            linhas = self.linhas('squad', squad)
+        else:
+            linhas = np.arange(len(self.ativas))
+        percentual = self.percentual[linhas] if self.percentual is not None else None
+        resultado = AlocacaoCompacta(self.ativas.iloc[linhas], percentual)
+        return resultado if compacto else resultado.para_dict(self.nome_percentual)
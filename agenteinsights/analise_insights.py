@@ -17,27 +17,41 @@ import os
 import sys
 import logging
 import traceback
-import re
 import time
 import json
 import unicodedata
 from datetime import datetime
 from typing import Dict, Any, List, Tuple, Optional
 from pathlib import Path
-from collections import Counter, defaultdict
-from sklearn.linear_model import LinearRegression
-from sklearn.cluster import KMeans
-from sklearn.preprocessing import StandardScaler
-from docx import Document
+from collections import defaultdict
 from dotenv import load_dotenv
-from openai import OpenAI
-from unidecode import unidecode
-import matplotlib.pyplot as plt
-import seaborn as sns
-import difflib
-import torch
-import cupy as cp  # Para operações GPU
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import ProcessPoolExecutor
+
+from . import dependencias
+from .cache_dados import ler_planilha
+from .esquemas import obter_esquema, serie_como_texto
+from .leitura_e_verificacao import ler_planilha_em_blocos
+from .agregacao import COLUNA_PESO, agregar_dataframe, agregar_em_blocos
+from .quantis import ERRO_PADRAO, EsbocoQuantis
+from .computacao import BackendCalculo, obter_backend
+from .particionamento import LINHAS_MINIMAS_PARTICIONAMENTO, agregar_particionado
+from .intervalos import alocacoes_por_quarter
+from .alocacao import AlocacaoIndex, analisar_alocacao_vetorizada, analise_vazia as analise_alocacao_vazia
+from .armazem import parametros_pipeline, salvar_analises
+from .incremental import gerar_estrutura_e_insights_incremental
+from .entidades import PALAVRAS_TIPO, EntidadeIndex, palavras
+from .colecao import ColecaoAnalises
+from .fluxo import (TabelaItens, contagens_qualidade, contar_por_periodo, datas_conclusao,
+                    cycle_times as cycle_times_itens,
+                    lead_times as lead_times_itens, tabela_itens, wip_por_status)
+from .normalizacao import chave_canonica, normalizar_serie
+from .chaves import chaves_de_colunas, chaves_de_texto
+from .juncao import (COLUNA_CHAVE_SQUAD, COLUNA_CHAVE_TRIBO, gerar_estrutura_e_insights_pre_agregado,
+                     multiplicidade)
+from .cubo import CuboMetricas, insights_do_cubo, quarter_citado
+
+# Preposições entre um squad e a tribo que o qualifica ("squad X da tribo Y")
+CONECTORES_QUALIFICACAO = {'da', 'do', 'de', 'na', 'no', 'em'}
 
 # Definir caminhos
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Sobe um nível
@@ -46,11 +60,6 @@ OUTPUT_DIR = os.path.join(BASE_DIR, 'output')
 GRAFICOS_DIR = os.path.join(OUTPUT_DIR, 'graficos')
 RELATORIOS_DIR = os.path.join(OUTPUT_DIR, 'relatorios')
 
-# Criar diretórios necessários
-os.makedirs(DATA_DIR, exist_ok=True)
-os.makedirs(GRAFICOS_DIR, exist_ok=True)
-os.makedirs(RELATORIOS_DIR, exist_ok=True)
-
 # Caminhos para arquivos
 ARQUIVO_MATURIDADE = os.path.join(DATA_DIR, 'MaturidadeT.xlsx')
 ARQUIVO_ALOCACAO = os.path.join(DATA_DIR, 'Alocacao.xlsx')
@@ -61,6 +70,18 @@ logging.info(f"Arquivo de maturidade: {ARQUIVO_MATURIDADE}")
 logging.info(f"Arquivo de alocação: {ARQUIVO_ALOCACAO}")
 logging.info(f"Arquivo executivo: {ARQUIVO_EXECUTIVO}")
 
+# Fontes carregadas por carregar_dados: nome -> (arquivo, aba)
+FONTES_DADOS = {
+    'maturidade': (ARQUIVO_MATURIDADE, 0),
+    'alocacao': (ARQUIVO_ALOCACAO, 0),
+    'executivo': (ARQUIVO_EXECUTIVO, 'NewBusinessAgility')
+}
+
+def garantir_diretorios():
+    """Cria os diretórios de dados e saída (antes feito na importação do módulo)"""
+    for diretorio in (DATA_DIR, GRAFICOS_DIR, RELATORIOS_DIR):
+        os.makedirs(diretorio, exist_ok=True)
+
 def normalizar_coluna(col):
     # Remove acentos, espaços e deixa minúsculo
     col = unicodedata.normalize('NFKD', str(col)).encode('ASCII', 'ignore').decode('ASCII')
@@ -78,44 +99,46 @@ def mapear_colunas(df, nomes_esperados):
             resultado[nome] = None
     return resultado
 
-def carregar_dados() -> Dict[str, pd.DataFrame]:
-    """Carrega os dados dos arquivos Excel"""
+def carregar_dados(usar_cache: bool = True, paralelo: bool = False,
+                   fontes: Optional[List[str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Carrega os dados dos arquivos Excel.
+    Com usar_cache=True, reaproveita o cache colunar (output/cache) das planilhas
+    que não mudaram desde a última leitura. Fontes com esquema registrado
+    (esquemas.py) são lidas apenas com as colunas e tipos declarados.
+    Com paralelo=True, as três planilhas são lidas simultaneamente em um pool
+    de processos. Em ambos os modos, se qualquer arquivo faltar ou falhar,
+    nenhum dado é retornado. fontes restringe quais entradas de FONTES_DADOS
+    são carregadas (padrão: todas).
+    """
     dados = {}
+    selecionadas = {nome: FONTES_DADOS[nome] for nome in (fontes or FONTES_DADOS)}
     try:
-        # Carregar arquivo de maturidade
-        logging.info(f"Tentando carregar arquivo: {ARQUIVO_MATURIDADE}")
-        if os.path.exists(ARQUIVO_MATURIDADE):
-            df_maturidade = pd.read_excel(ARQUIVO_MATURIDADE)
-            dados['maturidade'] = df_maturidade
-            logging.info(f"Carregado arquivo MaturidadeT.xlsx com sucesso: {len(df_maturidade)} linhas")
-            print(f"MaturidadeT.xlsx: {len(df_maturidade)} linhas")
-            print(df_maturidade.head())
-        else:
-            logging.error(f"Arquivo não encontrado: {ARQUIVO_MATURIDADE}")
-            return {}
-        # Carregar arquivo de alocação
-        logging.info(f"Tentando carregar arquivo: {ARQUIVO_ALOCACAO}")
-        if os.path.exists(ARQUIVO_ALOCACAO):
-            df_alocacao = pd.read_excel(ARQUIVO_ALOCACAO)
-            dados['alocacao'] = df_alocacao
-            logging.info(f"Carregado arquivo Alocacao.xlsx com sucesso: {len(df_alocacao)} linhas")
-            print(f"Alocacao.xlsx: {len(df_alocacao)} linhas")
-            print(df_alocacao.head())
-        else:
-            logging.error(f"Arquivo não encontrado: {ARQUIVO_ALOCACAO}")
-            return {}
-        # Carregar arquivo executivo (aba correta)
-        logging.info(f"Tentando carregar arquivo: {ARQUIVO_EXECUTIVO}")
-        if os.path.exists(ARQUIVO_EXECUTIVO):
-            df_executivo = pd.read_excel(ARQUIVO_EXECUTIVO, sheet_name='NewBusinessAgility')
-            dados['executivo'] = df_executivo
-            logging.info(f"Carregado arquivo Executivo.xlsx com sucesso: {len(df_executivo)} linhas")
-            print(f"Executivo.xlsx: {len(df_executivo)} linhas")
-            print(df_executivo.head())
+        for nome, (caminho, _) in selecionadas.items():
+            logging.info(f"Tentando carregar arquivo: {caminho}")
+            if not os.path.exists(caminho):
+                logging.error(f"Arquivo não encontrado: {caminho}")
+                return {}
+        if paralelo:
+            # Leitura do XML é CPU-bound: processos evitam a disputa pelo GIL
+            with ProcessPoolExecutor(max_workers=len(selecionadas)) as executor:
+                futures = {
+                    nome: executor.submit(ler_planilha, caminho, sheet_name=aba, usar_cache=usar_cache,
+                                           esquema=obter_esquema(nome))
+                    for nome, (caminho, aba) in selecionadas.items()
+                }
+                for nome, future in futures.items():
+                    dados[nome] = future.result()
         else:
-            logging.error(f"Arquivo não encontrado: {ARQUIVO_EXECUTIVO}")
-            return {}
-        if len(dados) == 3:
+            for nome, (caminho, aba) in selecionadas.items():
+                dados[nome] = ler_planilha(caminho, sheet_name=aba, usar_cache=usar_cache,
+                                           esquema=obter_esquema(nome))
+        for nome, df in dados.items():
+            arquivo = os.path.basename(FONTES_DADOS[nome][0])
+            logging.info(f"Carregado arquivo {arquivo} com sucesso: {len(df)} linhas")
+            print(f"{arquivo}: {len(df)} linhas")
+            print(df.head())
+        if len(dados) == len(selecionadas):
             logging.info("Todos os arquivos carregados com sucesso")
             return dados
         else:
@@ -130,24 +153,13 @@ def padronizar_ids(dados: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
     """Padroniza os IDs e nomes das tribos para permitir o merge dos dados"""
     try:
         logging.info("Padronizando nomes das tribos para merge...")
-        
-        def limpar_nome_tribo(nome):
-            if pd.isna(nome):
-                return ''
-            # Remove acentos e converte para minúsculas
-            nome = unidecode(str(nome)).lower().strip()
-            # Remove caracteres especiais
-            nome = re.sub(r'[^a-z0-9\s]', '', nome)
-            # Substitui múltiplos espaços por um único
-            nome = re.sub(r'\s+', ' ', nome)
-            return nome
             
-        # Aplica a limpeza nos nomes das tribos
+        # Aplica a limpeza nos nomes das tribos (apenas nos valores distintos)
         for key, df in dados.items():
             if 'Tribo' in df.columns:
-                df['nome_tribo_clean'] = df['Tribo'].apply(limpar_nome_tribo)
+                df['nome_tribo_clean'] = normalizar_serie(df['Tribo'])
             elif 'tribe' in df.columns:
-                df['nome_tribo_clean'] = df['tribe'].apply(limpar_nome_tribo)
+                df['nome_tribo_clean'] = normalizar_serie(df['tribe'])
                 
         # Log dos nomes únicos em cada DataFrame
         nomes_maturidade = set(dados['maturidade']['nome_tribo_clean'].unique())
@@ -241,7 +253,7 @@ def executar_analises(df: pd.DataFrame) -> Dict[str, Any]:
     if len(num_cols) > 1:
         X = df[num_cols[1:]].fillna(0)
         y = df[num_cols[0]].fillna(0)
-        reg = LinearRegression().fit(X, y)
+        reg = dependencias.sklearn('linear_model').LinearRegression().fit(X, y)
         resultados['regressao'] = {
             'coef': reg.coef_.tolist(),
             'intercept': float(reg.intercept_),
@@ -252,7 +264,7 @@ def executar_analises(df: pd.DataFrame) -> Dict[str, Any]:
     # Análise diagnóstica (clustering)
     if len(num_cols) > 1:
         X = df[num_cols].fillna(0)
-        kmeans = KMeans(n_clusters=3, random_state=42).fit(X)
+        kmeans = dependencias.sklearn('cluster').KMeans(n_clusters=3, random_state=42).fit(X)
         resultados['clustering'] = {
             'labels': kmeans.labels_.tolist(),
             'centroids': kmeans.cluster_centers_.tolist(),
@@ -268,6 +280,8 @@ def gerar_graficos(df: pd.DataFrame, resultados: Dict[str, Any]):
     try:
         # Criar diretório de gráficos se não existir
         os.makedirs(GRAFICOS_DIR, exist_ok=True)
+        plt = dependencias.pyplot()
+        sns = dependencias.seaborn()
         
         # Histograma da primeira coluna numérica
         colunas_numericas = df.select_dtypes(include=[np.number]).columns
@@ -329,7 +343,7 @@ def chat_ia_loop(analises: List[Dict]):
     load_dotenv()
     
     # Inicializa cliente OpenAI
-    client = openai.OpenAI()
+    client = dependencias.openai().OpenAI()
     
     # Contexto base como uma mensagem de desenvolvedor
     contexto_base = {
@@ -354,10 +368,13 @@ def chat_ia_loop(analises: List[Dict]):
         """
     }
     
+    # Índice de tribos e squads, montado uma vez para todas as consultas
+    indice_entidades = _indice_de(analises)
+
     # Histórico de análise atual
     analise_atual = None
     entidade_atual = None
-    
+
     print("Chat IA iniciado! Pergunte sobre tribos, squads ou peça insights.")
     print("Digite 'salvar' para exportar o chat para DOCX ou 'sair' para encerrar.")
     
@@ -375,8 +392,16 @@ def chat_ia_loop(analises: List[Dict]):
         try:
             # Se não houver análise atual ou a pergunta for sobre uma nova entidade
             if not analise_atual or "tribo" in query.lower() or "squad" in query.lower():
-                # Identificar entidade na consulta
-                entidade = identificar_entidade_consulta(query, analises)
+                # Identificar entidade na consulta; várias menções viram uma comparação
+                mencoes = identificar_entidades_consulta(query, analises, indice_entidades)
+                if len(mencoes) > 1:
+                    entidade = {'tipo': 'comparacao',
+                                'nome': ' x '.join(m['nome'] for m in mencoes),
+                                'entidades': mencoes}
+                elif mencoes:
+                    entidade = {'tipo': mencoes[0]['tipo'], 'nome': mencoes[0]['nome']}
+                else:
+                    entidade = identificar_entidade_consulta(query, analises, indice_entidades)
                 if not entidade:
                     print("Não foi possível identificar uma entidade específica na sua consulta.")
                     if analise_atual:
@@ -391,19 +416,26 @@ def chat_ia_loop(analises: List[Dict]):
                     continue
                     
                 # Preparar dados para consulta
-                dados_consulta = preparar_dados_consulta(entidade, entidade['nome'], analises)
+                if entidade['tipo'] == 'comparacao':
+                    dados_consulta = preparar_dados_comparacao(entidade['entidades'], analises)
+                else:
+                    dados_consulta = preparar_dados_consulta(entidade, entidade['nome'], analises)
                 if not dados_consulta:
                     print("Não foi possível preparar os dados para análise.")
                     continue
                 
-                # Gerar nova análise
-                analise_atual = gerar_analise_consultiva(dados_consulta.get('metricas', {}), 
+                # Gerar nova análise (uma só, também sobre o contexto combinado de uma comparação)
+                analise_atual = gerar_analise_consultiva(dados_consulta.get('metricas', {}),
                                                        dados_consulta.get('estrutura', {}),
                                                        {'tipo_entidade': entidade['tipo'],
                                                         'nome_entidade': entidade['nome'],
                                                         'query': query})
                 entidade_atual = entidade
             
+            # Quarter citado na pergunta (também em follow-ups), respondido pelo cubo
+            if entidade_atual['tipo'] != 'comparacao':
+                dados_consulta['quarter_consultado'] = preparar_dados_quarter(query, entidade_atual, analises)
+
             # Gerar resposta contextualizada
             resposta = gerar_resposta_contextualizada(query, entidade_atual, dados_consulta, client)
             
@@ -433,178 +465,37 @@ def chat_ia_loop(analises: List[Dict]):
             continue
 
 def salvar_chat_docx(chat_log: List[tuple]):
-    doc = Document()
+    doc = dependencias.docx().Document()
     doc.add_heading('Chat de Insights - Agente Insights', 0)
     for autor, msg in chat_log:
         doc.add_paragraph(f"{autor}:", style='Heading 2')
         doc.add_paragraph(msg)
+    os.makedirs(RELATORIOS_DIR, exist_ok=True)
     caminho = f"output/relatorios/chat_{datetime.now().strftime('%Y%m%d_%H%M%S')}.docx"
     doc.save(caminho)
     print(f"Chat salvo em: {caminho}")
 
-def analisar_alocacao(dados: pd.DataFrame, tribo: str = None, squad: str = None) -> Dict:
-    """Analisa alocação de pessoas e papéis"""
+def analisar_alocacao(dados, tribo: str = None, squad: str = None, compacto: bool = False):
+    """
+    Analisa alocação de pessoas e papéis (motor vetorizado em alocacao.py).
+    Com compacto=True, retorna uma AlocacaoCompacta (arrays e códigos) em vez do dicionário.
+    dados pode ser o DataFrame de alocação ou um AlocacaoIndex já construído, o que
+    torna cada chamada por tribo/squad uma fatia do índice em vez de uma varredura.
+    """
     try:
-        # Criar cópia dos dados
-        df = dados.copy() if not dados.empty else pd.DataFrame()
-        
-        # Verificar colunas necessárias base (sem coluna de percentual)
-        colunas_necessarias_base = ['endDate', 'role', 'squad', 'tribe', 'person']
-        
-        # Verificar variações da coluna de alocacao percentual
-        coluna_percentual = None
-        for possivel_coluna in ['percentageAllocation', 'percetageAllocation', 'percentage', 'alocacao_percentual']:
-            if possivel_coluna in df.columns:
-                coluna_percentual = possivel_coluna
-                break
-        
-        # Log da coluna de percentual encontrada
-        if coluna_percentual:
-            logging.info(f"Coluna de percentual encontrada: {coluna_percentual}")
-        else:
-            logging.warning("Nenhuma coluna de percentual encontrada")
-            
-        # Verificar se temos as colunas base necessárias
-        if not all(col in df.columns for col in colunas_necessarias_base):
-            colunas_faltando = [col for col in colunas_necessarias_base if col not in df.columns]
-            logging.warning(f"Colunas base ausentes para análise de alocação: {colunas_faltando}")
-            return {
-                'papeis': {},
-                'alocacao_media': {},
-                'pessoas_multi_squad': [],
-                'composicao_squads': {},
-                'media_pessoas_squad': 0,
-                'pessoas_ativas': [],
-                'squads_ativos': [],
-                'tribos_ativas': [],
-                'alocacoes_ativas': []
-            }
-        
-        # Filtrar apenas alocações ativas (sem data de término ou data futura)
-        df = df[df['endDate'].isna() | (pd.to_datetime(df['endDate'], errors='coerce') > pd.Timestamp.now())]
-        logging.info(f"Alocações ativas encontradas: {len(df)}")
-        if not df.empty:
-            logging.info(f"Exemplo de tribos nas alocações: {df['tribe'].dropna().unique()[:5]}")
-        
-        # Filtrar por tribo ou squad se especificado
-        if tribo:
-            df = df[df['tribe'] == tribo]
-        if squad:
-            df = df[df['squad'] == squad]
-            
-        # Log dos registros após filtros
-        logging.info(f"Registros após filtros de tribo/squad: {len(df)}")
-
-        # Preparar dados para análise
-        composicao_squads_agg = {}
-        
-        # Base para análise sem percentual
-        composicao_squads_agg['role'] = lambda x: dict(Counter(x))
-        
-        # Adicionar percentual se disponível, com conversão segura para numérico
-        if coluna_percentual:
-            # Converter percentuais para valores numéricos com segurança
-            try:
-                # Se for string com %, remover e converter para float
-                if df[coluna_percentual].dtype == 'object':
-                    logging.info(f"Processando coluna {coluna_percentual}")
-                    # Mostrar algumas amostras para debug
-                    sample_values = df[coluna_percentual].dropna().head(5).tolist()
-                    logging.info(f"Amostras de valores antes da conversão: {sample_values}")
-                    
-                    # Limpar e converter valores
-                    df[coluna_percentual] = df[coluna_percentual].astype(str).str.replace('%', '').str.replace(',', '.')
-                    df[coluna_percentual] = pd.to_numeric(df[coluna_percentual], errors='coerce')
-                    
-                    # Mostrar valores após limpeza para debug
-                    clean_values = df[coluna_percentual].dropna().head(3).tolist()
-                    logging.info(f"Valores após limpeza: {clean_values}")
-                    
-                    # Verificar valores inválidos (que viraram NaN)
-                    invalid_count = df[coluna_percentual].isna().sum()
-                    logging.info(f"Dados inválidos em {coluna_percentual}: {invalid_count} registros")
-                
-                # Calcular estatísticas básicas
-                if df[coluna_percentual].notna().any():
-                    min_val = df[coluna_percentual].min()
-                    max_val = df[coluna_percentual].max()
-                    mean_val = df[coluna_percentual].mean()
-                    logging.info(f"Valores de percentual: min={min_val}, max={max_val}, mean={mean_val}")
-                    
-                    # Converter para decimal (0-1) se os valores parecem ser percentuais (>1)
-                    if max_val > 1:
-                        logging.info(f"Convertendo percentuais para decimal (0-1)")
-                        df[coluna_percentual] = df[coluna_percentual] / 100
-                        logging.info(f"Valores após normalização: min={df[coluna_percentual].min()}, max={df[coluna_percentual].max()}, mean={df[coluna_percentual].mean()}")
-                
-                # Usar mean para agregação apenas se os valores são numéricos
-                composicao_squads_agg[coluna_percentual] = 'mean'
-                
-            except Exception as e:
-                logging.warning(f"Erro ao processar coluna percentual {coluna_percentual}: {str(e)}")
-                # Remover a coluna problemática
-                if coluna_percentual in df.columns:
-                    df = df.drop(coluna_percentual, axis=1)
-                coluna_percentual = None
-                
-        # Calcular métricas de alocação
-        analise = {
-            'papeis': df.groupby('role').size().to_dict() if len(df) > 0 else {},
-            'pessoas_multi_squad': df[df.groupby('person')['squad'].transform('size') > 1]['person'].unique().tolist() if len(df) > 0 else [],
-            'media_pessoas_squad': float(df.groupby('squad').size().mean()) if len(df) > 0 and 'squad' in df.columns else 0,
-            'pessoas_ativas': df['person'].dropna().unique().tolist() if 'person' in df.columns else [],
-            'squads_ativos': df['squad'].dropna().unique().tolist() if 'squad' in df.columns else [],
-            'tribos_ativas': df['tribe'].dropna().unique().tolist() if 'tribe' in df.columns else [],
-            # Nova lista detalhada de alocações ativas
-            'alocacoes_ativas': [
-                {'pessoa': row['person'], 'squad': row['squad'], 'tribo': row['tribe']}
-                for _, row in df.iterrows() if pd.notna(row['person']) and pd.notna(row['squad']) and pd.notna(row['tribe'])
-            ]
-        }
-            
-        # Adicionar métricas de alocação percentual se disponível
-        if coluna_percentual and coluna_percentual in df.columns:
-            analise['alocacao_media'] = df.groupby('squad')[coluna_percentual].mean().to_dict() if len(df) > 0 else {}
-            
-            # Usar agregação segura para composição de squads
-            try:
-                analise['composicao_squads'] = df.groupby('squad').agg(composicao_squads_agg).to_dict() if len(df) > 0 else {}
-            except Exception as e:
-                logging.warning(f"Erro na agregação de composição de squads: {str(e)}")
-                # Fallback para composição sem percentual
-                analise['composicao_squads'] = df.groupby('squad').agg({'role': lambda x: dict(Counter(x))}).to_dict() if len(df) > 0 else {}
-        else:
-            analise['alocacao_media'] = {}
-            analise['composicao_squads'] = df.groupby('squad').agg({'role': lambda x: dict(Counter(x))}).to_dict() if len(df) > 0 else {}
-        
-        return analise
-        
+        if isinstance(dados, AlocacaoIndex):
+            return dados.consultar(tribo, squad, compacto=compacto)
+        return analisar_alocacao_vetorizada(dados, tribo, squad, compacto=compacto)
     except Exception as e:
         logging.error(f"Erro ao analisar alocação: {str(e)}")
         traceback.print_exc()
-        return {
-            'papeis': {},
-            'alocacao_media': {},
-            'pessoas_multi_squad': [],
-            'composicao_squads': {},
-            'media_pessoas_squad': 0,
-            'pessoas_ativas': [],
-            'squads_ativos': [],
-            'tribos_ativas': [],
-            'alocacoes_ativas': []
-        }
+        return None if compacto else analise_alocacao_vazia()
 
 def normalizar_texto(texto):
     """Normaliza um texto removendo acentos, convertendo para minúsculas e removendo caracteres especiais"""
     if not texto:
         return ""
-    texto = str(texto).lower().strip()
-    # Remove acentos
-    nfkd = unicodedata.normalize('NFKD', texto)
-    texto_sem_acentos = u"".join([c for c in nfkd if not unicodedata.combining(c)])
-    # Remove caracteres especiais
-    texto_limpo = re.sub(r'[^a-zA-Z0-9\s]', '', texto_sem_acentos)
-    return texto_limpo.strip()
+    return chave_canonica(texto)
 
 def analisar_cfd(df, colunas):
     """Analisa o Cumulative Flow Diagram do dataframe"""
@@ -725,72 +616,106 @@ def mapear_estrutura_org(analises):
     estrutura['papeis_total'] = dict(papeis)
     return estrutura
 
-def identificar_entidade_consulta(query: str, analises: List[Dict]) -> Optional[Dict]:
+def identificar_entidade_consulta(query: str, analises: List[Dict],
+                                  indice: Optional[EntidadeIndex] = None) -> Optional[Dict]:
     """
     Identifica a entidade (tribo ou squad) mencionada na consulta do usuário.
     Retorna um dicionário com tipo ('tribo' ou 'squad') e nome, ou None se não encontrar.
     Se não encontrar correspondência clara, retorna as opções mais próximas para o usuário escolher.
+    O índice de entidades (ver entidades.py) deve ser montado uma vez e reutilizado entre
+    consultas; sem ele, é montado a partir de analises.
     """
-    def normalizar(texto):
-        return unidecode(str(texto)).lower().replace(' ', '').replace('-', '').replace('&', '').replace('/', '').replace('_', '')
-
-    query_norm = normalizar(query)
-    nomes_tribos = [a['nome'] for a in analises if a.get('tipo') == 'tribo']
-    nomes_squads = [a['nome'] for a in analises if a.get('tipo') == 'squad']
-    nomes_tribos_norm = [normalizar(n) for n in nomes_tribos]
-    nomes_squads_norm = [normalizar(n) for n in nomes_squads]
+    if indice is None:
+        indice = _indice_de(analises)
 
     # 1. Correspondência exata
-    if query_norm in nomes_tribos_norm:
-        idx = nomes_tribos_norm.index(query_norm)
-        return {'tipo': 'tribo', 'nome': nomes_tribos[idx]}
-    if query_norm in nomes_squads_norm:
-        idx = nomes_squads_norm.index(query_norm)
-        return {'tipo': 'squad', 'nome': nomes_squads[idx]}
+    entidade = indice.exato(query)
+    if entidade:
+        return entidade
 
     # 2. Correspondência parcial
-    for i, n in enumerate(nomes_tribos_norm):
-        if query_norm in n or n in query_norm:
-            return {'tipo': 'tribo', 'nome': nomes_tribos[i]}
-    for i, n in enumerate(nomes_squads_norm):
-        if query_norm in n or n in query_norm:
-            return {'tipo': 'squad', 'nome': nomes_squads[i]}
-
-    # 3. Fuzzy matching (difflib)
-    tribo_match = difflib.get_close_matches(query_norm, nomes_tribos_norm, n=3, cutoff=0.6)
-    squad_match = difflib.get_close_matches(query_norm, nomes_squads_norm, n=3, cutoff=0.6)
-    sugestoes = []
-    if tribo_match:
-        sugestoes.extend([nomes_tribos[nomes_tribos_norm.index(m)] for m in tribo_match])
-    if squad_match:
-        sugestoes.extend([nomes_squads[nomes_squads_norm.index(m)] for m in squad_match])
+    entidade = indice.parcial(query)
+    if entidade:
+        return entidade
+
+    # 3. Correspondência aproximada (trigramas + distância de edição)
+    sugestoes = indice.sugestoes(query)
     if sugestoes:
         print("Não foi possível identificar exatamente a entidade. Você quis dizer uma destas opções?")
         for i, s in enumerate(sugestoes, 1):
-            print(f"{i}. {s}")
+            print(f"{i}. {s['nome']}")
         print("Digite o número da opção desejada ou tente novamente.")
         escolha = input("Opção: ").strip()
         if escolha.isdigit():
             idx = int(escolha) - 1
             if 0 <= idx < len(sugestoes):
-                nome_escolhido = sugestoes[idx]
-                if nome_escolhido in nomes_tribos:
-                    return {'tipo': 'tribo', 'nome': nome_escolhido}
-                if nome_escolhido in nomes_squads:
-                    return {'tipo': 'squad', 'nome': nome_escolhido}
+                return sugestoes[idx]
         return None
     # 4. Não encontrou nada
     return None
 
+def identificar_entidades_consulta(query: str, analises: List[Dict],
+                                   indice: Optional[EntidadeIndex] = None) -> List[Dict]:
+    """
+    Todas as tribos e squads mencionados na consulta, na ordem do texto, com o
+    trecho de cada menção ('inicio'/'fim'). Uma única passada sobre a consulta
+    (ver EntidadeIndex.extrair); não faz busca aproximada. Um squad qualificado
+    pela sua própria tribo ("squad X da tribo Y") é uma menção só ao squad.
+    """
+    if indice is None:
+        indice = _indice_de(analises)
+    return _resolver_squads_qualificados(query, indice.extrair(query),
+                                         getattr(analises, 'estrutura', None))
+
+def _resolver_squads_qualificados(query: str, mencoes: List[Dict], estrutura: Optional[Dict]) -> List[Dict]:
+    """
+    Remove a menção à tribo que apenas qualifica o squad anterior ("squad X
+    da tribo Y", "squad X na Y"), quando X pertence a Y segundo a estrutura.
+    """
+    squads = (estrutura or {}).get('squads', {})
+    resultado = []
+    for mencao in mencoes:
+        anterior = resultado[-1] if resultado else None
+        if (anterior and anterior['tipo'] == 'squad' and mencao['tipo'] == 'tribo'
+                and mencao['nome'] in squads.get(anterior['nome'], {}).get('tribos', [])):
+            entre = [p for p, _, _ in palavras(query[anterior['fim']:mencao['inicio']])]
+            if entre[:1] and entre[0] in CONECTORES_QUALIFICACAO and all(
+                    PALAVRAS_TIPO.get(p) == 'tribo' for p in entre[1:]):
+                continue
+        resultado.append(mencao)
+    return resultado
+
+def preparar_dados_comparacao(entidades: List[Dict], analises: List[Dict]) -> Optional[Dict]:
+    """
+    Contexto único para perguntas sobre várias entidades: os dados de cada uma
+    (preparar_dados_consulta) em 'comparacao' e as métricas lado a lado em
+    'metricas', para que a comparação seja respondida de uma vez.
+    """
+    comparacao = []
+    for entidade in entidades:
+        dados = preparar_dados_consulta(entidade, entidade['nome'], analises)
+        if dados:
+            comparacao.append({'entidade': {'tipo': entidade['tipo'], 'nome': entidade['nome']}, 'dados': dados})
+    if not comparacao:
+        return None
+    return {
+        'comparacao': comparacao,
+        'metricas': {f"{item['entidade']['tipo']} {item['entidade']['nome']}": item['dados']['metricas']
+                     for item in comparacao}
+    }
+
 def preparar_dados_consulta(entidade: Dict, nome: str, analises: List[Dict]) -> Optional[Dict]:
     """Prepara os dados relevantes para a consulta"""
     try:
         # Encontra a análise específica para a entidade
         analise_entidade = None
-        for analise in analises:
-            if analise.get('tipo') == entidade['tipo'] and analise.get('nome') == nome:
-                analise_entidade = analise
-                break
+        if isinstance(analises, ColecaoAnalises):
+            analise_entidade = analises.obter(entidade['tipo'], nome)
+        else:
+            for analise in analises:
+                if analise.get('tipo') == entidade['tipo'] and analise.get('nome') == nome:
+                    analise_entidade = analise
+                    break
         
         if not analise_entidade:
             return None
@@ -859,12 +784,51 @@ def preparar_dados_consulta(entidade: Dict, nome: str, analises: List[Dict]) ->
                 }
             }]
         }
+        if getattr(analises, 'cubo', None) is not None:
+            dados['por_quarter'] = serie_trimestral(analises.cubo, entidade['tipo'], nome)
         
         return dados
     except Exception as e:
         logging.error(f"Erro ao preparar dados: {str(e)}")
         return None
 
+def _filtro_entidade(tipo: str, nome: str) -> Dict[str, str]:
+    return {'tribo': nome} if tipo == 'tribo' else {'squad': nome}
+
+def serie_trimestral(cubo: CuboMetricas, tipo: str, nome: str) -> Dict[str, Dict[str, float]]:
+    """Throughput, lead time e cycle time médios da entidade por quarter ('AAAA-Qn'), lidos do cubo"""
+    return {f"{ano}-Q{quarter}": {'throughput': total['throughput'],
+                                  'lead_time_medio': total['lead_time']['medio'],
+                                  'cycle_time_medio': total['cycle_time']['medio']}
+            for (ano, quarter), total in cubo.por_quarter(**_filtro_entidade(tipo, nome)).items()}
+
+def preparar_dados_quarter(query: str, entidade: Dict, analises: List[Dict]) -> Optional[Dict]:
+    """
+    Totais da entidade no quarter citado na consulta ('Q2 2024', '2º trimestre de 2024'),
+    respondidos pelo cubo da coleção; None sem cubo ou sem quarter na consulta.
+    """
+    cubo = getattr(analises, 'cubo', None)
+    citado = quarter_citado(query)
+    if cubo is None or citado is None:
+        return None
+    ano, quarter = citado
+    total = cubo.consultar(ano=ano, quarter=quarter, **_filtro_entidade(entidade['tipo'], entidade['nome']))
+    return {'ano': ano, 'quarter': quarter, 'throughput': total['throughput'],
+            'lead_time': total['lead_time'], 'cycle_time': total['cycle_time'],
+            'story_points': total['story_points']['medio']}
+
+def _analises_com_secoes(analises, *secoes):
+    """Análises que têm alguma das seções; em uma ColecaoAnalises, sem percorrer a lista"""
+    if isinstance(analises, ColecaoAnalises):
+        return analises.com_secao(*secoes)
+    return analises
+
+def _indice_de(analises) -> EntidadeIndex:
+    """Índice de entidades da coleção (montado uma vez) ou de uma lista avulsa"""
+    if isinstance(analises, ColecaoAnalises):
+        return analises.indice_entidades
+    return EntidadeIndex(analises)
+
 def analisar_tribo(tribo, estrutura, analises):
     """Análise aprofundada de uma tribo específica"""
     dados = {
@@ -875,14 +839,15 @@ def analisar_tribo(tribo, estrutura, analises):
         'tendencias': {},
         'insights_descritivos': []
     }
-    for analise in analises:
+    for analise in _analises_com_secoes(analises, 'metricas_por_tribo', 'composicao_squads'):
         if not isinstance(analise, dict):
             continue
         # Análise de maturidade e eficiência
         if 'metricas_por_tribo' in analise and tribo in analise['metricas_por_tribo']:
             metricas = analise['metricas_por_tribo'][tribo]
-            dados['metricas_ageis'] = extrair_metricas_ageis(metricas)
-            dados['qualidade_entrega'] = analisar_qualidade_entrega(metricas)
+            tabela = tabela_itens(metricas)
+            dados['metricas_ageis'] = extrair_metricas_ageis(metricas, tabela)
+            dados['qualidade_entrega'] = analisar_qualidade_entrega(metricas, tabela)
             dados['insights_descritivos'] = gerar_insights_descritivos(dados['metricas_ageis'])
         # Análise de pessoas e capacidade
         if 'composicao_squads' in analise:
@@ -902,15 +867,16 @@ def analisar_squad(squad, estrutura, analises):
         'tendencias': {}
     }
     
-    for analise in analises:
+    for analise in _analises_com_secoes(analises, 'metricas_por_squad', 'composicao_squads'):
         if not isinstance(analise, dict):
             continue
             
         # Métricas do squad
         if 'metricas_por_squad' in analise and squad in analise['metricas_por_squad']:
             metricas = analise['metricas_por_squad'][squad]
-            dados['metricas_ageis'] = extrair_metricas_ageis(metricas)
-            dados['qualidade_entrega'] = analisar_qualidade_entrega(metricas)
+            tabela = tabela_itens(metricas)
+            dados['metricas_ageis'] = extrair_metricas_ageis(metricas, tabela)
+            dados['qualidade_entrega'] = analisar_qualidade_entrega(metricas, tabela)
             
         # Análise de composição e capacidade
         if 'composicao_squads' in analise and squad in analise['composicao_squads']:
@@ -922,25 +888,26 @@ def analisar_squad(squad, estrutura, analises):
     
     return dados
 
-def extrair_metricas_ageis(metricas):
-    """Extrai e analisa métricas ágeis"""
+def extrair_metricas_ageis(metricas, tabela: Optional[TabelaItens] = None):
+    """
+    Extrai e analisa métricas ágeis.
+    Os itens são convertidos uma vez para a tabela colunar de fluxo.py, usada
+    pelos cálculos de lead time, cycle time e WIP; quem já tem a tabela pode passá-la.
+    """
+    tabela = tabela or tabela_itens(metricas)
     return {
-        'lead_time': calcular_metricas_lead_time(metricas),
-        'cycle_time': calcular_metricas_cycle_time(metricas),
-        'throughput': calcular_metricas_throughput(metricas),
-        'wip': calcular_metricas_wip(metricas)
+        'lead_time': calcular_metricas_lead_time(metricas, tabela),
+        'cycle_time': calcular_metricas_cycle_time(metricas, tabela),
+        'throughput': calcular_metricas_throughput(metricas, tabela),
+        'wip': calcular_metricas_wip(metricas, tabela)
     }
 
-def calcular_metricas_lead_time(metricas):
+def calcular_metricas_lead_time(metricas, tabela: Optional[TabelaItens] = None):
     """Calcula métricas de lead time com análise de tendências"""
-    lead_times = []
-    if 'items' in metricas:
-        for item in metricas['items']:
-            if 'created_date' in item and 'done_date' in item:
-                lead_time = (item['done_date'] - item['created_date']).days
-                lead_times.append(lead_time)
+    tabela = tabela or tabela_itens(metricas)
+    lead_times = lead_times_itens(tabela) if tabela is not None else []
     
-    if not lead_times:
+    if len(lead_times) == 0:
         return {'avg': 0, 'min': 0, 'max': 0, 'tendencia': 'estável'}
         
     return {
@@ -950,34 +917,25 @@ def calcular_metricas_lead_time(metricas):
         'tendencia': analisar_tendencia(lead_times)
     }
 
-def calcular_metricas_cycle_time(metricas):
+def calcular_metricas_cycle_time(metricas, tabela: Optional[TabelaItens] = None):
     """Calcula métricas de cycle time com análise de gargalos"""
-    cycle_times = []
-    tempos_por_status = defaultdict(list)
+    tabela = tabela or tabela_itens(metricas)
+    cycle_times, medias_por_status = cycle_times_itens(tabela) if tabela is not None else ([], {})
     
-    if 'items' in metricas:
-        for item in metricas['items']:
-            if 'status_changes' in item:
-                cycle_time = 0
-                for status, tempo in item['status_changes'].items():
-                    cycle_time += tempo
-                    tempos_por_status[status].append(tempo)
-                cycle_times.append(cycle_time)
-    
-    gargalos = identificar_gargalos(tempos_por_status)
+    gargalos = identificar_gargalos(medias_por_status)
     
     return {
-        'avg': np.mean(cycle_times) if cycle_times else 0,
+        'avg': np.mean(cycle_times) if len(cycle_times) else 0,
         'gargalos': gargalos,
         'distribuicao': calcular_distribuicao_tempos(cycle_times)
     }
 
-def calcular_metricas_throughput(metricas):
+def calcular_metricas_throughput(metricas, tabela: Optional[TabelaItens] = None):
     """Calcula throughput com previsões"""
     entregas_por_periodo = []
     if 'items' in metricas:
         # Agrupa entregas por período
-        periodos = agrupar_entregas_por_periodo(metricas['items'])
+        periodos = agrupar_entregas_por_periodo(tabela or metricas['items'])
         entregas_por_periodo = list(periodos.values())
     
     return {
@@ -987,19 +945,18 @@ def calcular_metricas_throughput(metricas):
         'estabilidade': calcular_estabilidade(entregas_por_periodo)
     }
 
-def agrupar_entregas_por_periodo(items):
-    """Agrupa entregas por período (mês)"""
-    periodos = defaultdict(int)
-    for item in items:
-        if 'data_conclusao' in item:
-            data = datetime.strptime(item['data_conclusao'], '%Y-%m-%d')
-            periodo = f"{data.year}-{data.month:02d}"
-            periodos[periodo] += 1
-    return dict(sorted(periodos.items()))
+def agrupar_entregas_por_periodo(items, periodo: str = 'mes', preencher_vazios: bool = True):
+    """
+    Agrupa entregas (data_conclusao) por período: 'mes' ('AAAA-MM'), 'semana'
+    ('AAAA-Wss', semana ISO) ou 'quarter' ('AAAA-Qn'), em ordem cronológica.
+    Com preencher_vazios=True (padrão), meses sem entregas entram com 0.
+    items pode ser a lista de itens ou uma TabelaItens já montada (ver fluxo.py).
+    """
+    return contar_por_periodo(datas_conclusao(items), periodo, preencher_vazios)
 
 def analisar_tendencia(dados):
-    """Analisa tendência dos dados usando regressão linear"""
-    if not dados or len(dados) < 2:
+    """Analisa tendência dos dados (lista ou array) usando regressão linear"""
+    if dados is None or len(dados) < 2:
         return 'estável'
     
     x = np.arange(len(dados))
@@ -1035,15 +992,19 @@ def calcular_estabilidade(dados):
         return 'instável'
 
 def identificar_gargalos(tempos_por_status):
-    """Identifica gargalos no processo baseado nos tempos por status"""
+    """
+    Identifica gargalos no processo baseado nos tempos por status.
+    Aceita, por status, a lista de tempos ou o tempo médio já calculado.
+    """
     gargalos = []
     if not tempos_por_status:
         return gargalos
         
-    tempo_total_medio = sum(np.mean(tempos) for tempos in tempos_por_status.values())
+    medias = {status: tempos if np.isscalar(tempos) else np.mean(tempos)
+              for status, tempos in tempos_por_status.items()}
+    tempo_total_medio = sum(medias.values())
     
-    for status, tempos in tempos_por_status.items():
-        tempo_medio = np.mean(tempos)
+    for status, tempo_medio in medias.items():
         if tempo_medio > tempo_total_medio * 0.3:  # Status que consomem mais de 30% do tempo total
             gargalos.append({
                 'status': status,
@@ -1054,8 +1015,16 @@ def identificar_gargalos(tempos_por_status):
     return sorted(gargalos, key=lambda x: x['tempo_medio'], reverse=True)
 
 def calcular_distribuicao_tempos(tempos):
-    """Calcula distribuição dos tempos para análise estatística"""
-    if not tempos:
+    """
+    Calcula distribuição dos tempos para análise estatística.
+    Aceita também um EsbocoQuantis (ver quantis.py), com percentis aproximados.
+    """
+    if isinstance(tempos, EsbocoQuantis):
+        if tempos.vazio():
+            return {'min': 0, 'max': 0, 'p25': 0, 'p50': 0, 'p75': 0}
+        p25, p50, p75 = tempos.percentis((25, 50, 75))
+        return {'min': tempos.minimo, 'max': tempos.maximo, 'p25': p25, 'p50': p50, 'p75': p75}
+    if len(tempos) == 0:
         return {
             'min': 0,
             'max': 0,
@@ -1072,18 +1041,16 @@ def calcular_distribuicao_tempos(tempos):
         'p75': np.percentile(tempos, 75)
     }
 
-def calcular_metricas_wip(metricas):
+def calcular_metricas_wip(metricas, tabela: Optional[TabelaItens] = None):
     """Calcula métricas de Work in Progress (WIP)"""
     wip_atual = 0
-    wip_por_status = defaultdict(int)
+    por_status = {}
     wip_historico = []
     
-    if 'items' in metricas:
+    tabela = tabela or tabela_itens(metricas)
+    if tabela is not None:
         # Calcula WIP atual
-        for item in metricas['items']:
-            if item.get('status') != 'Concluído' and item.get('status') != 'Cancelado':
-                wip_atual += 1
-                wip_por_status[item.get('status', 'Desconhecido')] += 1
+        wip_atual, por_status = wip_por_status(tabela)
         
         # Calcula histórico de WIP (se disponível)
         if 'wip_historico' in metricas:
@@ -1091,7 +1058,7 @@ def calcular_metricas_wip(metricas):
     
     return {
         'atual': wip_atual,
-        'por_status': dict(wip_por_status),
+        'por_status': por_status,
         'tendencia': analisar_tendencia(wip_historico) if wip_historico else 'sem dados históricos',
         'limite_recomendado': calcular_limite_wip(wip_historico) if wip_historico else None
     }
@@ -1133,7 +1100,7 @@ def analisar_capacidade_times(metricas, estrutura):
                 
     return capacidade
 
-def analisar_qualidade_entrega(metricas):
+def analisar_qualidade_entrega(metricas, tabela: Optional[TabelaItens] = None):
     """Analisa qualidade das entregas baseado em retrabalho e bugs"""
     qualidade = {
         'taxa_retrabalho': 0,
@@ -1143,9 +1110,9 @@ def analisar_qualidade_entrega(metricas):
     }
     
     if 'items' in metricas and len(metricas['items']) > 0:
-        total_items = len(metricas['items'])
-        retrabalho = sum(1 for item in metricas['items'] if item.get('retrabalho', False))
-        bugs = sum(1 for item in metricas['items'] if item.get('tipo') == 'bug')
+        tabela = tabela or tabela_itens(metricas)
+        total_items = tabela.n
+        retrabalho, bugs = contagens_qualidade(tabela)
         
         qualidade['taxa_retrabalho'] = round((retrabalho / total_items) * 100, 1)
         qualidade['taxa_bugs'] = round((bugs / total_items) * 100, 1)
@@ -1276,6 +1243,9 @@ def gerar_resposta_contextualizada(query: str, entidade: Dict, dados: Dict, clie
         if not dados or not dados.get('metricas'):
             return "Não há dados suficientes para gerar uma análise."
             
+        if 'comparacao' in dados:
+            return gerar_resposta_comparativa(query, dados, client)
+
         # Extrai métricas principais
         metricas = dados['metricas']
         estrutura = dados.get('estrutura', {})
@@ -1340,6 +1310,7 @@ def gerar_resposta_contextualizada(query: str, entidade: Dict, dados: Dict, clie
         
         # Formata a análise
         resposta = formatar_analise_consultiva(analise)
+        resposta += formatar_quarters(query, dados)
         
         # Adiciona análise de gaps se relevante
         if 'lead_time' in metricas and 'cycle_time' in metricas:
@@ -1363,88 +1334,137 @@ def gerar_resposta_contextualizada(query: str, entidade: Dict, dados: Dict, clie
         logging.error(f"Erro ao gerar resposta contextualizada: {str(e)}")
         return f"Erro ao gerar análise: {str(e)}"
 
-def get_device():
-    """Detecta e retorna o dispositivo mais apropriado para processamento"""
-    if torch.cuda.is_available():
-        logging.info("GPU disponível: usando CUDA para aceleração")
-        return "cuda"
-    else:
-        logging.info("GPU não disponível: usando CPU")
-        return "cpu"
-
-def to_device(data, device):
-    """Converte dados para o dispositivo apropriado"""
-    if device == "cuda":
-        if isinstance(data, pd.DataFrame):
-            # Converte DataFrame para GPU usando CuPy
-            return cp.array(data.values)
-        elif isinstance(data, np.ndarray):
-            return cp.array(data)
-        elif isinstance(data, torch.Tensor):
-            return data.cuda()
-    return data
-
-def from_device(data, device):
-    """Converte dados de volta do dispositivo para CPU"""
-    if device == "cuda":
-        if isinstance(data, cp.ndarray):
-            return cp.asnumpy(data)
-        elif isinstance(data, torch.Tensor):
-            return data.cpu().numpy()
-    return data
-
-def processar_dados_paralelo(dados: Dict[str, pd.DataFrame], device: str) -> Dict[str, Any]:
-    """Processa dados em paralelo usando GPU ou CPU"""
-    with ThreadPoolExecutor() as executor:
-        futures = []
-        
-        # Processa cada DataFrame em paralelo
-        for nome, df in dados.items():
-            future = executor.submit(processar_dataframe, df, device)
-            futures.append((nome, future))
-        
-        # Coleta resultados
-        resultados = {}
-        for nome, future in futures:
-            resultados[nome] = future.result()
-            
-    return resultados
+def formatar_quarters(query: str, dados: Dict) -> str:
+    """
+    Seção da resposta com o quarter citado na consulta ou, se ela só pedir a
+    visão por quarter/trimestre, a série trimestral da entidade.
+    """
+    consultado = dados.get('quarter_consultado')
+    if consultado:
+        texto = f"\n\nQuarter {consultado['ano']}-Q{consultado['quarter']}:"
+        if not consultado['throughput'] and not consultado['lead_time']['contagem']:
+            return texto + "\n- Sem entregas registradas neste quarter"
+        texto += f"\n- Throughput: {consultado['throughput']} entregas"
+        texto += (f"\n- Lead time médio: {consultado['lead_time']['medio']:.1f} dias"
+                  f" (P85: {consultado['lead_time']['p85']:.1f})")
+        texto += f"\n- Cycle time médio: {consultado['cycle_time']['medio']:.1f} dias"
+        texto += f"\n- Story points médios: {consultado['story_points']:.1f}"
+        return texto
+    serie = dados.get('por_quarter')
+    consulta = query.lower()
+    if not serie or ('quarter' not in consulta and 'trimestr' not in consulta):
+        return ""
+    linhas = ["\n\nEvolução por quarter:", "| Quarter | Throughput | Lead time médio | Cycle time médio |",
+              "|---|---|---|---|"]
+    for rotulo, valores in serie.items():
+        linhas.append(f"| {rotulo} | {valores['throughput']} | {valores['lead_time_medio']:.1f} | "
+                      f"{valores['cycle_time_medio']:.1f} |")
+    return "\n".join(linhas)
 
-def processar_dataframe(df: pd.DataFrame, device: str) -> pd.DataFrame:
-    """Processa um DataFrame usando GPU ou CPU"""
-    # Converte para o dispositivo apropriado
-    dados = to_device(df, device)
-    
-    if device == "cuda":
-        # Operações otimizadas para GPU
-        # Exemplo: cálculos estatísticos
-        if isinstance(dados, cp.ndarray):
-            media = cp.mean(dados, axis=0)
-            desvio = cp.std(dados, axis=0)
-            # Converte de volta para CPU
-            return pd.DataFrame({
-                'media': from_device(media, device),
-                'desvio': from_device(desvio, device)
-            })
-    else:
-        # Operações CPU padrão
-        return df
+def tabela_comparativa(dados: Dict) -> str:
+    """
+    Métricas principais de uma comparação (preparar_dados_comparacao) lado a
+    lado, com os destaques de melhor e pior valor.
+    """
+    # (rótulo, extrator, menor é melhor)
+    indicadores = [
+        ('Lead time médio (dias)', lambda m: m['lead_time']['medio'], True),
+        ('Lead time P95 (dias)', lambda m: m['lead_time']['p95'], True),
+        ('Cycle time médio (dias)', lambda m: m['cycle_time']['medio'], True),
+        ('Throughput', lambda m: m['throughput'], False),
+        ('Story points médios', lambda m: m['story_points'], None)
+    ]
+    nomes = list(dados['metricas'])
+    linhas = [f"Comparação: {', '.join(nomes)}", ""]
+    linhas.append("| Indicador | " + " | ".join(nomes) + " |")
+    linhas.append("|---" * (len(nomes) + 1) + "|")
+    destaques = []
+    for rotulo, extrair, menor_melhor in indicadores:
+        valores = [float(extrair(dados['metricas'][nome]) or 0) for nome in nomes]
+        linhas.append(f"| {rotulo} | " + " | ".join(f"{v:.1f}" for v in valores) + " |")
+        if menor_melhor is not None and len(set(valores)) > 1:
+            ordem = sorted(zip(valores, nomes), reverse=not menor_melhor)
+            destaques.append(f"- {rotulo}: melhor {ordem[0][1]} ({ordem[0][0]:.1f}), "
+                             f"pior {ordem[-1][1]} ({ordem[-1][0]:.1f})")
+    if destaques:
+        linhas += ["", "Destaques:"] + destaques
+    return "\n".join(linhas)
 
-def executar_pipeline():
-    """Executa o pipeline completo de análise com suporte a GPU"""
+def gerar_resposta_comparativa(query: str, dados: Dict, client: Any) -> str:
+    """
+    Resposta a uma comparação (preparar_dados_comparacao) em uma única chamada
+    à IA: o prompt traz a pergunta e as métricas de todas as entidades.
+    """
+    prompt = f"""
+    Pergunta do gestor: {query}
+
+    Métricas das entidades comparadas:
+    {json.dumps(dados['metricas'], ensure_ascii=False, indent=2)}
+
+    {tabela_comparativa(dados)}
+
+    Responda à pergunta comparando as entidades com base nesses dados: aponte as
+    diferenças relevantes, possíveis causas e recomendações para cada uma.
+    """
+    resposta = client.chat.completions.create(
+        model="gpt-4-1106-preview",
+        messages=[
+            {"role": "system", "content": "Você é um especialista em agilidade e gestão de times, claro e objetivo."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.7,
+        max_tokens=800
+    )
+    return resposta.choices[0].message.content.strip()
+
+def executar_pipeline(carregamento_paralelo: bool = False, executivo_em_blocos: bool = False,
+                      incremental: bool = False, cruzamento_pre_agregado: bool = True,
+                      erro_quantis: Optional[float] = None, armazenar: bool = True,
+                      processos: Optional[int] = None, alocacao_por_quarter: bool = False,
+                      device: Optional[str] = None,
+                      linhas_minimas_particionamento: int = LINHAS_MINIMAS_PARTICIONAMENTO):
+    """
+    Executa o pipeline completo de análise.
+    Com carregamento_paralelo=True, as planilhas são lidas em um pool de processos.
+    Com executivo_em_blocos=True, o Executivo é lido e agregado em blocos, mantendo
+    a memória estável à medida que o histórico cresce; uma leitura prévia só das
+    colunas de chave dá os pesos do merge por squad, e os insights são os mesmos
+    do cruzamento completo (ver cruzar_dados_em_blocos).
+    Com incremental=True, apenas tribos e squads afetados por linhas alteradas desde
+    a última execução são recalculados (ver incremental.py).
+    Com cruzamento_pre_agregado=True (padrão), o Executivo é agregado por chave antes
+    do cruzamento (ver juncao.py), evitando a explosão de linhas do merge duplo; os
+    insights são os mesmos do cruzamento completo.
+    Com erro_quantis (ex.: 0.01), os percentis do modo em blocos e do cruzamento
+    completo vêm de esboços de quantis mescláveis (ver quantis.py), com memória
+    limitada e erro de posto de até erro_quantis.
+    Com armazenar=True (padrão), análises e estrutura são gravadas no armazém
+    (ver armazem.py), que insights.py reabre enquanto as entradas não mudarem.
+    Com processos > 1, o cruzamento completo é agregado em shards por tribo e
+    por squad em um pool de processos (ver particionamento.py), quando tiver ao
+    menos linhas_minimas_particionamento linhas.
+    Com alocacao_por_quarter=True, os PBIs de cada quarter são atribuídos às alocações
+    vigentes naquele quarter (startDate/endDate, ver intervalos.py), e não às ativas
+    hoje; nesse caso incremental é ignorado, pois o modo incremental só conhece as
+    alocações ativas.
+    Fora do modo incremental, o cruzamento (ou seus blocos) também alimenta o cubo de
+    métricas por (Tribo, squad, Ano, Quarter) (ver cubo.py), que acompanha as análises
+    e o armazém para o chat responder por quarter. Com erro_quantis, os insights de
+    tribos e squads do modo em blocos e do cruzamento completo são lidos do rollup do cubo.
+    As estatísticas da organização (todas as tribos) ficam em estrutura['organizacao'].
+    device ('cuda' ou 'cpu'; padrão: detectado) escolhe o backend de cálculo (ver
+    computacao.py) das estatísticas por tribo e squad do cruzamento completo.
+    """
     try:
-        # Detecta dispositivo
-        device = get_device()
-        logging.info(f"Usando dispositivo: {device}")
+        garantir_diretorios()
         
         # Carregar dados
-        dados = carregar_dados()
+        fontes = ['maturidade', 'alocacao'] if executivo_em_blocos else None
+        dados = carregar_dados(paralelo=carregamento_paralelo, fontes=fontes)
         if not dados:
             logging.error("Falha ao carregar dados")
             return None
-            
-        # Processa dados em paralelo
-        dados_processados = processar_dados_paralelo(dados, device)
+        colunas_originais = {nome: list(df.columns) for nome, df in dados.items()}
         
         # Padronizar IDs
         dados = padronizar_ids(dados)
@@ -1453,13 +1473,48 @@ def executar_pipeline():
             return None
             
         # Cruzar dados robusto
-        if 'maturidade' in dados and 'alocacao' in dados and 'executivo' in dados:
-            df_cruzado = cruzar_dados_completo(dados['maturidade'], dados['alocacao'], dados['executivo'])
-            print(f"Cruzamento completo: {len(df_cruzado)} linhas")
-            print(df_cruzado[['Tribo', 'tribe', 'squad', 'Ano', 'Quarter', 'Chave_DataTribo', 'Chave_DataSquad']].head())
-            
-            # Gerar estrutura e insights
-            estrutura, insights_tribos, insights_squads = gerar_estrutura_e_insights(df_cruzado)
+        cubo = None
+        if executivo_em_blocos and 'maturidade' in dados and 'alocacao' in dados:
+            # Primeira leitura só das chaves: multiplicidade do merge por squad
+            linhas_executivo = contar_linhas_executivo(ler_planilha_em_blocos(
+                ARQUIVO_EXECUTIVO, sheet_name='NewBusinessAgility', esquema=esquema_chaves_executivo()))
+            blocos = ler_planilha_em_blocos(ARQUIVO_EXECUTIVO, sheet_name='NewBusinessAgility',
+                                            esquema=obter_esquema('executivo'))
+            cubo = CuboMetricas(erro_quantis or ERRO_PADRAO)
+            estrutura, insights_tribos, insights_squads = gerar_estrutura_e_insights(
+                cruzar_dados_em_blocos(dados['maturidade'], dados['alocacao'], blocos,
+                                       por_quarter=alocacao_por_quarter,
+                                       linhas_executivo=linhas_executivo),
+                erro_quantis=erro_quantis, cubo=cubo)
+            print(f"Tribos reconhecidas: {list(estrutura['tribos'].keys())}")
+            print(f"Squads reconhecidos: {list(estrutura['squads'].keys())[:10]}")
+        elif incremental and not alocacao_por_quarter and 'maturidade' in dados and 'alocacao' in dados and 'executivo' in dados:
+            estrutura, insights_tribos, insights_squads = gerar_estrutura_e_insights_incremental(
+                dados, colunas_originais)
+            print(f"Tribos reconhecidas: {list(estrutura['tribos'].keys())}")
+            print(f"Squads reconhecidos: {list(estrutura['squads'].keys())[:10]}")
+        elif 'maturidade' in dados and 'alocacao' in dados and 'executivo' in dados:
+            cubo = CuboMetricas(erro_quantis or ERRO_PADRAO)
+            if cruzamento_pre_agregado:
+                pessoas = preparar_pessoas_ativas(dados['maturidade'], dados['alocacao'],
+                                                  por_quarter=alocacao_por_quarter)
+                df_executivo = normalizar_chaves_executivo(dados['executivo'])
+                print(f"Cruzamento pré-agregado: {len(pessoas)} pessoas, {len(df_executivo)} PBIs")
+                print(pessoas[['Tribo', 'tribe', 'squad', 'Ano', 'Quarter', 'Chave_DataTribo', 'Chave_DataSquad']].head())
+                estrutura, insights_tribos, insights_squads = gerar_estrutura_e_insights_pre_agregado(
+                    pessoas, df_executivo)
+                cubo.adicionar_pre_agregado(pessoas, df_executivo)
+            else:
+                df_cruzado = cruzar_dados_completo(dados['maturidade'], dados['alocacao'], dados['executivo'],
+                                                   por_quarter=alocacao_por_quarter)
+                print(f"Cruzamento completo: {len(df_cruzado)} linhas")
+                print(df_cruzado[['Tribo', 'tribe', 'squad', 'Ano', 'Quarter', 'Chave_DataTribo', 'Chave_DataSquad']].head())
+                
+                # Gerar estrutura e insights
+                estrutura, insights_tribos, insights_squads = gerar_estrutura_e_insights(
+                    df_cruzado, erro_quantis=erro_quantis, processos=processos, cubo=cubo,
+                    backend=obter_backend(device),
+                    linhas_minimas_particionamento=linhas_minimas_particionamento)
             print(f"Tribos reconhecidas: {list(estrutura['tribos'].keys())}")
             print(f"Squads reconhecidos: {list(estrutura['squads'].keys())[:10]}")
             
@@ -1473,6 +1528,10 @@ def executar_pipeline():
         else:
             logging.error("Dados insuficientes para cruzamento completo")
             return None
+
+        # Estatísticas da organização (todas as tribos), gravadas com a estrutura
+        if cubo is not None:
+            estrutura['organizacao'] = cubo.organizacao()
             
         # Gera análises
         analises = []
@@ -1491,6 +1550,11 @@ def executar_pipeline():
                 "insights": insight,
                 "descricao": f"Análise do squad {squad} com {insight.get('total_pessoas', 0)} pessoas. Lead time médio: {insight.get('lead_time_medio', 0):.1f} dias, throughput: {insight.get('throughput', 0)} entregas."
             })
+
+        analises = ColecaoAnalises(analises, estrutura, cubo)
+        if armazenar:
+            salvar_analises(analises, estrutura, parametros_pipeline(executivo_em_blocos, erro_quantis,
+                                                                       alocacao_por_quarter), cubo=cubo)
             
         return analises
         
@@ -1884,95 +1948,148 @@ def printar_tribos_squads():
     print('Tribos:', list(estrutura['tribos'].keys()) if estrutura and 'tribos' in estrutura else [])
     print('Squads:', list(estrutura['squads'].keys()) if estrutura and 'squads' in estrutura else [])
 
-def cruzar_dados_completo(df_maturidade, df_alocacao, df_executivo):
+def preparar_pessoas_ativas(df_maturidade, df_alocacao, por_quarter: bool = False):
     """
-    Cruza os dados dos três arquivos conforme o relacionamento de chaves descrito pelo usuário.
-    Retorna DataFrame cruzado com métricas do Executivo associadas a tribos e squads reais.
+    Cruza Maturidade com as alocações ativas pelo nome normalizado da tribo e gera
+    as chaves compostas (Chave_DataTribo, Chave_DataSquad) usadas para cruzar com o Executivo.
+    Com por_quarter=True, cada linha de Maturidade é cruzada com as alocações que se
+    sobrepõem ao seu Ano/Quarter (startDate/endDate), em vez das ativas hoje, de modo
+    que os PBIs de um quarter contam para quem estava alocado nele (ver intervalos.py).
     """
-    import pandas as pd
-    # Normalizar nomes de tribo e squad
-    df_maturidade['tribo_norm'] = df_maturidade['Tribo'].str.strip().str.lower().fillna('')
-    df_alocacao['tribe_norm'] = df_alocacao['tribe'].str.strip().str.lower().fillna('')
-    df_alocacao['squad_norm'] = df_alocacao['squad'].str.strip().str.lower().fillna('')
-    # Filtrar apenas pessoas ativas
-    df_alocacao_ativas = df_alocacao[df_alocacao['endDate'].isna() | (pd.to_datetime(df_alocacao['endDate'], errors='coerce') > pd.Timestamp.now())].copy()
-    # Merge Maturidade <-> Alocação por nome normalizado da tribo
-    merged = pd.merge(df_maturidade, df_alocacao_ativas, left_on='tribo_norm', right_on='tribe_norm', how='inner', suffixes=('_mat', '_aloc'))
-    # Gerar chaves compostas para cruzar com Executivo
+    # Normalizar nomes de tribo e squad (mesma chave canônica de padronizar_ids)
+    df_maturidade['tribo_norm'] = normalizar_serie(df_maturidade['Tribo'])
+    df_alocacao['tribe_norm'] = normalizar_serie(df_alocacao['tribe'])
+    df_alocacao['squad_norm'] = normalizar_serie(df_alocacao['squad'])
+    if por_quarter:
+        merged = alocacoes_por_quarter(df_maturidade, df_alocacao)
+    else:
+        # Filtrar apenas pessoas ativas
+        df_alocacao_ativas = df_alocacao[df_alocacao['endDate'].isna() | (pd.to_datetime(df_alocacao['endDate'], errors='coerce') > pd.Timestamp.now())].copy()
+        # Merge Maturidade <-> Alocação por nome normalizado da tribo
+        merged = pd.merge(df_maturidade, df_alocacao_ativas, left_on='tribo_norm', right_on='tribe_norm', how='inner', suffixes=('_mat', '_aloc'))
+    # Chaves inteiras (ano, quarter, id) usadas nos merges com o Executivo
+    merged['Chave_IntTribo'] = chaves_de_colunas(merged['Ano'], merged['Quarter'], merged['tribeID'])
+    merged['Chave_IntSquad'] = chaves_de_colunas(merged['Ano'], merged['Quarter'], merged['squadID'])
+    # Gerar chaves compostas textuais (exibição e detecção de alterações)
     merged['Ano'] = merged['Ano'].astype(str)
     merged['Quarter'] = merged['Quarter'].astype(str)
     merged['Chave_DataTribo'] = merged['Ano'] + merged['Quarter'] + merged['tribeID'].astype(str)
     merged['Chave_DataSquad'] = merged['Ano'] + merged['Quarter'] + merged['squadID'].astype(str)
-    # Normalizar chaves no Executivo
-    df_executivo['Chave_DataTribo'] = df_executivo['PBI_Concuidos_Executivo[Chave_DataTribo]'].astype(str).str.strip()
-    df_executivo['Chave_DataSquad'] = df_executivo['PBI_Concuidos_Executivo[Chave_DataSquad]'].astype(str).str.strip()
-    # Merge com Executivo por Chave_DataTribo e Chave_DataSquad
-    merged = pd.merge(merged, df_executivo, left_on='Chave_DataTribo', right_on='Chave_DataTribo', how='left', suffixes=('', '_exec'))
-    merged = pd.merge(merged, df_executivo, left_on='Chave_DataSquad', right_on='Chave_DataSquad', how='left', suffixes=('', '_exec_squad'))
     return merged
 
-def gerar_estrutura_e_insights(df_cruzado):
+def normalizar_chaves_executivo(df_executivo):
+    """Cria as colunas Chave_DataTribo e Chave_DataSquad normalizadas no Executivo"""
+    df_executivo['Chave_DataTribo'] = serie_como_texto(df_executivo['PBI_Concuidos_Executivo[Chave_DataTribo]'])
+    df_executivo['Chave_DataSquad'] = serie_como_texto(df_executivo['PBI_Concuidos_Executivo[Chave_DataSquad]'])
+    df_executivo['Chave_IntTribo'] = chaves_de_texto(df_executivo['PBI_Concuidos_Executivo[Chave_DataTribo]'])
+    df_executivo['Chave_IntSquad'] = chaves_de_texto(df_executivo['PBI_Concuidos_Executivo[Chave_DataSquad]'])
+    return df_executivo
+
+def cruzar_dados_completo(df_maturidade, df_alocacao, df_executivo, por_quarter: bool = False):
+    """
+    Cruza os dados dos três arquivos conforme o relacionamento de chaves descrito pelo usuário.
+    Retorna DataFrame cruzado com métricas do Executivo associadas a tribos e squads reais.
+    """
+    merged = preparar_pessoas_ativas(df_maturidade, df_alocacao, por_quarter=por_quarter)
+    df_executivo = normalizar_chaves_executivo(df_executivo)
+    return cruzar_pessoas_executivo(merged, df_executivo)
+
+def cruzar_pessoas_executivo(merged, df_executivo):
+    """Cruza as pessoas ativas (preparar_pessoas_ativas) com o Executivo já normalizado"""
+    # Merge com Executivo pelas chaves inteiras de tribo e squad. A chave textual
+    # do lado do Executivo é descartada para manter as colunas do merge por texto.
+    merged = pd.merge(merged, df_executivo.drop(columns=['Chave_DataTribo']), on='Chave_IntTribo', how='left', suffixes=('', '_exec'))
+    merged = pd.merge(merged, df_executivo.drop(columns=['Chave_DataSquad']), on='Chave_IntSquad', how='left', suffixes=('', '_exec_squad'))
+    return merged
+
+def contar_linhas_executivo(blocos_executivo) -> Dict[str, pd.Series]:
+    """
+    Linhas do Executivo por chave inteira de tribo e de squad, somadas bloco a
+    bloco. Basta que os blocos tragam as colunas de chave (ver esquema_chaves_executivo).
+    """
+    contagens = {COLUNA_CHAVE_TRIBO: [], COLUNA_CHAVE_SQUAD: []}
+    for bloco in blocos_executivo:
+        contagens[COLUNA_CHAVE_TRIBO].append(pd.Series(
+            chaves_de_texto(bloco['PBI_Concuidos_Executivo[Chave_DataTribo]'])).value_counts(sort=False))
+        contagens[COLUNA_CHAVE_SQUAD].append(pd.Series(
+            chaves_de_texto(bloco['PBI_Concuidos_Executivo[Chave_DataSquad]'])).value_counts(sort=False))
+    return {coluna: (pd.concat(lista).groupby(level=0, sort=False).sum() if lista
+                     else pd.Series(dtype=np.int64))
+            for coluna, lista in contagens.items()}
+
+def esquema_chaves_executivo():
+    """Esquema do Executivo restrito às colunas de chave, para a contagem em contar_linhas_executivo"""
+    colunas = obter_esquema('executivo')['colunas']
+    return {'colunas': {c: colunas[c] for c in ('PBI_Concuidos_Executivo[Chave_DataTribo]',
+                                                'PBI_Concuidos_Executivo[Chave_DataSquad]')}}
+
+def cruzar_dados_em_blocos(df_maturidade, df_alocacao, blocos_executivo, por_quarter: bool = False,
+                           linhas_executivo: Optional[Dict[str, pd.Series]] = None):
+    """
+    Versão em streaming de cruzar_dados_completo para Executivos muito grandes.
+
+    Gera primeiro as pessoas ativas (sem métricas), para que a estrutura inclua
+    tribos e squads sem PBIs, e depois o cruzamento de cada bloco do Executivo
+    pela chave de tribo. O segundo merge, pela chave de squad, não é repetido:
+    no cruzamento completo ele repete cada linha de pessoa uma vez por PBI da
+    sua chave de squad (ou 1, se não houver), e essa multiplicidade vai na
+    coluna COLUNA_PESO, como em juncao.py. Os blocos pesados produzem as mesmas
+    estatísticas do cruzamento completo. As pessoas sem PBIs na chave de tribo
+    levam o peso da linha que o merge à esquerda manteria; as demais, peso 0.
+
+    A multiplicidade depende do Executivo inteiro. linhas_executivo
+    (contar_linhas_executivo) traz essas contagens, por exemplo de uma leitura
+    prévia só das colunas de chave; sem ele, os blocos são materializados e
+    contados antes do cruzamento.
+    """
+    if linhas_executivo is None:
+        blocos_executivo = list(blocos_executivo)
+        linhas_executivo = contar_linhas_executivo(blocos_executivo)
+    pessoas = preparar_pessoas_ativas(df_maturidade, df_alocacao, por_quarter=por_quarter)
+    pesos = multiplicidade(pessoas[COLUNA_CHAVE_SQUAD], linhas_executivo[COLUNA_CHAVE_SQUAD])
+    com_pbis = pessoas[COLUNA_CHAVE_TRIBO].isin(linhas_executivo[COLUNA_CHAVE_TRIBO].index).to_numpy()
+    yield pessoas.assign(**{COLUNA_PESO: np.where(com_pbis, 0, pesos)})
+    pessoas = pessoas.assign(**{COLUNA_PESO: pesos})
+    for bloco in blocos_executivo:
+        bloco = normalizar_chaves_executivo(bloco)
+        yield pd.merge(pessoas, bloco.drop(columns=['Chave_DataTribo']), on='Chave_IntTribo', how='inner', suffixes=('', '_exec'))
+
+def gerar_estrutura_e_insights(df_cruzado, erro_quantis: Optional[float] = None,
+                               processos: Optional[int] = None, cubo: Optional[CuboMetricas] = None,
+                               backend: Optional[BackendCalculo] = None,
+                               linhas_minimas_particionamento: int = LINHAS_MINIMAS_PARTICIONAMENTO):
     """
     Popula a estrutura organizacional, calcula métricas e gera insights para cada tribo e squad a partir do DataFrame cruzado.
     Retorna estrutura, métricas e insights por tribo e squad.
+    Aceita também um iterável de blocos (ver cruzar_dados_em_blocos), agregados incrementalmente.
+    DataFrames são agregados em uma única passada vetorizada (ver agregacao.agregar_dataframe).
+    Com erro_quantis, os percentis são aproximados por esboços mescláveis (ver quantis.py).
+    Com processos > 1, DataFrames com ao menos linhas_minimas_particionamento linhas são
+    agregados em shards por tribo e por squad em um pool de processos, com o mesmo
+    resultado (ver particionamento.py).
+    Com cubo, o DataFrame ou cada bloco também é incorporado ao cubo (ver cubo.py), na
+    mesma passada; com cubo e erro_quantis, os insights de tribos e squads vêm do rollup
+    do cubo e os blocos só alimentam a estrutura.
+    Com backend, as estatísticas por entidade do DataFrame (agregar_dataframe) são
+    calculadas nele (ver computacao.py).
     """
-    import numpy as np
-    estrutura = {'tribos': {}, 'squads': {}, 'pessoas': set()}
-    insights_tribos = {}
-    insights_squads = {}
-    # Tribos
-    for tribo in df_cruzado['Tribo'].dropna().unique():
-        df_tribo = df_cruzado[df_cruzado['Tribo'] == tribo]
-        squads = df_tribo['squad'].dropna().unique().tolist()
-        pessoas = df_tribo['person'].dropna().unique().tolist()
-        estrutura['tribos'][tribo] = {'squads': squads, 'pessoas': pessoas}
-        estrutura['pessoas'].update(pessoas)
-        # Métricas de fluxo
-        lead_times = df_tribo['[SumLead_Time]'].dropna().astype(float).tolist() if '[SumLead_Time]' in df_tribo else []
-        cycle_times = df_tribo['[SumCycle_Time]'].dropna().astype(float).tolist() if '[SumCycle_Time]' in df_tribo else []
-        story_points = df_tribo['[SumStory_Points]'].dropna().astype(float).tolist() if '[SumStory_Points]' in df_tribo else []
-        throughput = df_tribo['PBI_Concuidos_Executivo[Key]'].nunique() if 'PBI_Concuidos_Executivo[Key]' in df_tribo else 0
-        insights_tribos[tribo] = {
-            'lead_time_medio': float(np.mean(lead_times)) if lead_times else 0,
-            'lead_time_mediana': float(np.median(lead_times)) if lead_times else 0,
-            'lead_time_p75': float(np.percentile(lead_times, 75)) if lead_times else 0,
-            'lead_time_p95': float(np.percentile(lead_times, 95)) if lead_times else 0,
-            'cycle_time_medio': float(np.mean(cycle_times)) if cycle_times else 0,
-            'cycle_time_mediana': float(np.median(cycle_times)) if cycle_times else 0,
-            'cycle_time_p75': float(np.percentile(cycle_times, 75)) if cycle_times else 0,
-            'cycle_time_p95': float(np.percentile(cycle_times, 95)) if cycle_times else 0,
-            'story_points_medio': float(np.mean(story_points)) if story_points else 0,
-            'throughput': throughput,
-            'total_pessoas': len(pessoas),
-            'total_squads': len(squads)
-        }
-    # Squads
-    for squad in df_cruzado['squad'].dropna().unique():
-        df_squad = df_cruzado[df_cruzado['squad'] == squad]
-        pessoas = df_squad['person'].dropna().unique().tolist()
-        tribos = df_squad['Tribo'].dropna().unique().tolist()
-        estrutura['squads'][squad] = {'tribos': tribos, 'pessoas': pessoas}
-        estrutura['pessoas'].update(pessoas)
-        lead_times = df_squad['[SumLead_Time]'].dropna().astype(float).tolist() if '[SumLead_Time]' in df_squad else []
-        cycle_times = df_squad['[SumCycle_Time]'].dropna().astype(float).tolist() if '[SumCycle_Time]' in df_squad else []
-        story_points = df_squad['[SumStory_Points]'].dropna().astype(float).tolist() if '[SumStory_Points]' in df_squad else []
-        throughput = df_squad['PBI_Concuidos_Executivo[Key]'].nunique() if 'PBI_Concuidos_Executivo[Key]' in df_squad else 0
-        insights_squads[squad] = {
-            'lead_time_medio': float(np.mean(lead_times)) if lead_times else 0,
-            'lead_time_mediana': float(np.median(lead_times)) if lead_times else 0,
-            'lead_time_p75': float(np.percentile(lead_times, 75)) if lead_times else 0,
-            'lead_time_p95': float(np.percentile(lead_times, 95)) if lead_times else 0,
-            'cycle_time_medio': float(np.mean(cycle_times)) if cycle_times else 0,
-            'cycle_time_mediana': float(np.median(cycle_times)) if cycle_times else 0,
-            'cycle_time_p75': float(np.percentile(cycle_times, 75)) if cycle_times else 0,
-            'cycle_time_p95': float(np.percentile(cycle_times, 95)) if cycle_times else 0,
-            'story_points_medio': float(np.mean(story_points)) if story_points else 0,
-            'throughput': throughput,
-            'total_pessoas': len(pessoas),
-            'total_tribos': len(tribos)
-        }
-    estrutura['pessoas'] = list(estrutura['pessoas'])
-    return estrutura, insights_tribos, insights_squads
+    if cubo is not None:
+        if isinstance(df_cruzado, pd.DataFrame):
+            cubo.adicionar(df_cruzado)
+        else:
+            df_cruzado = cubo.alimentar(df_cruzado)
+        if erro_quantis is not None:
+            blocos = [df_cruzado] if isinstance(df_cruzado, pd.DataFrame) else df_cruzado
+            estrutura, _, _ = agregar_em_blocos(blocos, metricas=False)
+            return (estrutura,) + insights_do_cubo(cubo, estrutura)
+    if erro_quantis is not None:
+        blocos = [df_cruzado] if isinstance(df_cruzado, pd.DataFrame) else df_cruzado
+        return agregar_em_blocos(blocos, erro_quantis=erro_quantis)
+    if not isinstance(df_cruzado, pd.DataFrame):
+        return agregar_em_blocos(df_cruzado)
+    if processos is not None and processos > 1:
+        return agregar_particionado(df_cruzado, processos, linhas_minimas=linhas_minimas_particionamento)
+    return agregar_dataframe(df_cruzado, backend=backend)
 
 # No pipeline, após carregar os dados:
 # dados = carregar_dados()
@@ -0,0 +1,147 @@
+"""
+Agente Insights - Módulo do Armazém de Análises
+==============================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Persistência do resultado do pipeline (lista de análises, estrutura
+organizacional e cubo de métricas) para que o chat comece sem reexecutar carga, normalização,
+cruzamento e agregação. O artefato é versionado e guarda a assinatura das
+entradas: tamanho, mtime e SHA-256 de cada planilha de origem, além dos
+parâmetros do pipeline. Ele só é reaproveitado quando a assinatura confere;
+como em cache_dados, tamanho e mtime iguais dispensam o hash, e um mtime
+diferente com o mesmo conteúdo ainda vale.
+"""
+
+import logging
+import os
+import pickle
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import config
+from .cache_dados import calcular_hash_arquivo, gravar_atomico
+from .colecao import ColecaoAnalises
+
+DIRETORIO_ARMAZEM = os.path.join(str(config.OUTPUT_DIR), 'armazem')
+VERSAO_ARMAZEM = 2
+
+ARQUIVOS_ENTRADA = {
+    'maturidade': str(config.ARQUIVO_MATURIDADE),
+    'alocacao': str(config.ARQUIVO_ALOCACAO),
+    'executivo': str(config.ARQUIVO_EXECUTIVO)
+}
+
+
+def parametros_pipeline(executivo_em_blocos: bool = False, erro_quantis: Optional[float] = None,
+                        alocacao_por_quarter: bool = False) -> Dict[str, Any]:
+    """Parâmetros de executar_pipeline que alteram as análises (os demais só mudam o desempenho)"""
+    return {'executivo_em_blocos': executivo_em_blocos, 'erro_quantis': erro_quantis,
+            'alocacao_por_quarter': alocacao_por_quarter}
+
+
+def _caminho_artefato(diretorio: str) -> str:
+    return os.path.join(diretorio, 'analises.pkl')
+
+
+def assinatura_entradas(arquivos: Optional[Dict[str, str]] = None) -> Optional[Dict[str, Dict[str, Any]]]:
+    """Tamanho, mtime e hash de cada arquivo de entrada, ou None se algum faltar"""
+    assinatura = {}
+    for fonte, caminho in (arquivos or ARQUIVOS_ENTRADA).items():
+        if not os.path.exists(caminho):
+            return None
+        stat = os.stat(caminho)
+        assinatura[fonte] = {
+            'caminho': os.path.abspath(caminho),
+            'tamanho': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': calcular_hash_arquivo(caminho)
+        }
+    return assinatura
+
+
+def _entradas_inalteradas(gravadas: Dict[str, Dict[str, Any]], arquivos: Dict[str, str]) -> bool:
+    if set(gravadas) != set(arquivos):
+        return False
+    for fonte, caminho in arquivos.items():
+        info = gravadas[fonte]
+        if info['caminho'] != os.path.abspath(caminho) or not os.path.exists(caminho):
+            return False
+        stat = os.stat(caminho)
+        if stat.st_size != info['tamanho']:
+            return False
+        if stat.st_mtime_ns != info['mtime_ns'] and calcular_hash_arquivo(caminho) != info['hash']:
+            return False
+    return True
+
+
+def salvar_analises(analises: List[Dict], estrutura: Dict, parametros: Optional[Dict[str, Any]] = None,
+                    arquivos: Optional[Dict[str, str]] = None,
+                    diretorio: str = DIRETORIO_ARMAZEM, cubo=None) -> bool:
+    """
+    Grava análises, estrutura e o cubo de métricas (CuboMetricas, se houver)
+    com a assinatura atual das entradas.
+
+    Returns:
+        True se o artefato foi gravado
+    """
+    arquivos = arquivos or ARQUIVOS_ENTRADA
+    entradas = assinatura_entradas(arquivos)
+    if entradas is None:
+        logging.warning("Armazém de análises não gravado: arquivos de entrada ausentes")
+        return False
+    artefato = {
+        'versao': VERSAO_ARMAZEM,
+        'gerado_em': datetime.now().isoformat(),
+        'entradas': entradas,
+        'parametros': parametros_pipeline() if parametros is None else parametros,
+        'analises': list(analises),
+        'estrutura': estrutura,
+        'cubo': cubo
+    }
+
+    def escrever(destino):
+        with open(destino, 'wb') as f:
+            pickle.dump(artefato, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    try:
+        os.makedirs(diretorio, exist_ok=True)
+        gravar_atomico(_caminho_artefato(diretorio), escrever)
+    except (OSError, pickle.PicklingError) as e:
+        logging.warning(f"Não foi possível gravar o armazém de análises: {str(e)}")
+        return False
+    logging.info(f"Armazém de análises gravado: {len(analises)} análises")
+    return True
+
+
+def carregar_analises(parametros: Optional[Dict[str, Any]] = None,
+                      arquivos: Optional[Dict[str, str]] = None,
+                      diretorio: str = DIRETORIO_ARMAZEM) -> Optional[Tuple[List[Dict], Dict]]:
+    """
+    Abre o artefato gravado se as entradas e os parâmetros não mudaram.
+
+    Returns:
+        Tupla (analises, estrutura), com as análises em uma ColecaoAnalises (com o
+        cubo gravado), ou None se for preciso executar o pipeline
+    """
+    try:
+        with open(_caminho_artefato(diretorio), 'rb') as f:
+            artefato = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    if artefato.get('versao') != VERSAO_ARMAZEM:
+        return None
+    if artefato.get('parametros') != (parametros_pipeline() if parametros is None else parametros):
+        logging.info("Armazém de análises gerado com outros parâmetros; reexecutando o pipeline")
+        return None
+    if not _entradas_inalteradas(artefato['entradas'], arquivos or ARQUIVOS_ENTRADA):
+        logging.info("Entradas alteradas desde o armazém de análises; reexecutando o pipeline")
+        return None
+    logging.info(f"Análises carregadas do armazém (geradas em {artefato['gerado_em']})")
+    return (ColecaoAnalises(artefato['analises'], artefato['estrutura'], artefato['cubo']),
+            artefato['estrutura'])
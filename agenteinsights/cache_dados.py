@@ -0,0 +1,190 @@
+"""
+Agente Insights - Módulo de Cache de Dados
+=========================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Cache colunar em disco para as planilhas de origem. Cada aba lida é gravada
+em Parquet junto com os metadados do arquivo de origem (caminho, tamanho,
+mtime e hash do conteúdo). Execuções seguintes carregam o Parquet em vez de
+reprocessar o XML do Excel, e apenas a planilha que mudou é relida.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+from .esquemas import aplicar_esquema, assinatura_esquema, filtro_colunas
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, 'output', 'cache')
+
+# Incrementar quando o formato dos arquivos de cache mudar
+VERSAO_CACHE = 1
+
+
+def parquet_disponivel() -> bool:
+    """Verifica se há engine Parquet instalada (pyarrow ou fastparquet)"""
+    for modulo in ('pyarrow', 'fastparquet'):
+        try:
+            __import__(modulo)
+            return True
+        except ImportError:
+            continue
+    return False
+
+
+def calcular_hash_arquivo(caminho: str, tamanho_bloco: int = 1 << 20) -> str:
+    """Calcula o SHA-256 do conteúdo de um arquivo, lendo em blocos"""
+    sha = hashlib.sha256()
+    with open(caminho, 'rb') as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b''):
+            sha.update(bloco)
+    return sha.hexdigest()
+
+
+def _caminhos_cache(caminho: str, sheet_name: Any, cache_dir: str) -> Tuple[str, str]:
+    """Retorna os caminhos do Parquet e dos metadados para uma aba de um arquivo"""
+    identificador = f"{os.path.abspath(caminho)}|{sheet_name}"
+    sufixo = hashlib.sha1(identificador.encode('utf-8')).hexdigest()[:12]
+    base = os.path.join(cache_dir, f"{Path(caminho).stem}_{sufixo}")
+    return base + '.parquet', base + '.json'
+
+
+def _ler_metadados(caminho_meta: str) -> Optional[Dict[str, Any]]:
+    try:
+        with open(caminho_meta, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def gravar_atomico(caminho: str, escrever) -> None:
+    """Grava em arquivo temporário e renomeia, evitando cache corrompido"""
+    temporario = f"{caminho}.tmp{os.getpid()}"
+    try:
+        escrever(temporario)
+        os.replace(temporario, caminho)
+    finally:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+
+def _gravar_metadados(caminho_meta: str, meta: Dict[str, Any]) -> None:
+    def escrever(destino):
+        with open(destino, 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+    gravar_atomico(caminho_meta, escrever)
+
+
+def _ler_excel(caminho: str, sheet_name: Any, esquema: Optional[Dict[str, Any]], **kwargs_excel) -> pd.DataFrame:
+    """Lê a aba do Excel projetando e tipando as colunas conforme o esquema"""
+    if esquema:
+        kwargs_excel.setdefault('usecols', filtro_colunas(esquema))
+    df = pd.read_excel(caminho, sheet_name=sheet_name, **kwargs_excel)
+    return aplicar_esquema(df, esquema)
+
+
+def ler_planilha(caminho: str,
+                 sheet_name: Any = 0,
+                 usar_cache: bool = True,
+                 cache_dir: Optional[str] = None,
+                 esquema: Optional[Dict[str, Any]] = None,
+                 **kwargs_excel) -> pd.DataFrame:
+    """
+    Lê uma aba de planilha Excel usando o cache colunar quando possível.
+
+    O cache é considerado válido quando tamanho e mtime do arquivo de origem
+    coincidem com os metadados gravados. Se apenas o mtime mudou (ex.: arquivo
+    copiado novamente), o hash do conteúdo decide se a planilha precisa ser
+    relida.
+
+    Args:
+        caminho: Caminho do arquivo Excel
+        sheet_name: Aba a ser lida (mesma semântica de pd.read_excel)
+        usar_cache: Se False, lê diretamente o Excel sem consultar/gravar cache
+        cache_dir: Diretório do cache (padrão: output/cache)
+        esquema: Colunas e tipos a aplicar na leitura (ver esquemas.py);
+            mudar o esquema invalida o cache
+        **kwargs_excel: Argumentos adicionais repassados a pd.read_excel
+
+    Returns:
+        DataFrame com os dados da aba
+    """
+    if not usar_cache or not parquet_disponivel():
+        if usar_cache:
+            logging.warning("Engine Parquet indisponível; cache de planilhas desativado")
+        return _ler_excel(caminho, sheet_name, esquema, **kwargs_excel)
+
+    assinatura = assinatura_esquema(esquema)
+    cache_dir = cache_dir or CACHE_DIR
+    caminho_parquet, caminho_meta = _caminhos_cache(caminho, sheet_name, cache_dir)
+    stat = os.stat(caminho)
+    meta = _ler_metadados(caminho_meta)
+    hash_atual = None
+
+    if (meta
+            and meta.get('versao') == VERSAO_CACHE
+            and meta.get('sheet_name') == str(sheet_name)
+            and meta.get('assinatura') == assinatura
+            and meta.get('tamanho') == stat.st_size
+            and os.path.exists(caminho_parquet)):
+        valido = meta.get('mtime_ns') == stat.st_mtime_ns
+        if not valido:
+            hash_atual = calcular_hash_arquivo(caminho)
+            valido = meta.get('hash') == hash_atual
+            if valido:
+                meta['mtime_ns'] = stat.st_mtime_ns
+                _gravar_metadados(caminho_meta, meta)
+        if valido:
+            try:
+                df = pd.read_parquet(caminho_parquet)
+                logging.info(f"Cache utilizado para {caminho} ({len(df)} linhas)")
+                return df
+            except Exception as e:
+                logging.warning(f"Cache ilegível para {caminho}, relendo planilha: {str(e)}")
+
+    df = _ler_excel(caminho, sheet_name, esquema, **kwargs_excel)
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        gravar_atomico(caminho_parquet, lambda destino: df.to_parquet(destino, index=False))
+        _gravar_metadados(caminho_meta, {
+            'versao': VERSAO_CACHE,
+            'origem': os.path.abspath(caminho),
+            'sheet_name': str(sheet_name),
+            'assinatura': assinatura,
+            'tamanho': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'hash': hash_atual or calcular_hash_arquivo(caminho),
+            'linhas': len(df)
+        })
+        logging.info(f"Cache atualizado para {caminho}")
+    except Exception as e:
+        # Colunas com tipos mistos não são serializáveis em Parquet; segue sem cache
+        logging.warning(f"Não foi possível gravar cache de {caminho}: {str(e)}")
+
+    return df
+
+
+def limpar_cache(cache_dir: Optional[str] = None) -> int:
+    """Remove os arquivos de cache e retorna a quantidade removida"""
+    cache_dir = cache_dir or CACHE_DIR
+    removidos = 0
+    if not os.path.isdir(cache_dir):
+        return removidos
+    for nome in os.listdir(cache_dir):
+        if nome.endswith(('.parquet', '.json')):
+            os.remove(os.path.join(cache_dir, nome))
+            removidos += 1
+    return removidos
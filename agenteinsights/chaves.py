@@ -0,0 +1,114 @@
+"""
+Agente Insights - Módulo de Chaves Substitutas
+=============================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Codificação das chaves de cruzamento com o Executivo (Ano + Quarter + ID de
+tribo/squad) em inteiros int64, para que os merges sejam feitos por hash de
+inteiros em vez de strings object.
+
+Layout da chave: ano << 44 | quarter << 40 | id (id < 2**40).
+
+Do lado das pessoas a chave é montada diretamente das colunas Ano, Quarter e
+tribeID/squadID; do lado do Executivo, as strings Chave_DataTribo/Squad
+(ex.: '2024Q110') são decompostas uma única vez por valor distinto. Linhas
+sem chave válida recebem sentinelas diferentes em cada lado, para nunca
+cruzarem entre si.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+BITS_ID = 40
+BITS_QUARTER = 4
+LIMITE_ID = 1 << BITS_ID
+
+# Sentinelas distintos: chave inválida de um lado não cruza com a do outro
+CHAVE_INVALIDA_PESSOAS = -1
+CHAVE_INVALIDA_EXECUTIVO = -2
+
+# Ano (4 dígitos), prefixo opcional do quarter ('Q', 'T'), quarter (1-4) e ID
+_RE_CHAVE = re.compile(r'^\s*(\d{4})\s*[A-Za-z]*\s*([1-4])\s*(\d+)(?:\.0+)?\s*$')
+# Quarter prefixado ('Q1', 'T1', '2024-Q1', 'Q1/2024') ou só o número ('1', '1.0')
+_RE_QUARTER = re.compile(r'(?<![A-Za-z])[QT]\s*([1-4])(?!\d)', re.IGNORECASE)
+_RE_QUARTER_NUMERO = re.compile(r'^([1-4])(?:\.0+)?$')
+
+
+def empacotar(ano: np.ndarray, quarter: np.ndarray, ident: np.ndarray,
+              invalida: int = CHAVE_INVALIDA_PESSOAS) -> np.ndarray:
+    """
+    Empacota arrays de ano, quarter e ID em chaves int64.
+
+    Entradas em float (NaN para ausentes). Posições com algum componente
+    ausente, não inteiro ou fora da faixa recebem o valor de `invalida`.
+    """
+    ano = np.asarray(ano, dtype=float)
+    quarter = np.asarray(quarter, dtype=float)
+    ident = np.asarray(ident, dtype=float)
+    with np.errstate(invalid='ignore'):
+        validas = ((ano >= 0) & (ano < (1 << 19)) & (ano == np.floor(ano))
+                   & (quarter >= 1) & (quarter <= 4) & (quarter == np.floor(quarter))
+                   & (ident >= 0) & (ident < LIMITE_ID) & (ident == np.floor(ident)))
+    chaves = np.full(len(ano), invalida, dtype=np.int64)
+    chaves[validas] = ((ano[validas].astype(np.int64) << (BITS_ID + BITS_QUARTER))
+                       | (quarter[validas].astype(np.int64) << BITS_ID)
+                       | ident[validas].astype(np.int64))
+    return chaves
+
+
+def desempacotar(chaves: np.ndarray):
+    """Inverso de empacotar: retorna (ano, quarter, id) como arrays int64"""
+    chaves = np.asarray(chaves, dtype=np.int64)
+    return (chaves >> (BITS_ID + BITS_QUARTER),
+            (chaves >> BITS_ID) & ((1 << BITS_QUARTER) - 1),
+            chaves & (LIMITE_ID - 1))
+
+
+def quarter_numerico(serie: pd.Series) -> np.ndarray:
+    """
+    Converte 'Q1', 'T1', 'Q1/2024', '1' ou 1 em 1.0; valores sem quarter
+    reconhecível viram NaN e, portanto, chaves inválidas em empacotar.
+    """
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        return pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    codigos, unicos = pd.factorize(serie)
+    valores = []
+    for valor in unicos:
+        texto = str(valor).strip()
+        achado = _RE_QUARTER.search(texto) or _RE_QUARTER_NUMERO.match(texto)
+        valores.append(float(achado.group(1)) if achado else np.nan)
+    return np.array(valores + [np.nan], dtype=float)[codigos]
+
+
+def numerico(serie: pd.Series) -> np.ndarray:
+    """Converte a coluna em float; valores não numéricos viram NaN"""
+    return pd.to_numeric(serie, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+
+
+def chaves_de_colunas(ano: pd.Series, quarter: pd.Series, ident: pd.Series,
+                      invalida: int = CHAVE_INVALIDA_PESSOAS) -> np.ndarray:
+    """Monta as chaves int64 a partir das colunas Ano, Quarter e tribeID/squadID"""
+    return empacotar(numerico(ano), quarter_numerico(quarter), numerico(ident), invalida)
+
+
+def chaves_de_texto(serie: pd.Series, invalida: int = CHAVE_INVALIDA_EXECUTIVO) -> np.ndarray:
+    """
+    Converte chaves textuais do Executivo ('2024Q110') em int64, decompondo
+    apenas os valores distintos.
+    """
+    codigos, unicos = pd.factorize(serie)
+    componentes = np.full((len(unicos) + 1, 3), np.nan)
+    for i, valor in enumerate(unicos):
+        achado = _RE_CHAVE.match(str(valor))
+        if achado:
+            componentes[i] = [float(g) for g in achado.groups()]
+    chaves_unicas = empacotar(componentes[:, 0], componentes[:, 1], componentes[:, 2], invalida)
+    return chaves_unicas[codigos]
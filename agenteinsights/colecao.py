@@ -0,0 +1,135 @@
+"""
+Agente Insights - Módulo de Coleção de Análises
+==============================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Lista de análises retornada por executar_pipeline e pelo armazém, com
+índices para o caminho do chat. Continua sendo uma lista (iteração, len,
+índices e json.dump funcionam como antes), mas também resolve em O(1):
+
+- a análise de uma entidade por (tipo, nome) ou (tipo, nome normalizado);
+- as análises que têm uma seção (ex.: 'metricas_por_tribo');
+- os squads de uma tribo e as tribos de um squad, pela estrutura.
+
+Quando o pipeline monta o cubo de métricas (cubo.py), ele acompanha a
+coleção, e o chat responde por ele totais de um quarter ou a série
+trimestral de uma tribo, squad ou da organização.
+
+O índice de entidades do chat (EntidadeIndex) é montado no primeiro uso e
+reaproveitado em todas as consultas.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .entidades import EntidadeIndex
+from .normalizacao import chave_compacta
+
+
+class ColecaoAnalises(list):
+    """
+    Lista de análises indexada.
+
+    Args:
+        analises: Análises (dicionários com 'tipo' e 'nome', ou seções agregadas)
+        estrutura: Estrutura organizacional do pipeline, para os vínculos tribo/squad
+        cubo: Cubo de métricas (CuboMetricas) do mesmo cruzamento, se houver
+    """
+
+    def __init__(self, analises: Iterable[Dict] = (), estrutura: Optional[Dict] = None, cubo=None):
+        super().__init__(analises)
+        self.estrutura = estrutura or {}
+        self.cubo = cubo
+        self._reindexar()
+
+    def __reduce__(self):
+        return (self.__class__, (list(self), self.estrutura, self.cubo))
+
+    def _reindexar(self):
+        self._por_nome: Dict[Tuple[str, str], Dict] = {}
+        self._por_chave: Dict[Tuple[str, str], Dict] = {}
+        self._por_secao: Dict[str, List[Tuple[int, Dict]]] = {}
+        self._indice_entidades: Optional[EntidadeIndex] = None
+        for posicao, analise in enumerate(self):
+            self._indexar(posicao, analise)
+
+    def _indexar(self, posicao: int, analise):
+        if not isinstance(analise, dict):
+            return
+        self._indice_entidades = None
+        tipo, nome = analise.get('tipo'), analise.get('nome')
+        if nome is not None:
+            # A primeira análise de cada entidade vale, como na busca linear
+            self._por_nome.setdefault((tipo, nome), analise)
+            self._por_chave.setdefault((tipo, chave_compacta(nome)), analise)
+        for secao in analise:
+            self._por_secao.setdefault(secao, []).append((posicao, analise))
+
+    # Mutações mantêm os índices em dia
+    def append(self, analise):
+        super().append(analise)
+        self._indexar(len(self) - 1, analise)
+
+    def extend(self, analises):
+        inicio = len(self)
+        super().extend(analises)
+        for posicao in range(inicio, len(self)):
+            self._indexar(posicao, self[posicao])
+
+    def __iadd__(self, analises):
+        self.extend(analises)
+        return self
+
+    def _mutacao(nome):
+        def metodo(self, *args):
+            resultado = getattr(list, nome)(self, *args)
+            self._reindexar()
+            return resultado
+        metodo.__name__ = nome
+        return metodo
+
+    insert = _mutacao('insert')
+    remove = _mutacao('remove')
+    pop = _mutacao('pop')
+    clear = _mutacao('clear')
+    sort = _mutacao('sort')
+    reverse = _mutacao('reverse')
+    __setitem__ = _mutacao('__setitem__')
+    __delitem__ = _mutacao('__delitem__')
+    del _mutacao
+
+    def obter(self, tipo: str, nome: str) -> Optional[Dict]:
+        """Análise da entidade pelo nome exato ou, se não houver, pelo nome normalizado"""
+        analise = self._por_nome.get((tipo, nome))
+        if analise is None:
+            analise = self._por_chave.get((tipo, chave_compacta(nome)))
+        return analise
+
+    def com_secao(self, *secoes: str) -> List[Dict]:
+        """Análises que têm alguma das seções (chaves de primeiro nível), na ordem da lista"""
+        encontradas = {}
+        for secao in secoes:
+            encontradas.update(self._por_secao.get(secao, []))
+        return [encontradas[posicao] for posicao in sorted(encontradas)]
+
+    def squads_da_tribo(self, tribo: str) -> List[Dict]:
+        """Análises dos squads da tribo, segundo a estrutura"""
+        squads = self.estrutura.get('tribos', {}).get(tribo, {}).get('squads', [])
+        return [a for a in (self.obter('squad', s) for s in squads) if a is not None]
+
+    def tribos_do_squad(self, squad: str) -> List[Dict]:
+        """Análises das tribos a que o squad pertence, segundo a estrutura"""
+        tribos = self.estrutura.get('squads', {}).get(squad, {}).get('tribos', [])
+        return [a for a in (self.obter('tribo', t) for t in tribos) if a is not None]
+
+    @property
+    def indice_entidades(self) -> EntidadeIndex:
+        """Índice de tribos e squads para identificar_entidade_consulta"""
+        if self._indice_entidades is None:
+            self._indice_entidades = EntidadeIndex(self)
+        return self._indice_entidades
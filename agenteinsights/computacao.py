@@ -0,0 +1,179 @@
+"""
+Agente Insights - Módulo de Backends de Cálculo
+==============================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Interface de cálculo numérico com implementações intercambiáveis. O
+BackendNumpy faz o trabalho estatístico em CPU sobre arrays contíguos:
+estatísticas por coluna e por entidade, normalização (z-score) e percentis
+com a interpolação linear de np.percentile. O BackendCupy executa o mesmo
+código sobre cupy, que expõe a API do NumPy; como as duas implementações
+compartilham os algoritmos, a da GPU pode ser validada contra a da CPU
+(ver test_computacao.py).
+"""
+
+import logging
+from typing import Any, Dict, Iterable, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from . import dependencias
+
+PERCENTIS_PADRAO = (50, 75, 85, 95)
+
+
+class BackendCalculo:
+    """Implementação genérica sobre um módulo com a API do NumPy (self.xp)"""
+
+    nome = 'base'
+    xp: Any = np
+
+    def para_dispositivo(self, dados) -> Any:
+        """Converte DataFrame/array para um array float64 contíguo do backend"""
+        if isinstance(dados, (pd.DataFrame, pd.Series)):
+            dados = dados.to_numpy(dtype=float, na_value=np.nan)
+        return self.xp.ascontiguousarray(self.xp.asarray(dados, dtype=self.xp.float64))
+
+    def para_cpu(self, dados) -> np.ndarray:
+        return np.asarray(dados)
+
+    def estatisticas_colunas(self, matriz) -> Dict[str, np.ndarray]:
+        """Média, desvio padrão populacional, mínimo e máximo de cada coluna, ignorando NaN"""
+        xp = self.xp
+        m = self.para_dispositivo(matriz)
+        if m.ndim == 1:
+            m = m[:, None]
+        return {
+            'media': self.para_cpu(xp.nanmean(m, axis=0)),
+            'desvio': self.para_cpu(xp.nanstd(m, axis=0)),
+            'minimo': self.para_cpu(xp.nanmin(m, axis=0)),
+            'maximo': self.para_cpu(xp.nanmax(m, axis=0))
+        }
+
+    def normalizar(self, matriz) -> np.ndarray:
+        """Z-score por coluna; colunas constantes ficam com 0"""
+        xp = self.xp
+        m = self.para_dispositivo(matriz)
+        media = xp.nanmean(m, axis=0)
+        desvio = xp.nanstd(m, axis=0)
+        desvio = xp.where(desvio == 0, 1.0, desvio)
+        return self.para_cpu((m - media) / desvio)
+
+    def percentis(self, valores, percentis: Iterable[float] = PERCENTIS_PADRAO) -> np.ndarray:
+        """Percentis de um vetor, ignorando NaN (interpolação linear)"""
+        xp = self.xp
+        v = self.para_dispositivo(valores).ravel()
+        v = v[~xp.isnan(v)]
+        if v.size == 0:
+            return np.zeros(len(tuple(percentis)))
+        return self.para_cpu(xp.percentile(v, xp.asarray(list(percentis), dtype=xp.float64)))
+
+    def estatisticas_por_grupo(self, codigos, valores, n_grupos: int,
+                               percentis: Sequence[float] = PERCENTIS_PADRAO) -> Dict[str, np.ndarray]:
+        """
+        Contagem, média, desvio padrão populacional e percentis de cada grupo.
+
+        Args:
+            codigos: Código do grupo de cada linha (0..n_grupos-1; negativo = sem grupo),
+                como o retornado por pd.factorize
+            valores: Valor de cada linha; NaN é ignorado
+            n_grupos: Quantidade de grupos
+            percentis: Percentis a calcular (0-100)
+
+        Returns:
+            Dicionário de arrays de tamanho n_grupos ('contagem', 'media', 'desvio'
+            e 'p<q>' para cada percentil); grupos sem valores ficam com 0
+        """
+        xp = self.xp
+        c = xp.asarray(codigos, dtype=xp.int64)
+        v = self.para_dispositivo(valores).ravel()
+        validos = (c >= 0) & ~xp.isnan(v)
+        c, v = c[validos], v[validos]
+        contagem = xp.bincount(c, minlength=n_grupos)
+        tem_valores = contagem > 0
+        divisor = xp.maximum(contagem, 1)
+        media = xp.bincount(c, weights=v, minlength=n_grupos) / divisor
+        desvios = v - media[c]
+        desvio = xp.sqrt(xp.bincount(c, weights=desvios * desvios, minlength=n_grupos) / divisor)
+        resultado = {
+            'contagem': self.para_cpu(contagem),
+            'media': self.para_cpu(xp.where(tem_valores, media, 0.0)),
+            'desvio': self.para_cpu(xp.where(tem_valores, desvio, 0.0))
+        }
+        # Ordena por (grupo, valor): cada grupo vira uma fatia ordenada
+        ordem = xp.lexsort(xp.stack((v, c.astype(xp.float64))))
+        ordenados = v[ordem]
+        inicio = xp.cumsum(contagem) - contagem
+        ultimo = xp.maximum(contagem - 1, 0)
+        for q in percentis:
+            posicao = ultimo * (q / 100)
+            anterior = xp.floor(posicao)
+            gamma = posicao - anterior
+            anterior = anterior.astype(xp.int64)
+            proximo = xp.minimum(anterior + 1, ultimo)
+            if ordenados.size:
+                a = ordenados[xp.minimum(inicio + anterior, ordenados.size - 1)]
+                b = ordenados[xp.minimum(inicio + proximo, ordenados.size - 1)]
+                # Mesma interpolação de np.percentile, a partir do vizinho mais próximo
+                diferenca = b - a
+                valor = xp.where(gamma >= 0.5, b - diferenca * (1 - gamma), a + diferenca * gamma)
+            else:
+                valor = xp.zeros(n_grupos)
+            resultado[f'p{q:g}'] = self.para_cpu(xp.where(tem_valores, valor, 0.0))
+        return resultado
+
+
+class BackendNumpy(BackendCalculo):
+    nome = 'numpy'
+    xp = np
+
+
+class BackendCupy(BackendCalculo):
+    """Mesmos algoritmos do BackendNumpy sobre arrays cupy, na GPU"""
+
+    nome = 'cupy'
+
+    def __init__(self):
+        cupy = dependencias.cupy()
+        if cupy is None:
+            raise RuntimeError("cupy não está disponível")
+        self.xp = cupy
+
+    def para_cpu(self, dados) -> np.ndarray:
+        return self.xp.asnumpy(dados)
+
+
+def obter_backend(device: Optional[str] = None) -> BackendCalculo:
+    """
+    Backend para o dispositivo ('cuda' ou 'cpu'; padrão: detectado). Sem
+    cupy utilizável, 'cuda' cai para o backend NumPy.
+    """
+    if device is None:
+        device = 'cuda' if dependencias.gpu_disponivel() else 'cpu'
+    if device == 'cuda':
+        try:
+            return BackendCupy()
+        except RuntimeError as e:
+            logging.info(f"Backend cupy indisponível, usando NumPy: {str(e)}")
+    return BackendNumpy()
+
+
+def resumir_dataframe(df: pd.DataFrame, backend: BackendCalculo,
+                      percentis: Sequence[float] = PERCENTIS_PADRAO) -> pd.DataFrame:
+    """Média, desvio, mínimo, máximo e percentis de cada coluna numérica (uma linha por coluna)"""
+    numericas = df.select_dtypes(include=[np.number, 'boolean']).columns
+    if len(numericas) == 0:
+        return pd.DataFrame()
+    matriz = backend.para_dispositivo(df[numericas])
+    resumo = pd.DataFrame(backend.estatisticas_colunas(matriz), index=numericas)
+    for i, coluna in enumerate(numericas):
+        for q, valor in zip(percentis, backend.percentis(matriz[:, i], percentis)):
+            resumo.loc[coluna, f'p{q:g}'] = valor
+    return resumo
@@ -0,0 +1,364 @@
+"""
+Agente Insights - Módulo do Cubo de Métricas
+===========================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Cubo pré-calculado sobre (Tribo, squad, Ano, Quarter). Cada célula guarda,
+por métrica, agregados parciais mescláveis (contagem, soma, soma dos
+quadrados e esboço de quantis) e o conjunto de PBIs distintos. Qualquer
+total de tribo, squad, quarter ou da organização é respondido mesclando as
+células correspondentes, sem revisitar as linhas do cruzamento.
+
+As linhas de uma tribo no cruzamento são exatamente a união das células com
+aquela tribo, de modo que contagem, média, desvio padrão e throughput saem
+iguais aos do cálculo direto; os percentis têm o erro do esboço (ver
+quantis.py). Ano e Quarter são guardados como inteiros, lidos pelos mesmos
+conversores das chaves de cruzamento (chaves.numerico e
+chaves.quarter_numerico): 2024, 2024.0 e '2024' são o mesmo ano, e 1, 'Q1'
+e 'T1' o mesmo quarter, tanto nas células quanto nos filtros.
+
+O pipeline alimenta o cubo com o cruzamento completo, com os blocos do modo
+em blocos (alimentar, na mesma passada da estrutura) ou, no cruzamento
+pré-agregado, com os valores de cada chave de tribo ponderados como em
+juncao.py (adicionar_pre_agregado). O cubo é gravado no armazém junto das
+análises; insights_do_cubo monta os insights de tribos e squads a partir do
+rollup, e quarter_citado localiza o quarter de uma pergunta do chat.
+"""
+
+import math
+import re
+from typing import Any, Dict, Hashable, Iterable, Iterator, List, Optional, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .agregacao import COLUNA_PBI, COLUNA_PESO, COLUNAS_METRICAS, montar_insight
+from .chaves import numerico, quarter_numerico
+from .juncao import COLUNA_CHAVE_TRIBO, agregar_executivo_por_chave, multiplicidade_squad
+from .quantis import ERRO_PADRAO, EsbocoQuantis
+
+DIMENSOES = ('Tribo', 'squad', 'Ano', 'Quarter')
+Celula = Tuple[Optional[Hashable], ...]
+# Filtro que não corresponde a nenhuma célula (ano ou quarter inválido)
+_NENHUM = object()
+# Quarter citado em texto livre: 'Q2 2024', '2024-Q2', 'T2/2024', '2º trimestre de 2024'
+_RE_QUARTER_TEXTO = re.compile(
+    r'\b[qt]([1-4])\W{0,3}(?:de\s+)?((?:19|20)\d{2})\b'
+    r'|\b((?:19|20)\d{2})\W{0,3}[qt]([1-4])\b'
+    r'|\b([1-4])\s*[º°o]?\s*trimestre\W{0,3}(?:de\s+)?((?:19|20)\d{2})\b', re.IGNORECASE)
+
+
+def _chave(valor) -> Optional[Hashable]:
+    """Normaliza um valor de dimensão: nulos (NaN, NA, None) viram None"""
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)) or valor is pd.NA:
+        return None
+    if isinstance(valor, np.integer):
+        return int(valor)
+    return valor
+
+
+def _inteiros(serie: pd.Series, dimensao: str) -> pd.Series:
+    """Ano ou Quarter como inteiros anuláveis; valores inválidos viram NA"""
+    valores = numerico(serie)
+    if dimensao == 'Quarter':
+        # Texto como 'Q1'/'T1' não é numérico; '1.0' (quarter float convertido em texto) é
+        valores = np.where(np.isnan(valores), quarter_numerico(serie), valores)
+    invalidos = valores != np.floor(valores)
+    if dimensao == 'Quarter':
+        invalidos |= (valores < 1) | (valores > 4)
+    valores = np.where(invalidos, np.nan, valores)
+    return pd.Series(pd.array(valores, dtype='Float64'), index=serie.index).astype('Int64')
+
+
+def _filtro(valor: Any, dimensao: str) -> Any:
+    """Valor de um filtro de Ano ou Quarter na forma guardada nas células"""
+    convertido = _chave(_inteiros(pd.Series([valor]), dimensao).iloc[0])
+    return _NENHUM if convertido is None else convertido
+
+
+class AgregadoMetrica:
+    """Agregados parciais e mescláveis de uma métrica"""
+
+    def __init__(self, erro_quantis: float = ERRO_PADRAO):
+        self.contagem = 0.0
+        self.soma = 0.0
+        self.soma_quadrados = 0.0
+        self.esboco = EsbocoQuantis(erro_quantis)
+
+    def adicionar(self, valores: np.ndarray, pesos: Optional[np.ndarray] = None) -> None:
+        pesos = np.ones(len(valores)) if pesos is None else pesos
+        self.contagem += float(pesos.sum())
+        self.soma += float(np.dot(valores, pesos))
+        self.soma_quadrados += float(np.dot(valores * valores, pesos))
+        self.esboco.adicionar(valores, pesos)
+
+    def mesclar(self, outro: 'AgregadoMetrica') -> 'AgregadoMetrica':
+        self.contagem += outro.contagem
+        self.soma += outro.soma
+        self.soma_quadrados += outro.soma_quadrados
+        self.esboco.mesclar(outro.esboco)
+        return self
+
+    def estatisticas(self) -> Dict[str, float]:
+        """Contagem, média, desvio padrão populacional e percentis do esboço"""
+        stats = self.esboco.estatisticas()
+        stats['contagem'] = int(self.contagem)
+        if self.contagem:
+            stats['medio'] = self.soma / self.contagem
+            variancia = self.soma_quadrados / self.contagem - stats['medio'] ** 2
+            stats['desvio_padrao'] = math.sqrt(max(variancia, 0.0))
+        else:
+            stats['desvio_padrao'] = 0
+        return stats
+
+
+class CelulaCubo:
+    """Agregados de uma combinação (Tribo, squad, Ano, Quarter)"""
+
+    def __init__(self, erro_quantis: float = ERRO_PADRAO):
+        self.linhas = 0
+        self.pbis: Set = set()
+        self.metricas = {m: AgregadoMetrica(erro_quantis) for m in COLUNAS_METRICAS}
+
+    def mesclar(self, outra: 'CelulaCubo') -> 'CelulaCubo':
+        self.linhas += outra.linhas
+        self.pbis |= outra.pbis
+        for metrica, agregado in outra.metricas.items():
+            self.metricas[metrica].mesclar(agregado)
+        return self
+
+    def resumo(self) -> Dict[str, Any]:
+        """Linhas, throughput (PBIs distintos) e as estatísticas de cada métrica"""
+        resultado = {'linhas': self.linhas, 'throughput': len(self.pbis)}
+        for metrica, agregado in self.metricas.items():
+            resultado[metrica] = agregado.estatisticas()
+        return resultado
+
+
+class CuboMetricas:
+    """
+    Cubo de métricas por (Tribo, squad, Ano, Quarter), alimentado por um ou
+    mais blocos do DataFrame cruzado (cruzar_dados_completo ou
+    cruzar_dados_em_blocos).
+    """
+
+    def __init__(self, erro_quantis: float = ERRO_PADRAO):
+        self.erro_quantis = erro_quantis
+        self.celulas: Dict[Celula, CelulaCubo] = {}
+
+    def _celula(self, chave: Celula) -> CelulaCubo:
+        celula = self.celulas.get(chave)
+        if celula is None:
+            celula = self.celulas[chave] = CelulaCubo(self.erro_quantis)
+        return celula
+
+    def _agrupar(self, df: pd.DataFrame) -> List[Tuple[CelulaCubo, np.ndarray]]:
+        """Célula de cada combinação de dimensões do bloco, com as posições das suas linhas"""
+        dimensoes = pd.DataFrame({
+            dim: (_inteiros(df[dim], dim) if dim in ('Ano', 'Quarter') else df[dim])
+            if dim in df.columns else pd.Series(None, index=df.index, dtype=object)
+            for dim in DIMENSOES
+        })
+        codigos, unicos = pd.factorize(pd.MultiIndex.from_frame(dimensoes))
+        ordem = np.argsort(codigos, kind='stable')
+        limites = np.cumsum(np.bincount(codigos, minlength=len(unicos)))[:-1]
+        grupos = []
+        for chave, linhas in zip(unicos, np.split(ordem, limites)):
+            tribo, squad, ano, quarter = (_chave(v) for v in chave)
+            # O MultiIndex pode devolver Ano/Quarter como float quando há nulos
+            celula = self._celula((tribo, squad, None if ano is None else int(ano),
+                                   None if quarter is None else int(quarter)))
+            grupos.append((celula, linhas))
+        return grupos
+
+    def adicionar(self, df: pd.DataFrame) -> None:
+        """
+        Incorpora um bloco do DataFrame cruzado; com a coluna COLUNA_PESO,
+        cada linha conta pelo seu peso (ver cruzar_dados_em_blocos)
+        """
+        if df.empty:
+            return
+        valores = {m: df[c].to_numpy(dtype=float, na_value=np.nan)
+                   for m, c in COLUNAS_METRICAS.items() if c in df.columns}
+        pbis = df[COLUNA_PBI].to_numpy() if COLUNA_PBI in df.columns else None
+        pesos = df[COLUNA_PESO].to_numpy(dtype=float) if COLUNA_PESO in df.columns else None
+        for celula, linhas in self._agrupar(df):
+            celula.linhas += len(linhas) if pesos is None else int(pesos[linhas].sum())
+            if pbis is not None:
+                celula.pbis.update(p for p in pd.unique(pbis[linhas]) if _chave(p) is not None)
+            for metrica, array in valores.items():
+                v = array[linhas]
+                validos = ~np.isnan(v)
+                if validos.any():
+                    celula.metricas[metrica].adicionar(
+                        v[validos], None if pesos is None else pesos[linhas][validos])
+
+    def adicionar_pre_agregado(self, pessoas: pd.DataFrame, df_executivo: pd.DataFrame) -> None:
+        """
+        Incorpora o cruzamento de pessoas com o Executivo sem materializá-lo
+        (ver juncao.py): cada célula recebe os valores das chaves de tribo de
+        suas pessoas, ponderados pelas vezes que cada valor apareceria no
+        cruzamento completo. O resultado é o mesmo de
+        adicionar(cruzar_pessoas_executivo(pessoas, df_executivo)).
+        """
+        if pessoas.empty:
+            return
+        por_chave = agregar_executivo_por_chave(df_executivo, COLUNA_CHAVE_TRIBO)
+        chaves = pessoas[COLUNA_CHAVE_TRIBO].to_numpy(dtype=np.int64)
+        pesos = multiplicidade_squad(pessoas, df_executivo)
+        # Linhas do merge à esquerda por chave de tribo: uma por PBI da chave, ou 1 sem PBIs
+        linhas_chave = np.maximum(pd.Series(chaves).map(por_chave['linhas']).fillna(0).to_numpy(dtype=np.int64), 1)
+        metricas = [m for m in COLUNAS_METRICAS if f'{m}_valores' in por_chave.columns]
+        for celula, linhas in self._agrupar(pessoas):
+            celula.linhas += int(np.dot(pesos[linhas], linhas_chave[linhas]))
+            peso_por_chave = pd.Series(pesos[linhas]).groupby(chaves[linhas], sort=False).sum()
+            peso_por_chave = peso_por_chave[peso_por_chave.index.isin(por_chave.index)]
+            if peso_por_chave.empty:
+                continue
+            agregados = por_chave.loc[peso_por_chave.index]
+            if 'pbis' in agregados.columns:
+                celula.pbis.update(np.concatenate(agregados['pbis'].tolist()).tolist())
+            for metrica in metricas:
+                contagens = agregados[f'{metrica}_contagem'].to_numpy(dtype=np.int64)
+                if contagens.sum():
+                    celula.metricas[metrica].adicionar(
+                        np.concatenate(agregados[f'{metrica}_valores'].tolist()),
+                        np.repeat(peso_por_chave.to_numpy(dtype=float), contagens))
+
+    def alimentar(self, blocos: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+        """Repassa os blocos, incorporando cada um ao cubo no caminho (para consumir o stream uma vez)"""
+        for bloco in blocos:
+            self.adicionar(bloco)
+            yield bloco
+
+    def mesclar(self, outro: 'CuboMetricas') -> 'CuboMetricas':
+        """Incorpora as células de outro cubo (por exemplo, de outro bloco ou processo)"""
+        for chave, celula in outro.celulas.items():
+            self._celula(chave).mesclar(celula)
+        return self
+
+    @staticmethod
+    def _filtros(tribo=None, squad=None, ano=None, quarter=None) -> Dict[int, Any]:
+        filtros = {}
+        for indice, valor in enumerate((tribo, squad, ano, quarter)):
+            if valor is not None:
+                filtros[indice] = _filtro(valor, DIMENSOES[indice]) if indice >= 2 else valor
+        return filtros
+
+    def _filtrar(self, filtros: Dict[int, Any]) -> Iterable[Tuple[Celula, CelulaCubo]]:
+        for chave, celula in self.celulas.items():
+            if all(chave[i] == valor for i, valor in filtros.items()):
+                yield chave, celula
+
+    def consultar(self, tribo: Optional[str] = None, squad: Optional[str] = None,
+                  ano: Optional[Union[int, str]] = None, quarter: Optional[Union[int, str]] = None) -> Dict[str, Any]:
+        """
+        Totais das células que atendem aos filtros informados; sem filtros,
+        o total da organização. Tribo e squad consideram apenas as linhas
+        em que a dimensão está preenchida, como nos insights por entidade.
+
+        Returns:
+            Dicionário com linhas, throughput e as estatísticas de cada métrica
+        """
+        total = CelulaCubo(self.erro_quantis)
+        for _, celula in self._filtrar(self._filtros(tribo, squad, ano, quarter)):
+            total.mesclar(celula)
+        return total.resumo()
+
+    def organizacao(self) -> Dict[str, Dict[str, float]]:
+        """
+        Estatísticas de cada métrica sobre todas as tribos (células com Tribo),
+        a mesma base de AcumuladorInsights.estatisticas_organizacao.
+        """
+        total = CelulaCubo(self.erro_quantis)
+        for chave, celula in self.celulas.items():
+            if chave[0] is not None:
+                total.mesclar(celula)
+        return {metrica: agregado.estatisticas() for metrica, agregado in total.metricas.items()}
+
+    def valores(self, dimensao: str) -> List:
+        """Valores distintos e não nulos de uma dimensão, na ordem de chegada"""
+        indice = DIMENSOES.index(dimensao)
+        return list(dict.fromkeys(chave[indice] for chave in self.celulas if chave[indice] is not None))
+
+    def rollup(self, dimensoes: Iterable[str], tribo: Optional[str] = None,
+               squad: Optional[str] = None) -> Dict[Tuple, Dict[str, Any]]:
+        """
+        Totais por combinação das dimensões pedidas, por exemplo
+        rollup(['Tribo', 'Ano', 'Quarter']) para a série trimestral de cada tribo,
+        opcionalmente restritos às células de uma tribo e/ou squad.
+        """
+        indices = [DIMENSOES.index(d) for d in dimensoes]
+        agrupadas: Dict[Tuple, CelulaCubo] = {}
+        for chave, celula in self._filtrar(self._filtros(tribo, squad)):
+            grupo = tuple(chave[i] for i in indices)
+            if any(v is None for v in grupo):
+                continue
+            if grupo not in agrupadas:
+                agrupadas[grupo] = CelulaCubo(self.erro_quantis)
+            agrupadas[grupo].mesclar(celula)
+        return {grupo: celula.resumo() for grupo, celula in agrupadas.items()}
+
+    def por_quarter(self, tribo: Optional[str] = None, squad: Optional[str] = None) -> Dict[Tuple[int, int], Dict[str, Any]]:
+        """Série trimestral (Ano, Quarter) -> totais, em ordem cronológica, da organização, tribo ou squad"""
+        return dict(sorted(self.rollup(['Ano', 'Quarter'], tribo, squad).items()))
+
+
+def quarter_citado(texto: str) -> Optional[Tuple[int, int]]:
+    """(ano, quarter) do primeiro quarter citado no texto, ou None"""
+    achado = _RE_QUARTER_TEXTO.search(texto)
+    if achado is None:
+        return None
+    q1, ano1, ano2, q2, q3, ano3 = achado.groups()
+    if q1:
+        return int(ano1), int(q1)
+    if ano2:
+        return int(ano2), int(q2)
+    return int(ano3), int(q3)
+
+
+def insights_do_cubo(cubo: CuboMetricas, estrutura: Dict) -> Tuple[Dict, Dict]:
+    """
+    Insights de tribos e squads lidos do rollup do cubo, no formato de
+    agregacao.montar_insight. Pessoas e vínculos vêm da estrutura, que também
+    define as entidades e a sua ordem.
+
+    Returns:
+        Tupla (insights_tribos, insights_squads)
+    """
+    vazio = CelulaCubo(cubo.erro_quantis).resumo()
+    insights = []
+    for nivel, dimensao, relacionados in (('tribos', 'Tribo', 'squads'), ('squads', 'squad', 'tribos')):
+        totais = cubo.rollup([dimensao])
+        insights_nivel = {}
+        for entidade, dados in estrutura[nivel].items():
+            resumo = totais.get((entidade,), vazio)
+            insights_nivel[entidade] = montar_insight(
+                nivel, {m: resumo[m] for m in COLUNAS_METRICAS}, resumo['throughput'],
+                len(dados['pessoas']), len(dados[relacionados]))
+        insights.append(insights_nivel)
+    return insights[0], insights[1]
+
+
+def construir_cubo(df_cruzado: Union[pd.DataFrame, Iterable[pd.DataFrame]],
+                   erro_quantis: float = ERRO_PADRAO) -> CuboMetricas:
+    """Monta o cubo a partir do DataFrame cruzado ou de um iterável de blocos"""
+    cubo = CuboMetricas(erro_quantis)
+    blocos = [df_cruzado] if isinstance(df_cruzado, pd.DataFrame) else df_cruzado
+    for bloco in blocos:
+        cubo.adicionar(bloco)
+    return cubo
+
+
+def construir_cubo_pre_agregado(pessoas: pd.DataFrame, df_executivo: pd.DataFrame,
+                                erro_quantis: float = ERRO_PADRAO) -> CuboMetricas:
+    """Monta o cubo das pessoas ativas e do Executivo normalizado, sem o cruzamento completo"""
+    cubo = CuboMetricas(erro_quantis)
+    cubo.adicionar_pre_agregado(pessoas, df_executivo)
+    return cubo
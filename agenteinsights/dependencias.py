@@ -0,0 +1,75 @@
+"""
+Agente Insights - Módulo de Dependências sob Demanda
+===================================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Carregamento tardio das bibliotecas pesadas (torch, cupy, scikit-learn,
+matplotlib/seaborn, python-docx e openai). Cada uma é importada apenas no
+primeiro uso e o módulo resultante fica em cache, de modo que importar o
+pacote para consultas (ex.: identificar_entidade_consulta) não paga o custo
+delas. As dependências de GPU são opcionais: na falta de torch ou cupy, ou
+sem CUDA utilizável, o processamento segue em CPU.
+"""
+
+import importlib
+import logging
+from functools import lru_cache
+from types import ModuleType
+from typing import Optional
+
+
+@lru_cache(maxsize=None)
+def _opcional(nome: str) -> Optional[ModuleType]:
+    try:
+        return importlib.import_module(nome)
+    except Exception as e:
+        # cupy instalado sem driver/CUDA compatível falha com erros que não são ImportError
+        logging.info(f"Dependência opcional indisponível ({nome}): {str(e)}")
+        return None
+
+
+def torch() -> Optional[ModuleType]:
+    """Módulo torch, ou None se não estiver instalado"""
+    return _opcional('torch')
+
+
+def cupy() -> Optional[ModuleType]:
+    """Módulo cupy, ou None se não estiver instalado ou sem GPU utilizável"""
+    return _opcional('cupy')
+
+
+@lru_cache(maxsize=None)
+def gpu_disponivel() -> bool:
+    """True quando há CUDA pelo torch e o cupy pode ser usado"""
+    modulo_torch = torch()
+    if modulo_torch is None or not modulo_torch.cuda.is_available():
+        return False
+    return cupy() is not None
+
+
+def pyplot() -> ModuleType:
+    """Módulo matplotlib.pyplot"""
+    return importlib.import_module('matplotlib.pyplot')
+
+
+def seaborn() -> ModuleType:
+    return importlib.import_module('seaborn')
+
+
+def sklearn(submodulo: str) -> ModuleType:
+    """Submódulo do scikit-learn, ex.: sklearn('linear_model')"""
+    return importlib.import_module(f'sklearn.{submodulo}')
+
+
+def docx() -> ModuleType:
+    return importlib.import_module('docx')
+
+
+def openai() -> ModuleType:
+    return importlib.import_module('openai')
@@ -0,0 +1,265 @@
+"""
+Agente Insights - Módulo de Índice de Entidades
+==============================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Índice dos nomes de tribos e squads das análises, montado uma vez por
+execução do pipeline e reutilizado em todas as consultas do chat
+(identificar_entidade_consulta). Os nomes são guardados pela chave compacta
+(normalizacao.chave_compacta), com três estruturas:
+
+- um dicionário nome normalizado -> entidade, para correspondência exata;
+- os comprimentos distintos dos nomes, para achar os nomes contidos na
+  consulta testando apenas as substrings desses comprimentos;
+- um índice invertido de trigramas, que restringe os nomes que contêm a
+  consulta (interseção das listas) e os candidatos da busca aproximada
+  (trigramas em comum), ranqueados por distância de edição limitada.
+
+A ordem de prioridade é a de antes: tribos antes de squads e, dentro de cada
+tipo, a ordem das análises.
+
+Para consultas que citam várias entidades ("compare tribo Vendas com tribo
+Benefícios", "squad X da tribo Y"), o índice também mantém um autômato de
+Aho-Corasick sobre as palavras normalizadas de todos os nomes: extrair()
+percorre a consulta uma única vez e devolve cada menção, com tipo e posição
+no texto original. Nomes e consultas são quebrados em palavras da mesma
+forma (palavras()): em qualquer caractere que não seja letra ou dígito,
+antes da chave canônica, de modo que "PIX-2" e "pix 2" coincidem.
+"""
+
+import re
+from collections import Counter, deque
+from typing import Dict, List, Optional, Tuple
+
+from .normalizacao import chave_canonica, chave_compacta
+
+TIPOS = ('tribo', 'squad')
+# Similaridade mínima (1 - distância / maior comprimento), como o cutoff do difflib
+SIMILARIDADE_MINIMA = 0.6
+# Candidatos com mais trigramas em comum avaliados pela distância de edição
+CANDIDATOS_APROXIMADOS = 128
+# Palavras que, antes de um nome, indicam o tipo da entidade mencionada
+PALAVRAS_TIPO = {'tribo': 'tribo', 'tribos': 'tribo', 'tribe': 'tribo',
+                 'squad': 'squad', 'squads': 'squad'}
+
+# Sequências de letras e dígitos: pontuação, hífen e '_' separam palavras
+_RE_PALAVRAS = re.compile(r'[^\W_]+')
+
+
+def _trigramas(nome: str, borda: bool = False) -> List[str]:
+    if borda:
+        nome = f'$${nome}$$'
+    return [nome[i:i + 3] for i in range(len(nome) - 2)]
+
+
+def distancia_limitada(a: str, b: str, limite: int) -> int:
+    """
+    Distância de Levenshtein entre a e b, ou limite + 1 se ela passar de
+    limite. Calcula só a faixa diagonal de largura 2 * limite + 1 e para
+    assim que uma linha inteira excede o limite.
+    """
+    if abs(len(a) - len(b)) > limite:
+        return limite + 1
+    if len(a) < len(b):
+        a, b = b, a
+    acima = limite + 1
+    anterior = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        inicio = max(1, i - limite)
+        fim = min(len(b), i + limite)
+        atual = [acima] * (len(b) + 1)
+        atual[0] = i if i <= limite else acima
+        for j in range(inicio, fim + 1):
+            custo = 0 if a[i - 1] == b[j - 1] else 1
+            atual[j] = min(anterior[j] + 1, atual[j - 1] + 1, anterior[j - 1] + custo)
+        if min(atual[max(0, inicio - 1):fim + 1]) > limite:
+            return acima
+        anterior = atual
+    return min(anterior[len(b)], acima)
+
+
+def palavras(texto: str) -> List[Tuple[str, int, int]]:
+    """Palavras normalizadas do texto, com início e fim de cada uma no texto original"""
+    resultado = []
+    for m in _RE_PALAVRAS.finditer(texto):
+        for palavra in chave_canonica(m.group()).split():
+            resultado.append((palavra, m.start(), m.end()))
+    return resultado
+
+
+class EntidadeIndex:
+    """
+    Índice de tribos e squads para resolver consultas livres.
+
+    Args:
+        analises: Lista de análises do pipeline (dicionários com 'tipo' e 'nome')
+    """
+
+    def __init__(self, analises: List[Dict]):
+        # Tribos primeiro: o id de cada entidade é também a sua prioridade
+        self.entidades: List[Tuple[str, str, str]] = []
+        for tipo in TIPOS:
+            for analise in analises:
+                if analise.get('tipo') == tipo:
+                    self.entidades.append((tipo, analise['nome'], chave_compacta(analise['nome'])))
+        self.exatos: Dict[str, int] = {}
+        self.trigramas: Dict[str, List[int]] = {}
+        self.trigramas_borda: Dict[str, List[int]] = {}
+        for ident, (_, _, norm) in enumerate(self.entidades):
+            self.exatos.setdefault(norm, ident)
+            for trigrama in set(_trigramas(norm)):
+                self.trigramas.setdefault(trigrama, []).append(ident)
+            for trigrama in set(_trigramas(norm, borda=True)):
+                self.trigramas_borda.setdefault(trigrama, []).append(ident)
+        self.comprimentos = sorted({len(norm) for _, _, norm in self.entidades})
+        self._montar_automato()
+
+    def _montar_automato(self):
+        """Aho-Corasick com palavras como símbolos: filhos, falha e saída de cada estado"""
+        self._filhos: List[Dict[str, int]] = [{}]
+        self._termina: List[Optional[Tuple[int, List[int]]]] = [None]
+        for ident, (_, nome, _) in enumerate(self.entidades):
+            tokens = [palavra for palavra, _, _ in palavras(nome)]
+            if not tokens:
+                continue
+            estado = 0
+            for token in tokens:
+                proximo = self._filhos[estado].get(token)
+                if proximo is None:
+                    proximo = len(self._filhos)
+                    self._filhos[estado][token] = proximo
+                    self._filhos.append({})
+                    self._termina.append(None)
+                estado = proximo
+            if self._termina[estado] is None:
+                self._termina[estado] = (len(tokens), [])
+            self._termina[estado][1].append(ident)
+        # Falha: maior sufixo próprio que também é estado; saída: o mais próximo que termina um nome
+        self._falha = [0] * len(self._filhos)
+        self._saida = [0] * len(self._filhos)
+        fila = deque(self._filhos[0].values())
+        while fila:
+            estado = fila.popleft()
+            for token, filho in self._filhos[estado].items():
+                fila.append(filho)
+                falha = self._falha[estado]
+                while falha and token not in self._filhos[falha]:
+                    falha = self._falha[falha]
+                self._falha[filho] = self._filhos[falha].get(token, 0)
+                destino = self._falha[filho]
+                self._saida[filho] = destino if self._termina[destino] else self._saida[destino]
+
+    def __len__(self) -> int:
+        return len(self.entidades)
+
+    def _entidade(self, ident: int) -> Dict[str, str]:
+        tipo, nome, _ = self.entidades[ident]
+        return {'tipo': tipo, 'nome': nome}
+
+    def exato(self, consulta: str) -> Optional[Dict[str, str]]:
+        """Entidade cujo nome normalizado é igual ao da consulta"""
+        ident = self.exatos.get(chave_compacta(consulta))
+        return None if ident is None else self._entidade(ident)
+
+    def _contidos_na_consulta(self, norm: str) -> Optional[int]:
+        """Menor id entre os nomes que são substring da consulta"""
+        melhor = None
+        for comprimento in self.comprimentos:
+            if comprimento > len(norm):
+                break
+            for inicio in range(len(norm) - comprimento + 1):
+                ident = self.exatos.get(norm[inicio:inicio + comprimento])
+                if ident is not None and (melhor is None or ident < melhor):
+                    melhor = ident
+        return melhor
+
+    def _que_contem_consulta(self, norm: str) -> Optional[int]:
+        """Menor id entre os nomes que contêm a consulta"""
+        trigramas = set(_trigramas(norm))
+        if not trigramas:
+            # Consultas com menos de 3 caracteres não têm trigramas
+            candidatos = range(len(self.entidades))
+        else:
+            listas = sorted((self.trigramas.get(t, []) for t in trigramas), key=len)
+            candidatos = set(listas[0]).intersection(*listas[1:])
+        encontrados = [i for i in candidatos if norm in self.entidades[i][2]]
+        return min(encontrados) if encontrados else None
+
+    def parcial(self, consulta: str) -> Optional[Dict[str, str]]:
+        """
+        Primeira entidade (tribos antes de squads) cujo nome contém a consulta
+        ou está contido nela.
+        """
+        norm = chave_compacta(consulta)
+        achados = [i for i in (self._contidos_na_consulta(norm), self._que_contem_consulta(norm)) if i is not None]
+        return self._entidade(min(achados)) if achados else None
+
+    def extrair(self, consulta: str) -> List[Dict]:
+        """
+        Todas as entidades mencionadas na consulta, em uma passada. Entre menções
+        sobrepostas vale a que começa antes e, depois, a mais longa. Quando o nome
+        é de uma tribo e de um squad, a palavra anterior ('tribo'/'squad') decide;
+        sem ela, vale a tribo. Cada entidade aparece uma vez.
+
+        Returns:
+            Lista de {'tipo', 'nome', 'inicio', 'fim'} na ordem do texto, com
+            inicio/fim sendo a posição da menção na consulta original
+        """
+        tokens = palavras(consulta)
+        ocorrencias = []
+        estado = 0
+        for posicao, (token, _, _) in enumerate(tokens):
+            while estado and token not in self._filhos[estado]:
+                estado = self._falha[estado]
+            estado = self._filhos[estado].get(token, 0)
+            saida = estado if self._termina[estado] else self._saida[estado]
+            while saida:
+                comprimento, idents = self._termina[saida]
+                ocorrencias.append((posicao - comprimento + 1, posicao, idents))
+                saida = self._saida[saida]
+        mencoes = []
+        vistas = set()
+        ultimo_fim = -1
+        for inicio, fim, idents in sorted(ocorrencias, key=lambda o: (o[0], o[0] - o[1])):
+            if inicio <= ultimo_fim:
+                continue
+            ultimo_fim = fim
+            tipo_indicado = PALAVRAS_TIPO.get(tokens[inicio - 1][0]) if inicio > 0 else None
+            escolhido = next((i for i in idents if self.entidades[i][0] == tipo_indicado), idents[0])
+            if escolhido in vistas:
+                continue
+            vistas.add(escolhido)
+            mencao = self._entidade(escolhido)
+            mencao.update(inicio=tokens[inicio][1], fim=tokens[fim][2])
+            mencoes.append(mencao)
+        return mencoes
+
+    def sugestoes(self, consulta: str, n: int = 3,
+                  similaridade_minima: float = SIMILARIDADE_MINIMA) -> List[Dict[str, str]]:
+        """
+        Até n entidades de cada tipo com nome próximo ao da consulta, da mais
+        parecida (menor distância de edição) para a menos parecida, tribos antes
+        de squads; empates pela quantidade de trigramas em comum.
+        """
+        norm = chave_compacta(consulta)
+        comuns = Counter()
+        for trigrama in set(_trigramas(norm, borda=True)):
+            comuns.update(self.trigramas_borda.get(trigrama, ()))
+        ranqueados = {tipo: [] for tipo in TIPOS}
+        for ident, em_comum in comuns.most_common(CANDIDATOS_APROXIMADOS):
+            tipo, _, nome_norm = self.entidades[ident]
+            maior = max(len(norm), len(nome_norm))
+            limite = int(maior * (1 - similaridade_minima))
+            distancia = distancia_limitada(norm, nome_norm, limite)
+            if distancia <= limite:
+                ranqueados[tipo].append((distancia, -em_comum, ident))
+        resultado = []
+        for tipo in TIPOS:
+            resultado.extend(self._entidade(ident) for _, _, ident in sorted(ranqueados[tipo])[:n])
+        return resultado
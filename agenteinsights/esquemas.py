@@ -0,0 +1,116 @@
+"""
+Agente Insights - Módulo de Esquemas das Fontes
+==============================================
+Versão: 1.0.1
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+- 1.0.1 (Release 8): serie_como_texto trata o nulo de colunas category como astype(str)
+
+Descrição:
+Registro das colunas e tipos efetivamente usados de cada fonte de dados.
+O carregador aplica o esquema no momento da leitura: apenas as colunas
+declaradas são mantidas e cada uma recebe o tipo compacto adequado
+(category para chaves/nomes repetidos, float32 para tempos, Int64 para IDs).
+Fontes sem esquema são carregadas integralmente, como antes.
+"""
+
+import json
+import logging
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+# Fonte -> {'colunas': {coluna: dtype}}
+ESQUEMAS: Dict[str, Dict[str, Any]] = {
+    'executivo': {
+        'colunas': {
+            'PBI_Concuidos_Executivo[Chave_DataTribo]': 'category',
+            'PBI_Concuidos_Executivo[Chave_DataSquad]': 'category',
+            'PBI_Concuidos_Executivo[ID_Tribo]': 'Int64',
+            'PBI_Concuidos_Executivo[ID_Squad]': 'Int64',
+            'PBI_Concuidos_Executivo[Key]': 'Int64',
+            '[SumLead_Time]': 'float32',
+            '[SumCycle_Time]': 'float32',
+            '[SumStory_Points]': 'float32'
+        }
+    }
+}
+
+# Fonte -> colunas que identificam uma linha entre versões dos dados.
+# Usadas na detecção de alterações para distinguir linha modificada de
+# linha removida + adicionada.
+CHAVES_LINHA: Dict[str, list] = {
+    'maturidade': ['Tribo', 'Ano', 'Quarter'],
+    'alocacao': ['person', 'squad'],
+    'executivo': ['PBI_Concuidos_Executivo[Key]']
+}
+
+
+def obter_esquema(fonte: str) -> Optional[Dict[str, Any]]:
+    """Retorna o esquema registrado para a fonte, ou None se não houver"""
+    return ESQUEMAS.get(fonte)
+
+
+def assinatura_esquema(esquema: Optional[Dict[str, Any]]) -> str:
+    """Representação estável do esquema, usada para invalidar caches"""
+    if not esquema:
+        return ''
+    return json.dumps(esquema, sort_keys=True)
+
+
+def filtro_colunas(esquema: Optional[Dict[str, Any]]) -> Optional[Callable[[Any], bool]]:
+    """
+    Retorna um filtro para o parâmetro usecols de pd.read_excel.
+    Colunas declaradas que não existirem na planilha são apenas ignoradas.
+    """
+    if not esquema:
+        return None
+    colunas = set(esquema['colunas'])
+
+    def filtro(coluna):
+        return str(coluna).strip() in colunas
+
+    return filtro
+
+
+def aplicar_esquema(df: pd.DataFrame, esquema: Optional[Dict[str, Any]]) -> pd.DataFrame:
+    """
+    Converte as colunas do DataFrame para os tipos declarados no esquema.
+
+    Conversões que falharem (ex.: ID com texto) mantêm a coluna original e
+    registram um aviso, preservando o comportamento anterior à tipagem.
+    """
+    if not esquema:
+        return df
+    df.columns = [str(c).strip() for c in df.columns]
+    for coluna, dtype in esquema['colunas'].items():
+        if coluna not in df.columns:
+            continue
+        try:
+            if dtype == 'category':
+                df[coluna] = df[coluna].astype('category')
+            elif dtype == 'Int64':
+                df[coluna] = pd.to_numeric(df[coluna], errors='raise').astype('Int64')
+            else:
+                df[coluna] = pd.to_numeric(df[coluna], errors='raise').astype(dtype)
+        except (ValueError, TypeError) as e:
+            logging.warning(f"Coluna {coluna} mantida sem conversão para {dtype}: {str(e)}")
+    return df
+
+
+def serie_como_texto(serie: pd.Series) -> pd.Series:
+    """
+    Equivalente a serie.astype(str).str.strip(), mas para colunas category
+    a conversão é feita apenas sobre as categorias únicas. O nulo (código -1,
+    última posição) passa pela mesma conversão, e vira 'nan' ou continua nulo
+    conforme a versão do pandas, como em astype(str).
+    """
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = pd.Series(list(serie.cat.categories) + [np.nan], dtype=object).astype(str).str.strip()
+        valores = categorias.to_numpy()[serie.cat.codes.to_numpy()]
+        return pd.Series(valores, index=serie.index, name=serie.name, dtype=categorias.dtype)
+    return serie.astype(str).str.strip()
@@ -0,0 +1,229 @@
+"""
+Agente Insights - Módulo de Métricas de Fluxo
+============================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Tabela colunar dos itens de trabalho de uma entidade (metricas['items']) e
+kernels vetorizados das métricas de fluxo usadas por extrair_metricas_ageis
+e analisar_qualidade_entrega: lead time, cycle time e tempo médio por
+status, WIP por status, retrabalho e bugs.
+
+Os itens (dicionários) são lidos uma única vez para arrays NumPy: datas em
+datetime64, marcadores em bool e status como códigos de pd.factorize. Itens
+que já chegam em colunas (um DataFrame em metricas['items']) são convertidos
+sem percorrer linha a linha. As
+mudanças de status (item['status_changes']) viram três arrays paralelos
+(item, status, tempo), e somas e médias por item ou por status saem de
+np.bincount. A semântica é a do cálculo item a item que substitui: um item
+só entra no lead time se tiver created_date e done_date, e só entra no
+cycle time se tiver status_changes.
+
+As entregas (data_conclusao) são contadas por mês, semana ISO ou quarter
+com np.bincount sobre códigos inteiros de período (contar_por_periodo),
+incluindo com zero os períodos sem entregas: sem eles, médias, tendências e
+previsões de throughput ficariam otimistas.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+# Status que não contam como trabalho em andamento
+STATUS_FINALIZADOS = ('Concluído', 'Cancelado')
+STATUS_DESCONHECIDO = 'Desconhecido'
+_NS_POR_DIA = 86_400 * 10**9
+FORMATO_CONCLUSAO = '%Y-%m-%d'
+PERIODOS = ('mes', 'semana', 'quarter')
+
+
+def _datas(valores, formato: Optional[str] = None) -> np.ndarray:
+    """Lista ou coluna de datas (datetime, date, Timestamp, texto ou None) em datetime64[ns]"""
+    if not isinstance(valores, pd.Series):
+        valores = pd.Series(valores, dtype=object)
+    return pd.to_datetime(valores, format=formato, errors='coerce').to_numpy(dtype='datetime64[ns]')
+
+
+def _objetos(valores: List[Any]) -> np.ndarray:
+    """Array 1-D de objetos, sem que o NumPy tente aninhar valores sequenciais"""
+    array = np.empty(len(valores), dtype=object)
+    array[:] = valores
+    return array
+
+
+class TabelaItens:
+    """
+    Itens de trabalho em colunas.
+
+    Atributos:
+        n: Quantidade de itens
+        criado / concluido: created_date e done_date (datetime64[ns], NaT se ausente)
+        conclusao: data_conclusao ('AAAA-MM-DD') em datetime64[ns], NaT se ausente ou inválida
+        tem_lead: Itens com as duas chaves de data
+        status: Status de cada item ('Desconhecido' se ausente)
+        retrabalho / bug: Marcadores de retrabalho e de tipo 'bug'
+        mudanca_item / mudanca_status / mudanca_tempo: Uma linha por entrada de status_changes
+        tem_mudancas: Itens com status_changes
+    """
+
+    def __init__(self, items: Union[List[Dict], pd.DataFrame]):
+        self.n = len(items)
+        if isinstance(items, pd.DataFrame):
+            self._de_dataframe(items)
+        else:
+            self._de_dicionarios(items)
+
+    def _de_dicionarios(self, items: List[Dict]):
+        # Uma compreensão de lista por campo, que é bem mais rápida que um laço com vários appends
+        tem_lead = ['created_date' in item and 'done_date' in item for item in items]
+        self.tem_lead = np.array(tem_lead, dtype=bool)
+        self.criado = _datas([item['created_date'] if lead else None for item, lead in zip(items, tem_lead)])
+        self.concluido = _datas([item['done_date'] if lead else None for item, lead in zip(items, tem_lead)])
+        self.conclusao = _datas([item.get('data_conclusao') for item in items], FORMATO_CONCLUSAO)
+        self.status = _objetos([item.get('status', STATUS_DESCONHECIDO) for item in items])
+        self.retrabalho = np.array([bool(item.get('retrabalho', False)) for item in items], dtype=bool)
+        self.bug = np.array([item.get('tipo') == 'bug' for item in items], dtype=bool)
+        self.tem_mudancas = np.array(['status_changes' in item for item in items], dtype=bool)
+        self._achatar_mudancas([item.get('status_changes') for item in items])
+
+    def _de_dataframe(self, df: pd.DataFrame):
+        """Itens já em colunas: só status_changes (se houver) é percorrido item a item"""
+        def coluna(nome, padrao=None):
+            return df[nome] if nome in df.columns else pd.Series(padrao, index=df.index, dtype=object)
+        self.criado = _datas(coluna('created_date'))
+        self.concluido = _datas(coluna('done_date'))
+        self.tem_lead = ~np.isnat(self.criado) & ~np.isnat(self.concluido)
+        self.conclusao = _datas(coluna('data_conclusao'), FORMATO_CONCLUSAO)
+        self.status = _objetos(coluna('status').astype(object).where(lambda c: c.notna(), STATUS_DESCONHECIDO).tolist())
+        self.retrabalho = coluna('retrabalho', False).fillna(False).astype(bool).to_numpy()
+        self.bug = (coluna('tipo') == 'bug').to_numpy(dtype=bool)
+        mudancas = coluna('status_changes').tolist()
+        self.tem_mudancas = np.array([isinstance(m, dict) for m in mudancas], dtype=bool)
+        self._achatar_mudancas(mudancas)
+
+    def _achatar_mudancas(self, mudancas: List[Optional[Dict]]):
+        """Dicionários status -> tempo de cada item em três arrays paralelos"""
+        contagens, status, tempos = [], [], []
+        for m in mudancas:
+            if isinstance(m, dict) and m:
+                contagens.append(len(m))
+                status.extend(m)
+                tempos.extend(m.values())
+            else:
+                contagens.append(0)
+        self.mudanca_item = np.repeat(np.arange(self.n, dtype=np.int64), contagens)
+        self.mudanca_status = _objetos(status)
+        self.mudanca_tempo = np.array(tempos, dtype=np.float64)
+
+
+def _por_valor(valores: np.ndarray, pesos: Optional[np.ndarray] = None) -> Tuple[List[Any], np.ndarray, np.ndarray]:
+    """
+    Valores distintos (na ordem da primeira ocorrência, mantendo None), contagem
+    e soma dos pesos de cada um.
+    """
+    if len(valores) == 0:
+        return [], np.zeros(0, dtype=np.int64), np.zeros(0)
+    codigos, _ = pd.factorize(valores, use_na_sentinel=False)
+    # Códigos seguem a primeira ocorrência: os valores originais vêm dessas posições
+    _, primeiros = np.unique(codigos, return_index=True)
+    contagem = np.bincount(codigos)
+    soma = np.bincount(codigos, weights=pesos) if pesos is not None else np.zeros(len(contagem))
+    return valores[primeiros].tolist(), contagem, soma
+
+
+def tabela_itens(metricas: Dict) -> Optional[TabelaItens]:
+    """TabelaItens de metricas['items'], ou None se não houver a chave"""
+    if 'items' not in metricas:
+        return None
+    return TabelaItens(metricas['items'])
+
+
+def lead_times(tabela: TabelaItens) -> np.ndarray:
+    """Lead time em dias inteiros (arredondado para baixo, como timedelta.days), na ordem dos itens"""
+    validos = tabela.tem_lead & ~np.isnat(tabela.criado) & ~np.isnat(tabela.concluido)
+    diferenca = (tabela.concluido[validos] - tabela.criado[validos]).astype(np.int64)
+    return np.floor_divide(diferenca, _NS_POR_DIA)
+
+
+def cycle_times(tabela: TabelaItens) -> Tuple[np.ndarray, Dict[Any, float]]:
+    """
+    Cycle time de cada item com status_changes (soma dos tempos) e tempo
+    médio por status, com os status na ordem da primeira ocorrência.
+    """
+    por_item = np.bincount(tabela.mudanca_item, weights=tabela.mudanca_tempo, minlength=tabela.n)
+    status, contagem, soma = _por_valor(tabela.mudanca_status, tabela.mudanca_tempo)
+    return por_item[tabela.tem_mudancas], dict(zip(status, (soma / np.maximum(contagem, 1)).tolist()))
+
+
+def wip_por_status(tabela: TabelaItens) -> Tuple[int, Dict[Any, int]]:
+    """Itens não finalizados e sua contagem por status (ordem da primeira ocorrência)"""
+    mascara = np.ones(tabela.n, dtype=bool)
+    for status in STATUS_FINALIZADOS:
+        mascara &= tabela.status != status
+    status, contagem, _ = _por_valor(tabela.status[mascara])
+    return int(mascara.sum()), dict(zip(status, contagem.tolist()))
+
+
+def contagens_qualidade(tabela: TabelaItens) -> Tuple[int, int]:
+    """Quantidade de itens com retrabalho e de bugs"""
+    return int(tabela.retrabalho.sum()), int(tabela.bug.sum())
+
+
+def datas_conclusao(items: Union[List[Dict], pd.DataFrame, TabelaItens]) -> np.ndarray:
+    """data_conclusao dos itens em datetime64[ns], sem montar a tabela inteira"""
+    if isinstance(items, TabelaItens):
+        return items.conclusao
+    if isinstance(items, pd.DataFrame):
+        if 'data_conclusao' not in items.columns:
+            return np.full(len(items), np.datetime64('NaT'), dtype='datetime64[ns]')
+        return _datas(items['data_conclusao'], FORMATO_CONCLUSAO)
+    return _datas([item.get('data_conclusao') for item in items], FORMATO_CONCLUSAO)
+
+
+def codigos_periodo(datas: np.ndarray, periodo: str = 'mes') -> np.ndarray:
+    """
+    Código inteiro e crescente do período de cada data (NaT descartado):
+    ano * 12 + mês para 'mes', ano * 4 + trimestre para 'quarter' e o número
+    da semana ISO (segunda a domingo) desde 1970 para 'semana'.
+    """
+    datas = np.asarray(datas, dtype='datetime64[ns]')
+    datas = datas[~np.isnat(datas)]
+    if periodo == 'mes':
+        return datas.astype('datetime64[M]').astype(np.int64)
+    if periodo == 'quarter':
+        return datas.astype('datetime64[M]').astype(np.int64) // 3
+    if periodo == 'semana':
+        # 01/01/1970 foi uma quinta-feira: +3 dias alinha as semanas à segunda-feira
+        return (datas.astype('datetime64[D]').astype(np.int64) + 3) // 7
+    raise ValueError(f"Período desconhecido: {periodo} (use um de {PERIODOS})")
+
+
+def rotulo_periodo(codigo: int, periodo: str = 'mes') -> str:
+    """'AAAA-MM', 'AAAA-Qn' ou 'AAAA-Wss' (ano e semana ISO) do código de codigos_periodo"""
+    if periodo == 'mes':
+        return f"{1970 + codigo // 12}-{codigo % 12 + 1:02d}"
+    if periodo == 'quarter':
+        return f"{1970 + codigo // 4}-Q{codigo % 4 + 1}"
+    segunda = pd.Timestamp(np.datetime64(codigo * 7 - 3, 'D'))
+    ano, semana, _ = segunda.isocalendar()
+    return f"{ano}-W{semana:02d}"
+
+
+def contar_por_periodo(datas: np.ndarray, periodo: str = 'mes', preencher_vazios: bool = True) -> Dict[str, int]:
+    """
+    Quantidade de datas por período, em ordem cronológica. Com preencher_vazios,
+    os períodos sem datas entre o primeiro e o último aparecem com 0.
+    """
+    codigos = codigos_periodo(datas, periodo)
+    if len(codigos) == 0:
+        return {}
+    inicio = int(codigos.min())
+    contagem = np.bincount(codigos - inicio)
+    periodos = range(len(contagem)) if preencher_vazios else np.flatnonzero(contagem)
+    return {rotulo_periodo(inicio + int(i), periodo): int(contagem[i]) for i in periodos}
@@ -0,0 +1,222 @@
+"""
+Agente Insights - Módulo de Execução Incremental
+===============================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+- 1.1.0 (Release 8): Recálculo pela junção pré-agregada (juncao.py)
+- 1.2.0 (Release 8): PBIs alterados ligados às pessoas pelas chaves inteiras (chaves.py)
+
+Descrição:
+Modo incremental do pipeline. A partir das diferenças por linha das três
+fontes (manifesto de hashes de leitura_e_verificacao), identifica as tribos e
+squads afetados, recalcula apenas as entradas deles em insights_tribos e
+insights_squads e reaproveita os resultados persistidos para as demais.
+
+Uma tribo é afetada quando muda uma linha de Maturidade dela, uma alocação
+da tribo, ou um PBI do Executivo cuja chave de tribo ou de squad aponta para
+ela (comparada pelas chaves inteiras de chaves.py, as mesmas dos merges). Alocações que deixaram de estar ativas desde a última execução
+(endDate vencido) também contam como alteração.
+"""
+
+import logging
+import os
+import pickle
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .cache_dados import gravar_atomico
+from .chaves import chaves_de_texto
+from .juncao import gerar_estrutura_e_insights_pre_agregado
+from .leitura_e_verificacao import detectar_alteracoes, salvar_manifesto
+from .normalizacao import chave_canonica, normalizar_serie
+
+DIRETORIO_INCREMENTAL = 'output/incremental'
+# 2: rótulos do Executivo com as chaves inteiras
+VERSAO_ESTADO = 2
+
+
+def _caminho_estado(diretorio: str) -> str:
+    return os.path.join(diretorio, 'estado.pkl')
+
+
+def _diretorio_manifesto(diretorio: str) -> str:
+    return os.path.join(diretorio, 'manifesto')
+
+
+def carregar_estado(diretorio: str = DIRETORIO_INCREMENTAL) -> Optional[Dict[str, Any]]:
+    """Lê os resultados persistidos da última execução, ou None se não houver"""
+    try:
+        with open(_caminho_estado(diretorio), 'rb') as f:
+            estado = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    if estado.get('versao') != VERSAO_ESTADO:
+        return None
+    return estado
+
+
+def salvar_estado(estado: Dict[str, Any], diretorio: str = DIRETORIO_INCREMENTAL) -> None:
+    """Persiste os resultados e rótulos da execução atual"""
+    os.makedirs(diretorio, exist_ok=True)
+    estado = dict(estado, versao=VERSAO_ESTADO)
+
+    def escrever(destino):
+        with open(destino, 'wb') as f:
+            pickle.dump(estado, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    gravar_atomico(_caminho_estado(diretorio), escrever)
+
+
+def _ativas(end_date: pd.Series, agora: pd.Timestamp) -> np.ndarray:
+    return (end_date.isna() | (pd.to_datetime(end_date, errors='coerce') > agora)).to_numpy()
+
+
+def rotular_fontes(dados: Dict[str, pd.DataFrame]) -> Dict[str, pd.DataFrame]:
+    """
+    Extrai, por linha de cada fonte e na mesma ordem do manifesto, as colunas
+    que ligam a linha a tribos e squads.
+    """
+    maturidade = dados['maturidade']
+    alocacao = dados['alocacao']
+    executivo = dados['executivo']
+    agora = pd.Timestamp.now()
+    return {
+        'maturidade': pd.DataFrame({'tribo_norm': normalizar_serie(maturidade['Tribo'])}),
+        'alocacao': pd.DataFrame({
+            'tribe_norm': normalizar_serie(alocacao['tribe']),
+            'squad': alocacao['squad'].to_numpy(),
+            'endDate': alocacao['endDate'].to_numpy(),
+            'ativa': _ativas(alocacao['endDate'], agora)
+        }),
+        'executivo': pd.DataFrame({
+            'Chave_IntTribo': chaves_de_texto(executivo['PBI_Concuidos_Executivo[Chave_DataTribo]']),
+            'Chave_IntSquad': chaves_de_texto(executivo['PBI_Concuidos_Executivo[Chave_DataSquad]'])
+        })
+    }
+
+
+def entidades_afetadas(alteracoes: Dict[str, Dict[str, Any]],
+                       rotulos: Dict[str, pd.DataFrame],
+                       rotulos_anteriores: Dict[str, pd.DataFrame],
+                       pessoas: pd.DataFrame,
+                       tribos_conhecidas: List[str]) -> Tuple[Set, Set]:
+    """
+    Converte as linhas alteradas de cada fonte no conjunto de tribos e squads
+    cujos insights precisam ser recalculados.
+
+    Args:
+        alteracoes: Resultado de detectar_alteracoes
+        rotulos: rotular_fontes dos dados atuais
+        rotulos_anteriores: rotular_fontes da execução anterior
+        pessoas: Pessoas ativas atuais (preparar_pessoas_ativas)
+        tribos_conhecidas: Nomes de tribo atuais e persistidos
+
+    Returns:
+        Tupla (tribos, squads)
+    """
+    def linhas(fonte):
+        info = alteracoes[fonte]
+        atuais = np.concatenate([info['adicionadas'], info['modificadas']]).astype(np.int64)
+        return rotulos[fonte].iloc[atuais], rotulos_anteriores[fonte].iloc[info['removidas']]
+
+    tribos_norm = set()
+    squads = set()
+
+    atuais, removidas = linhas('maturidade')
+    tribos_norm.update(atuais['tribo_norm'])
+    tribos_norm.update(removidas['tribo_norm'])
+
+    atuais, removidas = linhas('alocacao')
+    # Alocações inalteradas cujo endDate venceu desde a última execução
+    anteriores = rotulos_anteriores['alocacao']
+    expiradas = anteriores[anteriores['ativa'] & ~_ativas(anteriores['endDate'], pd.Timestamp.now())]
+    for df in (atuais, removidas, expiradas):
+        tribos_norm.update(df['tribe_norm'])
+        squads.update(df['squad'].dropna())
+
+    atuais, removidas = linhas('executivo')
+    chaves_tribo = np.concatenate([atuais['Chave_IntTribo'], removidas['Chave_IntTribo']])
+    chaves_squad = np.concatenate([atuais['Chave_IntSquad'], removidas['Chave_IntSquad']])
+    linhas_pessoas = pessoas[pessoas['Chave_IntTribo'].isin(chaves_tribo) |
+                             pessoas['Chave_IntSquad'].isin(chaves_squad)]
+    tribos = set(linhas_pessoas['Tribo'].dropna())
+    squads.update(linhas_pessoas['squad'].dropna())
+
+    # Mudanças na tribo (ex.: novo quarter em Maturidade) alteram as chaves de todos os seus squads
+    tribos.update(t for t in tribos_conhecidas if chave_canonica(t) in tribos_norm)
+    squads.update(pessoas.loc[pessoas['Tribo'].isin(tribos), 'squad'].dropna())
+    return tribos, squads
+
+
+def _substituir(destino: Dict, origem: Dict, chaves: Set) -> None:
+    for chave in chaves:
+        if chave in origem:
+            destino[chave] = origem[chave]
+        else:
+            destino.pop(chave, None)
+
+
+def gerar_estrutura_e_insights_incremental(dados: Dict[str, pd.DataFrame],
+                                           colunas_originais: Dict[str, List[str]],
+                                           diretorio: str = DIRETORIO_INCREMENTAL) -> Tuple[Dict, Dict, Dict]:
+    """
+    Equivalente incremental de cruzar_dados_completo + gerar_estrutura_e_insights.
+
+    Args:
+        dados: Fontes carregadas (após padronizar_ids)
+        colunas_originais: Colunas de cada fonte como lidas, antes das colunas
+            auxiliares criadas pelo pipeline; definem o que entra no manifesto
+        diretorio: Onde ficam o manifesto e os resultados persistidos
+
+    Returns:
+        Tupla (estrutura, insights_tribos, insights_squads)
+    """
+    from .analise_insights import normalizar_chaves_executivo, preparar_pessoas_ativas
+
+    brutos = {fonte: dados[fonte][colunas] for fonte, colunas in colunas_originais.items()}
+    estado = carregar_estado(diretorio)
+    rotulos = rotular_fontes(brutos)
+    pessoas = preparar_pessoas_ativas(dados['maturidade'], dados['alocacao'])
+    df_executivo = normalizar_chaves_executivo(dados['executivo'])
+
+    if estado is None or estado.get('colunas') != colunas_originais:
+        logging.info("Execução incremental sem estado compatível: recalculando tudo")
+        estrutura, insights_tribos, insights_squads = gerar_estrutura_e_insights_pre_agregado(
+            pessoas, df_executivo)
+    else:
+        alteracoes = detectar_alteracoes(brutos, _diretorio_manifesto(diretorio))
+        tribos_conhecidas = list(dados['maturidade']['Tribo'].dropna().unique()) + list(estado['insights_tribos'])
+        tribos, squads = entidades_afetadas(alteracoes, rotulos, estado['rotulos'], pessoas, tribos_conhecidas)
+        logging.info(f"Execução incremental: {len(tribos)} tribos e {len(squads)} squads a recalcular")
+
+        estrutura = estado['estrutura']
+        insights_tribos = estado['insights_tribos']
+        insights_squads = estado['insights_squads']
+        if tribos or squads:
+            subconjunto = pessoas[pessoas['Tribo'].isin(tribos) | pessoas['squad'].isin(squads)]
+            estrutura_parcial, tribos_parcial, squads_parcial = gerar_estrutura_e_insights_pre_agregado(
+                subconjunto, df_executivo)
+            _substituir(insights_tribos, tribos_parcial, tribos)
+            _substituir(insights_squads, squads_parcial, squads)
+            _substituir(estrutura['tribos'], estrutura_parcial['tribos'], tribos)
+            _substituir(estrutura['squads'], estrutura_parcial['squads'], squads)
+            pessoas_estrutura = set()
+            for entidade in list(estrutura['tribos'].values()) + list(estrutura['squads'].values()):
+                pessoas_estrutura.update(entidade['pessoas'])
+            estrutura['pessoas'] = list(pessoas_estrutura)
+
+    salvar_manifesto(brutos, _diretorio_manifesto(diretorio))
+    salvar_estado({
+        'colunas': colunas_originais,
+        'rotulos': rotulos,
+        'estrutura': estrutura,
+        'insights_tribos': insights_tribos,
+        'insights_squads': insights_squads
+    }, diretorio)
+    return estrutura, insights_tribos, insights_squads
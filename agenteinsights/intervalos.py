@@ -0,0 +1,205 @@
+"""
+Agente Insights - Módulo de Alocações por Intervalo
+==================================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Índice de intervalos [startDate, endDate) das alocações, para perguntas no
+tempo: quem estava em um squad em uma data ("as of D") ou durante um quarter
+(intervalos que se sobrepõem a Q). Sem startDate, a alocação vale desde
+sempre; sem endDate, continua aberta, como no filtro de alocações ativas.
+Alocações invertidas (startDate depois de endDate, erro de cadastro) não
+valem em data nenhuma e ficam fora do índice.
+
+Para cada dimensão (pessoa, squad, tribo...) as linhas são ordenadas por
+(entidade, início) e os fins ficam em uma árvore de segmentos de máximos.
+Uma consulta localiza por busca binária o prefixo de linhas da entidade que
+começaram antes do limite e desce na árvore apenas pelos nós cujo fim
+máximo passa do limite: O(log n) para contar e O((k + 1) log n) para listar
+as k alocações encontradas.
+"""
+
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .chaves import numerico, quarter_numerico
+
+INICIO_ABERTO = np.iinfo(np.int64).min
+FIM_ABERTO = np.iinfo(np.int64).max
+
+
+def _nanossegundos(serie: Optional[pd.Series], n: int, ausente: int) -> np.ndarray:
+    if serie is None:
+        return np.full(n, ausente, dtype=np.int64)
+    datas = pd.to_datetime(serie, errors='coerce')
+    valores = datas.to_numpy(dtype='datetime64[ns]').astype(np.int64)
+    valores[datas.isna().to_numpy()] = ausente
+    return valores
+
+
+def limites_quarter(ano: int, quarter: int) -> Tuple[pd.Timestamp, pd.Timestamp]:
+    """Intervalo [início, fim) do quarter"""
+    inicio = pd.Timestamp(year=int(ano), month=3 * (int(quarter) - 1) + 1, day=1)
+    return inicio, inicio + pd.DateOffset(months=3)
+
+
+class _ArvoreMaximos:
+    """Árvore de segmentos (base 2, em array) com o máximo de cada faixa"""
+
+    def __init__(self, valores: np.ndarray):
+        self.n = len(valores)
+        self.tamanho = 1
+        while self.tamanho < max(self.n, 1):
+            self.tamanho *= 2
+        self.arvore = np.full(2 * self.tamanho, INICIO_ABERTO, dtype=np.int64)
+        self.arvore[self.tamanho:self.tamanho + self.n] = valores
+        for nivel in range(self.tamanho.bit_length() - 1):
+            inicio = self.tamanho >> (nivel + 1)
+            filhos = self.arvore[2 * inicio:4 * inicio].reshape(-1, 2)
+            self.arvore[inicio:2 * inicio] = filhos.max(axis=1)
+
+    def acima(self, esquerda: int, direita: int, limite: int) -> List[int]:
+        """Posições em [esquerda, direita) cujo valor é maior que limite, em ordem"""
+        resultado = []
+        pilha = [(1, 0, self.tamanho)]
+        while pilha:
+            no, ini, fim = pilha.pop()
+            if fim <= esquerda or ini >= direita or self.arvore[no] <= limite:
+                continue
+            if fim - ini == 1:
+                resultado.append(ini)
+                continue
+            meio = (ini + fim) // 2
+            pilha.append((2 * no + 1, meio, fim))
+            pilha.append((2 * no, ini, meio))
+        return resultado
+
+
+class IndiceAlocacoes:
+    """
+    Alocações indexadas por intervalo de datas, por entidade de cada dimensão.
+
+    Args:
+        alocacoes: Tabela de alocação (uma linha por alocação)
+        dimensoes: Colunas pelas quais consultar (padrão: person, squad, tribe)
+        coluna_inicio / coluna_fim: Colunas de data do intervalo
+
+    Linhas com início depois do fim são descartadas das consultas (ver
+    invertidas), para que contar_em e em() concordem.
+    """
+
+    def __init__(self, alocacoes: pd.DataFrame, dimensoes: Iterable[str] = ('person', 'squad', 'tribe'),
+                 coluna_inicio: str = 'startDate', coluna_fim: str = 'endDate'):
+        self.alocacoes = alocacoes.reset_index(drop=True)
+        n = len(self.alocacoes)
+        self.inicio = _nanossegundos(self.alocacoes.get(coluna_inicio), n, INICIO_ABERTO)
+        self.fim = _nanossegundos(self.alocacoes.get(coluna_fim), n, FIM_ABERTO)
+        # Intervalos invertidos não contêm nenhuma data: ficam fora de todos os índices
+        self.invertidas = self.inicio > self.fim
+        validas = ~self.invertidas
+        # Contagem global: fins e inícios ordenados
+        self._inicios_ordenados = np.sort(self.inicio[validas])
+        self._fins_ordenados = np.sort(self.fim[validas])
+        self._dimensoes = {}
+        self._dimensoes[None] = self._indexar(np.zeros(n, dtype=np.int64), [None])
+        for dimensao in dimensoes:
+            if dimensao in self.alocacoes.columns:
+                codigos, unicos = pd.factorize(self.alocacoes[dimensao])
+                self._dimensoes[dimensao] = self._indexar(codigos, list(unicos))
+
+    def _indexar(self, codigos: np.ndarray, unicos: List) -> Dict[str, Any]:
+        validos = np.flatnonzero((codigos >= 0) & ~self.invertidas)
+        ordem = validos[np.lexsort((self.inicio[validos], codigos[validos]))]
+        offsets = np.concatenate(([0], np.cumsum(np.bincount(codigos[validos], minlength=len(unicos)))))
+        return {
+            'codigos': {valor: i for i, valor in enumerate(unicos)},
+            'ordem': ordem,
+            'offsets': offsets,
+            'inicios': self.inicio[ordem],
+            'arvore': _ArvoreMaximos(self.fim[ordem])
+        }
+
+    def _consultar(self, dimensao: Optional[str], valor: Any, inicio_ate: int, lado: str,
+                   fim_depois_de: int) -> np.ndarray:
+        """Linhas da entidade com início <= / < inicio_ate e fim > fim_depois_de"""
+        if dimensao not in self._dimensoes:
+            raise KeyError(f"Dimensão não indexada: {dimensao}")
+        indice = self._dimensoes[dimensao]
+        codigo = indice['codigos'].get(valor)
+        if codigo is None:
+            return np.array([], dtype=np.int64)
+        esquerda, direita = indice['offsets'][codigo], indice['offsets'][codigo + 1]
+        prefixo = esquerda + np.searchsorted(indice['inicios'][esquerda:direita], inicio_ate, side=lado)
+        posicoes = indice['arvore'].acima(int(esquerda), int(prefixo), fim_depois_de)
+        return np.sort(indice['ordem'][posicoes])
+
+    @staticmethod
+    def _filtro(dimensao: Optional[str], valor: Any) -> Tuple[Optional[str], Any]:
+        return (dimensao, valor) if dimensao is not None else (None, None)
+
+    def em(self, data, dimensao: Optional[str] = None, valor: Any = None) -> np.ndarray:
+        """Posições das alocações vigentes na data (início <= D < fim), opcionalmente de uma entidade"""
+        d = pd.Timestamp(data).value
+        return self._consultar(*self._filtro(dimensao, valor), d, 'right', d)
+
+    def contar_em(self, data) -> int:
+        """Quantidade de alocações vigentes na data, em O(log n)"""
+        d = pd.Timestamp(data).value
+        return int(np.searchsorted(self._inicios_ordenados, d, side='right')
+                   - np.searchsorted(self._fins_ordenados, d, side='right'))
+
+    def no_periodo(self, inicio, fim, dimensao: Optional[str] = None, valor: Any = None) -> np.ndarray:
+        """Posições das alocações que se sobrepõem a [inicio, fim)"""
+        return self._consultar(*self._filtro(dimensao, valor), pd.Timestamp(fim).value, 'left',
+                               pd.Timestamp(inicio).value)
+
+    def no_quarter(self, ano: int, quarter: int, dimensao: Optional[str] = None, valor: Any = None) -> np.ndarray:
+        """Posições das alocações que se sobrepõem ao quarter"""
+        return self.no_periodo(*limites_quarter(ano, quarter), dimensao, valor)
+
+    def linhas(self, posicoes: np.ndarray) -> pd.DataFrame:
+        return self.alocacoes.iloc[posicoes]
+
+
+def alocacoes_por_quarter(df_maturidade: pd.DataFrame, df_alocacao: pd.DataFrame,
+                          coluna_tribo: str = 'tribo_norm', coluna_tribo_alocacao: str = 'tribe_norm') -> pd.DataFrame:
+    """
+    Equivalente no tempo do merge Maturidade × alocações ativas: cada linha de
+    Maturidade (tribo, Ano, Quarter) é combinada com as alocações da tribo que
+    se sobrepõem àquele quarter, em vez das alocações ativas hoje. Linhas com
+    Ano ou Quarter inválidos não cruzam.
+    """
+    indice = IndiceAlocacoes(df_alocacao, dimensoes=[coluna_tribo_alocacao])
+    anos = numerico(df_maturidade['Ano'])
+    quarters = quarter_numerico(df_maturidade['Quarter'])
+    tribos = df_maturidade[coluna_tribo].to_numpy()
+    linhas_maturidade = []
+    linhas_alocacao = []
+    cache = {}
+    for i, (tribo, ano, quarter) in enumerate(zip(tribos, anos, quarters)):
+        if np.isnan(ano) or np.isnan(quarter) or not 1 <= quarter <= 4:
+            continue
+        chave = (tribo, int(ano), int(quarter))
+        if chave not in cache:
+            cache[chave] = indice.no_quarter(int(ano), int(quarter), coluna_tribo_alocacao, tribo)
+        posicoes = cache[chave]
+        linhas_maturidade.append(np.full(len(posicoes), i, dtype=np.int64))
+        linhas_alocacao.append(posicoes)
+    if linhas_maturidade:
+        mat = np.concatenate(linhas_maturidade)
+        aloc = np.concatenate(linhas_alocacao)
+    else:
+        mat = aloc = np.array([], dtype=np.int64)
+    esquerda = df_maturidade.iloc[mat].reset_index(drop=True)
+    direita = indice.alocacoes.iloc[aloc].reset_index(drop=True)
+    sobrepostas = set(esquerda.columns) & set(direita.columns)
+    esquerda = esquerda.rename(columns={c: f'{c}_mat' for c in sobrepostas})
+    direita = direita.rename(columns={c: f'{c}_aloc' for c in sobrepostas})
+    return pd.concat([esquerda, direita], axis=1)
@@ -0,0 +1,183 @@
+"""
+Agente Insights - Módulo de Junção Pré-agregada
+==============================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Alternativa ao cruzamento linha a linha de cruzar_pessoas_executivo. Os dois
+merges à esquerda do Executivo (por chave de tribo e por chave de squad)
+geram pessoas × PBIs × PBIs linhas. Aqui o Executivo é agregado uma única vez
+por chave (somas, contagens, PBIs distintos e arrays ordenados de valores) e
+cruzado com as pessoas na granularidade (tribo, chave) e (squad, chave).
+
+O resultado é o mesmo de gerar_estrutura_e_insights sobre o cruzamento
+completo. Nele, cada valor de um PBI da chave de tribo aparece uma vez por
+linha de pessoa, multiplicada pela quantidade de PBIs da chave de squad
+dessa pessoa (ou 1, se não houver). Esses pesos são somados por
+(entidade, chave de tribo), e as estatísticas são ponderadas.
+
+Os pesos são intencionais: reproduzem exatamente as médias e percentis do
+cruzamento completo, que é a referência dos insights, em vez de contar cada
+PBI uma vez por pessoa. O modo em blocos (cruzar_dados_em_blocos) aplica os
+mesmos pesos a cada bloco do Executivo.
+"""
+
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .agregacao import (COLUNA_PBI, COLUNA_PESO, COLUNAS_METRICAS, NIVEIS, estatisticas_ponderadas,
+                        montar_insight)
+
+COLUNA_CHAVE_TRIBO = 'Chave_IntTribo'
+COLUNA_CHAVE_SQUAD = 'Chave_IntSquad'
+
+
+def _arrays_por_chave(chaves: np.ndarray, valores: np.ndarray, unicos: bool = False) -> Dict:
+    """Agrupa valores por chave em arrays ordenados (opcionalmente sem repetição)"""
+    ordem = np.lexsort((valores, chaves))
+    chaves = chaves[ordem]
+    valores = valores[ordem]
+    if unicos and len(valores):
+        manter = np.ones(len(valores), dtype=bool)
+        manter[1:] = (chaves[1:] != chaves[:-1]) | (valores[1:] != valores[:-1])
+        chaves = chaves[manter]
+        valores = valores[manter]
+    inicio = np.flatnonzero(np.r_[True, chaves[1:] != chaves[:-1]]) if len(chaves) else np.array([], dtype=np.int64)
+    return dict(zip(chaves[inicio].tolist(), np.split(valores, inicio[1:])))
+
+
+def agregar_executivo_por_chave(df_executivo: pd.DataFrame, coluna_chave: str) -> pd.DataFrame:
+    """
+    Agrega o Executivo por chave inteira de tribo ou squad.
+
+    Args:
+        df_executivo: Executivo já normalizado (normalizar_chaves_executivo)
+        coluna_chave: COLUNA_CHAVE_TRIBO ou COLUNA_CHAVE_SQUAD
+
+    Returns:
+        DataFrame indexado pela chave com as colunas 'linhas', '{metrica}_soma',
+        '{metrica}_contagem', '{metrica}_valores' (array ordenado, sem nulos),
+        'pbis' (array ordenado de Keys distintas) e 'pbis_distintos'
+    """
+    chaves = df_executivo[coluna_chave].to_numpy(dtype=np.int64)
+    agregado = pd.DataFrame({'linhas': pd.Series(chaves).value_counts(sort=False)})
+    agregado.index.name = coluna_chave
+    for metrica, coluna in COLUNAS_METRICAS.items():
+        if coluna not in df_executivo.columns:
+            continue
+        valores = df_executivo[coluna].to_numpy(dtype=float, na_value=np.nan)
+        validos = ~np.isnan(valores)
+        por_chave = _arrays_por_chave(chaves[validos], valores[validos])
+        vazio = np.array([], dtype=float)
+        arrays = [por_chave.get(chave, vazio) for chave in agregado.index]
+        agregado[f'{metrica}_valores'] = pd.Series(arrays, index=agregado.index, dtype=object)
+        agregado[f'{metrica}_soma'] = [float(a.sum()) for a in arrays]
+        agregado[f'{metrica}_contagem'] = [len(a) for a in arrays]
+    if COLUNA_PBI in df_executivo.columns:
+        pbis = df_executivo[COLUNA_PBI]
+        validos = pbis.notna().to_numpy()
+        codigos, unicos = pd.factorize(pbis[validos])
+        por_chave = _arrays_por_chave(chaves[validos], codigos.astype(np.int64), unicos=True)
+        vazio = np.array([], dtype=np.int64)
+        arrays = [unicos.take(por_chave.get(chave, vazio)).to_numpy() for chave in agregado.index]
+        agregado['pbis'] = pd.Series(arrays, index=agregado.index, dtype=object)
+        agregado['pbis_distintos'] = [len(a) for a in arrays]
+    return agregado
+
+
+def linhas_por_chave(df_executivo: pd.DataFrame, coluna_chave: str) -> pd.Series:
+    """Quantidade de linhas do Executivo por chave inteira de tribo ou squad"""
+    return df_executivo[coluna_chave].value_counts(sort=False)
+
+
+def multiplicidade(chaves: pd.Series, linhas: pd.Series) -> np.ndarray:
+    """
+    Vezes que cada linha de pessoa se repete no merge à esquerda por uma
+    chave: as linhas do Executivo com a sua chave, ou 1 se não houver nenhuma.
+    """
+    return np.maximum(chaves.map(linhas).fillna(0).to_numpy(dtype=np.int64), 1)
+
+
+def multiplicidade_squad(pessoas: pd.DataFrame, df_executivo: pd.DataFrame) -> np.ndarray:
+    """Multiplicidade de cada linha de pessoa no merge pela chave de squad"""
+    return multiplicidade(pessoas[COLUNA_CHAVE_SQUAD], linhas_por_chave(df_executivo, COLUNA_CHAVE_SQUAD))
+
+
+def cruzar_pre_agregado(pessoas: pd.DataFrame, df_executivo: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Cruza as pessoas ativas com o Executivo pré-agregado.
+
+    Args:
+        pessoas: Resultado de preparar_pessoas_ativas
+        df_executivo: Executivo já normalizado (normalizar_chaves_executivo)
+
+    Returns:
+        Nível ('tribos', 'squads') -> DataFrame com uma linha por (entidade,
+        chave de tribo) com PBIs, contendo 'peso' (ocorrências de cada valor
+        no cruzamento completo) e as colunas de agregar_executivo_por_chave
+    """
+    por_tribo = agregar_executivo_por_chave(df_executivo, COLUNA_CHAVE_TRIBO)
+    base = pessoas.assign(**{COLUNA_PESO: multiplicidade_squad(pessoas, df_executivo)})
+    resultado = {}
+    for nivel, (col_entidade, _) in NIVEIS.items():
+        pesos = base[base[col_entidade].notna()].groupby(
+            [col_entidade, COLUNA_CHAVE_TRIBO], sort=False)[COLUNA_PESO].sum().reset_index()
+        resultado[nivel] = pesos.merge(por_tribo, left_on=COLUNA_CHAVE_TRIBO, right_index=True, how='inner')
+    return resultado
+
+
+def _estatisticas(juncao: pd.DataFrame, metrica: str) -> Dict[str, float]:
+    coluna = f'{metrica}_valores'
+    if coluna not in juncao.columns or juncao[f'{metrica}_contagem'].sum() == 0:
+        return estatisticas_ponderadas(np.array([]), np.array([]))
+    arrays = juncao[coluna].tolist()
+    pesos = juncao[COLUNA_PESO].to_numpy(dtype=np.int64)
+    contagens = juncao[f'{metrica}_contagem'].to_numpy(dtype=np.int64)
+    stats = estatisticas_ponderadas(np.concatenate(arrays), np.repeat(pesos, contagens))
+    # Média pelas somas pré-agregadas, sem revisitar os valores
+    stats['medio'] = float(np.dot(pesos, juncao[f'{metrica}_soma'].to_numpy()) / np.dot(pesos, contagens))
+    return stats
+
+
+def gerar_estrutura_e_insights_pre_agregado(pessoas: pd.DataFrame,
+                                            df_executivo: pd.DataFrame) -> Tuple[Dict, Dict, Dict]:
+    """
+    Equivalente a gerar_estrutura_e_insights(cruzar_pessoas_executivo(pessoas, df_executivo)),
+    sem materializar o cruzamento completo.
+
+    Returns:
+        Tupla (estrutura, insights_tribos, insights_squads)
+    """
+    juncoes = cruzar_pre_agregado(pessoas, df_executivo)
+    estrutura = {'tribos': {}, 'squads': {}, 'pessoas': set()}
+    insights = {}
+    for nivel, (col_entidade, _) in NIVEIS.items():
+        outro = 'squad' if nivel == 'tribos' else 'Tribo'
+        validas = pessoas[pessoas[col_entidade].notna()]
+        relacionados = validas.groupby(col_entidade, sort=False)[outro].agg(lambda s: s.dropna().unique().tolist())
+        membros = validas.groupby(col_entidade, sort=False)['person'].agg(lambda s: s.dropna().unique().tolist())
+        juncao_por_entidade = dict(list(juncoes[nivel].groupby(col_entidade, sort=False)))
+        vazia = juncoes[nivel].iloc[:0]
+        insights[nivel] = {}
+        for entidade in validas[col_entidade].unique():
+            pessoas_entidade = membros[entidade]
+            relacionados_entidade = relacionados[entidade]
+            if nivel == 'tribos':
+                estrutura['tribos'][entidade] = {'squads': relacionados_entidade, 'pessoas': pessoas_entidade}
+            else:
+                estrutura['squads'][entidade] = {'tribos': relacionados_entidade, 'pessoas': pessoas_entidade}
+            estrutura['pessoas'].update(pessoas_entidade)
+            juncao = juncao_por_entidade.get(entidade, vazia)
+            stats = {metrica: _estatisticas(juncao, metrica) for metrica in COLUNAS_METRICAS}
+            throughput = len(np.unique(np.concatenate(juncao['pbis'].tolist()))) if 'pbis' in juncao.columns and len(juncao) else 0
+            insights[nivel][entidade] = montar_insight(
+                nivel, stats, throughput, len(pessoas_entidade), len(relacionados_entidade))
+    estrutura['pessoas'] = list(estrutura['pessoas'])
+    return estrutura, insights['tribos'], insights['squads']
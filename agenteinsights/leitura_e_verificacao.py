@@ -8,6 +8,9 @@ Data: 01/06/2025
 Histórico:
 - 1.0.0 (Release 0): Versão inicial
 - 1.1.0 (Release 2): Correção no retorno das funções e validação de dados
+- 1.2.0 (Release 8): Leitura em blocos (streaming) para planilhas grandes
+- 1.3.0 (Release 8): Detecção de alterações por manifesto de hashes
+- 1.4.0 (Release 8): Versões anteriores gravadas como snapshots Arrow em vez de xlsx
 
 Descrição:
 Módulo responsável pela leitura dos arquivos de dados e verificação
@@ -15,7 +18,19 @@ de alterações entre as versões anteriores e atuais dos dados.
 """
 
 import pandas as pd
+import numpy as np
 import os
+import json
+import hashlib
+import logging
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .esquemas import CHAVES_LINHA, aplicar_esquema, filtro_colunas
+from .cache_dados import gravar_atomico
+from .snapshots import DIRETORIO_SNAPSHOTS, ler_snapshot, salvar_snapshot
+
+DIRETORIO_MANIFESTO = 'output/manifesto'
+VERSAO_MANIFESTO = 1
 
 def carregar_dados():
     # Carregar os arquivos Excel
@@ -31,43 +46,223 @@ def carregar_dados():
     
     return maturidade, alocacao, executivo
 
-def verificar_alteracoes(maturidade, alocacao, executivo):
-    # Verificar se os arquivos anteriores existem
-    arquivos_anteriores = [
-        'output/maturidade_anterior.xlsx',
-        'output/alocacao_anterior.xlsx',
-        'output/executivo_anterior.xlsx'
-    ]
-    
+def hashes_linhas(df: pd.DataFrame, colunas_chave: Optional[List[str]] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Calcula, para cada linha, o hash da chave e o hash do conteúdo.
+
+    A chave vem de colunas_chave; sem elas (ou se alguma faltar), o próprio
+    conteúdo é a chave e uma alteração aparece como remoção + adição. Chaves
+    repetidas são desambiguadas pela ordem de ocorrência.
+
+    Returns:
+        Tupla (chaves, linhas) de arrays uint64 na ordem das linhas do DataFrame
+    """
+    linhas = pd.util.hash_pandas_object(df, index=False).to_numpy(dtype=np.uint64)
+    if colunas_chave and all(c in df.columns for c in colunas_chave):
+        chaves = pd.util.hash_pandas_object(df[colunas_chave], index=False).to_numpy(dtype=np.uint64)
+    else:
+        chaves = linhas
+    ocorrencia = pd.Series(chaves).groupby(chaves).cumcount().to_numpy(dtype=np.uint64)
+    chaves = pd.util.hash_pandas_object(pd.DataFrame({'chave': chaves, 'ocorrencia': ocorrencia}),
+                                        index=False).to_numpy(dtype=np.uint64)
+    return chaves, linhas
+
+
+def _hash_conteudo(df: pd.DataFrame, linhas: np.ndarray) -> str:
+    sha = hashlib.sha256()
+    sha.update(json.dumps([str(c) for c in df.columns]).encode('utf-8'))
+    sha.update(np.ascontiguousarray(linhas).tobytes())
+    return sha.hexdigest()
+
+
+def gerar_manifesto(dados: Dict[str, pd.DataFrame]) -> Dict[str, Dict[str, Any]]:
+    """Gera o manifesto (hash do conteúdo e hashes por linha) de cada fonte"""
+    manifesto = {}
+    for fonte, df in dados.items():
+        chaves, linhas = hashes_linhas(df, CHAVES_LINHA.get(fonte))
+        manifesto[fonte] = {
+            'hash_conteudo': _hash_conteudo(df, linhas),
+            'linhas': len(df),
+            'chaves': chaves,
+            'hashes': linhas
+        }
+    return manifesto
+
+
+def salvar_manifesto(dados: Dict[str, pd.DataFrame], diretorio: str = DIRETORIO_MANIFESTO) -> Dict[str, Dict[str, Any]]:
+    """Grava o manifesto das fontes: um JSON com os hashes de conteúdo e um .npz de hashes por linha por fonte"""
+    os.makedirs(diretorio, exist_ok=True)
+    manifesto = gerar_manifesto(dados)
+    indice = {'versao': VERSAO_MANIFESTO, 'fontes': {}}
+    for fonte, info in manifesto.items():
+        arquivo_linhas = f"{fonte}_linhas.npz"
+
+        def escrever(destino, info=info):
+            with open(destino, 'wb') as f:
+                np.savez(f, chaves=info['chaves'], hashes=info['hashes'])
+
+        gravar_atomico(os.path.join(diretorio, arquivo_linhas), escrever)
+        indice['fontes'][fonte] = {
+            'hash_conteudo': info['hash_conteudo'],
+            'linhas': info['linhas'],
+            'arquivo_linhas': arquivo_linhas
+        }
+
+    def escrever_indice(destino):
+        with open(destino, 'w', encoding='utf-8') as f:
+            json.dump(indice, f, ensure_ascii=False, indent=2)
+
+    gravar_atomico(os.path.join(diretorio, 'manifesto.json'), escrever_indice)
+    return manifesto
+
+
+def carregar_manifesto(diretorio: str = DIRETORIO_MANIFESTO) -> Optional[Dict[str, Any]]:
+    """Lê o índice do manifesto gravado, ou None se não existir/for de outra versão"""
+    try:
+        with open(os.path.join(diretorio, 'manifesto.json'), 'r', encoding='utf-8') as f:
+            indice = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if indice.get('versao') != VERSAO_MANIFESTO:
+        return None
+    return indice
+
+
+def detectar_alteracoes(dados: Dict[str, pd.DataFrame],
+                        diretorio: str = DIRETORIO_MANIFESTO) -> Dict[str, Dict[str, Any]]:
+    """
+    Compara os dados atuais com o manifesto gravado, sem reler versões anteriores.
+
+    Returns:
+        Por fonte: {'alterado': bool,
+                    'adicionadas': posições (nos dados atuais) das linhas novas,
+                    'modificadas': posições (nos dados atuais) das linhas alteradas,
+                    'removidas': posições (na versão anterior) das linhas removidas}
+    """
+    indice = carregar_manifesto(diretorio) or {'fontes': {}}
+    vazio = np.array([], dtype=np.int64)
+    resultado = {}
+    for fonte, df in dados.items():
+        chaves, linhas = hashes_linhas(df, CHAVES_LINHA.get(fonte))
+        anterior = indice['fontes'].get(fonte)
+        if anterior is None:
+            resultado[fonte] = {'alterado': True, 'adicionadas': np.arange(len(df)),
+                                'modificadas': vazio, 'removidas': vazio}
+            continue
+        if anterior['hash_conteudo'] == _hash_conteudo(df, linhas):
+            resultado[fonte] = {'alterado': False, 'adicionadas': vazio,
+                                'modificadas': vazio, 'removidas': vazio}
+            continue
+        with np.load(os.path.join(diretorio, anterior['arquivo_linhas'])) as arquivo:
+            chaves_ant, linhas_ant = arquivo['chaves'], arquivo['hashes']
+        _, idx_atual, idx_ant = np.intersect1d(chaves, chaves_ant, assume_unique=True, return_indices=True)
+        adicionadas = np.setdiff1d(np.arange(len(chaves)), idx_atual)
+        removidas = np.setdiff1d(np.arange(len(chaves_ant)), idx_ant)
+        modificadas = np.sort(idx_atual[linhas[idx_atual] != linhas_ant[idx_ant]])
+        resultado[fonte] = {
+            'alterado': bool(len(adicionadas) or len(removidas) or len(modificadas)),
+            'adicionadas': adicionadas,
+            'modificadas': modificadas,
+            'removidas': removidas
+        }
+        logging.info(f"Alterações em {fonte}: {len(adicionadas)} adicionadas, "
+                     f"{len(modificadas)} modificadas, {len(removidas)} removidas")
+    return resultado
+
+
+def verificar_alteracoes(maturidade, alocacao, executivo, diretorio: str = DIRETORIO_MANIFESTO):
+    """Retorna True se alguma fonte mudou em relação ao manifesto (ou se não houver manifesto)"""
+    alteracoes = detectar_alteracoes({
+        'maturidade': maturidade,
+        'alocacao': alocacao,
+        'executivo': executivo
+    }, diretorio)
+    return any(info['alterado'] for info in alteracoes.values())
+
+def salvar_arquivos_anteriores(maturidade, alocacao, executivo):
     # Criar diretório output se não existir
     os.makedirs('output', exist_ok=True)
     
-    if not all(os.path.exists(arquivo) for arquivo in arquivos_anteriores):
-        return True
-    
-    # Carregar os arquivos anteriores
-    maturidade_anterior = pd.read_excel(arquivos_anteriores[0], engine='openpyxl')
-    alocacao_anterior = pd.read_excel(arquivos_anteriores[1], engine='openpyxl')
-    executivo_anterior = pd.read_excel(arquivos_anteriores[2], engine='openpyxl')
+    dados = {'maturidade': maturidade, 'alocacao': alocacao, 'executivo': executivo}
     
-    # Comparar os arquivos
-    alteracao_maturidade = not maturidade.equals(maturidade_anterior)
-    alteracao_alocacao = not alocacao.equals(alocacao_anterior)
-    alteracao_executivo = not executivo.equals(executivo_anterior)
+    # Manifesto usado por verificar_alteracoes na próxima execução
+    salvar_manifesto(dados)
     
-    return alteracao_maturidade or alteracao_alocacao or alteracao_executivo
+    # Salvar os dados atuais como snapshot versionado (Arrow, gravação atômica)
+    return salvar_snapshot(dados)
 
-def salvar_arquivos_anteriores(maturidade, alocacao, executivo):
-    # Criar diretório output se não existir
-    os.makedirs('output', exist_ok=True)
-    
-    # Salvar os arquivos atuais como versões anteriores
-    maturidade.to_excel('output/maturidade_anterior.xlsx', 
-                       index=False, 
-                       engine='openpyxl')
-    alocacao.to_excel('output/alocacao_anterior.xlsx', 
-                      index=False, 
-                      engine='openpyxl')
-    executivo.to_excel('output/executivo_anterior.xlsx', 
-                      index=False, 
-                      engine='openpyxl')
+def carregar_arquivos_anteriores(versao: Optional[str] = None,
+                                 como_tabela: bool = False,
+                                 diretorio: str = DIRETORIO_SNAPSHOTS) -> Dict[str, Any]:
+    """
+    Carrega a versão anterior dos dados a partir dos snapshots (padrão: a mais recente).
+    Com como_tabela=True, retorna pyarrow.Table mapeadas em memória, sem cópia,
+    para comparações históricas que não precisam de DataFrames.
+    """
+    return ler_snapshot(versao, diretorio=diretorio, como_tabela=como_tabela)
+
+def ler_planilha_em_blocos(caminho: str,
+                           sheet_name: Optional[str] = None,
+                           tamanho_bloco: int = 50000,
+                           esquema: Optional[Dict[str, Any]] = None) -> Iterator[pd.DataFrame]:
+    """
+    Lê uma fonte de dados em blocos de até tamanho_bloco linhas.
+
+    Arquivos .xlsx são percorridos com openpyxl em modo read-only, sem
+    materializar a aba inteira; .csv e .parquet usam a leitura em blocos
+    nativa de pandas/pyarrow. O esquema (ver esquemas.py), quando informado,
+    é aplicado a cada bloco.
+
+    Args:
+        caminho: Caminho do arquivo (.xlsx, .csv ou .parquet)
+        sheet_name: Aba da planilha (apenas .xlsx; padrão: aba ativa)
+        tamanho_bloco: Número máximo de linhas por bloco
+        esquema: Colunas e tipos a manter em cada bloco
+
+    Yields:
+        DataFrames com no máximo tamanho_bloco linhas
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    filtro = filtro_colunas(esquema)
+
+    if extensao == '.csv':
+        for bloco in pd.read_csv(caminho, chunksize=tamanho_bloco, usecols=filtro):
+            yield aplicar_esquema(bloco, esquema)
+        return
+
+    if extensao == '.parquet':
+        import pyarrow.parquet as pq
+        arquivo = pq.ParquetFile(caminho)
+        colunas = [c for c in arquivo.schema_arrow.names if filtro is None or filtro(c)]
+        for lote in arquivo.iter_batches(batch_size=tamanho_bloco, columns=colunas):
+            yield aplicar_esquema(lote.to_pandas(), esquema)
+        return
+
+    from openpyxl import load_workbook
+    workbook = load_workbook(caminho, read_only=True, data_only=True)
+    try:
+        planilha = workbook[sheet_name] if sheet_name else workbook.active
+        linhas = planilha.iter_rows(values_only=True)
+        cabecalho = next(linhas, None)
+        if cabecalho is None:
+            return
+        indices = [i for i, c in enumerate(cabecalho) if c is not None and (filtro is None or filtro(c))]
+        colunas = [str(cabecalho[i]) for i in indices]
+        buffer = []
+        total = 0
+        for linha in linhas:
+            valores = [linha[i] if i < len(linha) else None for i in indices]
+            # Linhas em branco são descartadas, como em pd.read_excel
+            if all(v is None for v in valores):
+                continue
+            buffer.append(valores)
+            if len(buffer) >= tamanho_bloco:
+                total += len(buffer)
+                yield aplicar_esquema(pd.DataFrame(buffer, columns=colunas), esquema)
+                buffer = []
+        if buffer:
+            total += len(buffer)
+            yield aplicar_esquema(pd.DataFrame(buffer, columns=colunas), esquema)
+        logging.info(f"Leitura em blocos de {caminho} concluída: {total} linhas")
+    finally:
+        workbook.close()
@@ -0,0 +1,70 @@
+"""
+Agente Insights - Módulo de Normalização de Nomes
+================================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Chave canônica única para nomes de tribos e squads, usada no merge dos dados
+(padronizar_ids, cruzar_dados_completo) e na identificação de entidades nas
+consultas (normalizar_texto, identificar_entidade_consulta).
+
+Colunas são normalizadas por fatoração: apenas os valores distintos passam
+pela função de limpeza (memoizada), e o resultado é expandido de volta pelos
+códigos. O custo é proporcional ao número de nomes distintos, não de linhas.
+O cache é limitado (TAMANHO_CACHE), pois as consultas livres do chat também
+passam pela limpeza.
+"""
+
+import re
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+_RE_ESPECIAIS = re.compile(r'[^a-z0-9\s]')
+_RE_ESPACOS = re.compile(r'\s+')
+# Nomes distintos guardados no cache da limpeza (LRU)
+TAMANHO_CACHE = 65536
+
+
+@lru_cache(maxsize=TAMANHO_CACHE)
+def _limpar(nome: str) -> str:
+    # Remove acentos e converte para minúsculas
+    nome = unidecode(nome).lower().strip()
+    # Remove caracteres especiais
+    nome = _RE_ESPECIAIS.sub('', nome)
+    # Substitui múltiplos espaços por um único
+    return _RE_ESPACOS.sub(' ', nome).strip()
+
+
+def chave_canonica(nome) -> str:
+    """
+    Normaliza um nome: sem acentos, minúsculo, sem caracteres especiais e com
+    espaços simples. Valores nulos viram string vazia.
+    """
+    if nome is None or (not isinstance(nome, str) and pd.isna(nome)):
+        return ''
+    return _limpar(str(nome))
+
+
+def chave_compacta(nome) -> str:
+    """Chave canônica sem espaços, para comparar consultas livres ('vendas pj' == 'vendaspj')"""
+    return chave_canonica(nome).replace(' ', '')
+
+
+def normalizar_serie(serie: pd.Series, compacta: bool = False) -> pd.Series:
+    """
+    Aplica chave_canonica (ou chave_compacta) a uma coluna inteira, normalizando
+    somente os valores distintos.
+    """
+    codigos, unicos = pd.factorize(serie)
+    funcao = chave_compacta if compacta else chave_canonica
+    # Código -1 (nulo) aponta para o último elemento: string vazia
+    mapeados = np.array([funcao(u) for u in unicos] + [''], dtype=object)
+    return pd.Series(mapeados[codigos], index=serie.index, name=serie.name)
@@ -0,0 +1,168 @@
+"""
+Agente Insights - Módulo de Agregação Particionada
+=================================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Execução de agregar_dataframe em um pool de processos. As colunas usadas na
+agregação são convertidas em arrays (códigos de pd.factorize para textos e
+chaves, float64 para métricas) e copiadas uma única vez para um bloco de
+memória compartilhada. O nome do bloco e o layout, com as tabelas código →
+valor das colunas de texto, vão uma única vez para cada processo, no
+initializer do pool; cada tarefa leva só o nível e os códigos das entidades
+do seu shard, sem pickling do DataFrame nem das tabelas.
+
+Os shards do nível de tribos são formados por tribos inteiras, e os do nível
+de squads por squads inteiros (um squad pode aparecer em mais de uma tribo).
+Como cada entidade tem todas as suas linhas no mesmo shard, na ordem
+original, o resultado mesclado é idêntico ao de agregar_dataframe.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .agregacao import COLUNA_PBI, COLUNAS_METRICAS, NIVEIS, agregar_dataframe
+
+# Abaixo disso o custo de subir o pool supera o ganho (padrão de linhas_minimas)
+LINHAS_MINIMAS_PARTICIONAMENTO = 200_000
+
+# Bloco compartilhado e layout do processo filho (ver _inicializar_processo)
+_ESTADO_PROCESSO: Dict[str, Any] = {}
+
+
+def _colunas_agregacao(df: pd.DataFrame) -> List[str]:
+    colunas = ['Tribo', 'squad', 'person', COLUNA_PBI] + list(COLUNAS_METRICAS.values())
+    return [c for c in colunas if c in df.columns]
+
+
+def _publicar(df: pd.DataFrame) -> Tuple[shared_memory.SharedMemory, Dict[str, Any]]:
+    """
+    Copia as colunas da agregação para memória compartilhada.
+
+    Returns:
+        (bloco, layout) com layout[coluna] = (deslocamento, dtype, valores únicos ou None)
+    """
+    arrays = {}
+    unicos = {}
+    for coluna in _colunas_agregacao(df):
+        if coluna in COLUNAS_METRICAS.values():
+            arrays[coluna] = df[coluna].to_numpy(dtype=np.float64, na_value=np.nan)
+        else:
+            codigos, valores = pd.factorize(df[coluna])
+            arrays[coluna] = codigos.astype(np.int64)
+            unicos[coluna] = valores
+    tamanho = max(sum(a.nbytes for a in arrays.values()), 1)
+    bloco = shared_memory.SharedMemory(create=True, size=tamanho)
+    layout = {'linhas': len(df), 'colunas': {}}
+    deslocamento = 0
+    for coluna, array in arrays.items():
+        destino = np.ndarray(array.shape, dtype=array.dtype, buffer=bloco.buf, offset=deslocamento)
+        destino[:] = array
+        layout['colunas'][coluna] = (deslocamento, array.dtype.str, unicos.get(coluna))
+        deslocamento += array.nbytes
+    return bloco, layout
+
+
+def _inicializar_processo(nome_bloco: str, layout: Dict[str, Any]) -> None:
+    """
+    Executado uma vez em cada processo filho: abre o bloco compartilhado e
+    guarda o layout, com as tabelas código → valor prontas para indexação.
+    """
+    _ESTADO_PROCESSO['bloco'] = shared_memory.SharedMemory(name=nome_bloco)
+    _ESTADO_PROCESSO['layout'] = layout
+    # Código -1 (nulo) aponta para o None acrescentado ao final
+    _ESTADO_PROCESSO['tabelas'] = {
+        coluna: np.append(np.asarray(unicos, dtype=object), None)
+        for coluna, (_, _, unicos) in layout['colunas'].items() if unicos is not None
+    }
+
+
+def _agregar_shard(nivel: str, entidades: np.ndarray) -> Tuple[Dict, Dict]:
+    """Executado no processo filho: reconstrói as linhas do shard e agrega um nível"""
+    bloco = _ESTADO_PROCESSO['bloco']
+    layout = _ESTADO_PROCESSO['layout']
+    tabelas = _ESTADO_PROCESSO['tabelas']
+    n = layout['linhas']
+    col_entidade = NIVEIS[nivel][0]
+    arrays = {
+        coluna: np.ndarray((n,), dtype=np.dtype(dtype), buffer=bloco.buf, offset=deslocamento)
+        for coluna, (deslocamento, dtype, _) in layout['colunas'].items()
+    }
+    linhas = np.flatnonzero(np.isin(arrays[col_entidade], entidades))
+    dados = {}
+    for coluna, array in arrays.items():
+        valores = array[linhas]
+        dados[coluna] = tabelas[coluna][valores] if coluna in tabelas else valores
+    estrutura, insights_tribos, insights_squads = agregar_dataframe(pd.DataFrame(dados), niveis=[nivel])
+    insights = insights_tribos if nivel == 'tribos' else insights_squads
+    return estrutura[nivel], insights
+
+
+def _shards(codigos: np.ndarray, n_entidades: int, n_shards: int) -> List[np.ndarray]:
+    """Distribui as entidades em n_shards com quantidade de linhas equilibrada (maiores primeiro)"""
+    tamanhos = np.bincount(codigos[codigos >= 0], minlength=n_entidades)
+    cargas = np.zeros(n_shards, dtype=np.int64)
+    shards: List[List[int]] = [[] for _ in range(n_shards)]
+    for entidade in np.argsort(-tamanhos, kind='stable'):
+        destino = int(np.argmin(cargas))
+        shards[destino].append(int(entidade))
+        cargas[destino] += tamanhos[entidade]
+    return [np.array(s, dtype=np.int64) for s in shards if s]
+
+
+def agregar_particionado(df: pd.DataFrame, processos: Optional[int] = None,
+                         linhas_minimas: int = LINHAS_MINIMAS_PARTICIONAMENTO) -> Tuple[Dict, Dict, Dict]:
+    """
+    agregar_dataframe com os níveis de tribos e squads divididos em shards
+    processados em paralelo. DataFrames menores que linhas_minimas (padrão:
+    LINHAS_MINIMAS_PARTICIONAMENTO), ou processos=1, são agregados diretamente.
+
+    Returns:
+        Tupla (estrutura, insights_tribos, insights_squads)
+    """
+    processos = processos or os.cpu_count() or 1
+    if processos <= 1 or len(df) < linhas_minimas:
+        return agregar_dataframe(df)
+
+    bloco, layout = _publicar(df)
+    try:
+        tarefas = []
+        with ProcessPoolExecutor(max_workers=processos, initializer=_inicializar_processo,
+                                 initargs=(bloco.name, layout)) as executor:
+            for nivel, (col_entidade, _) in NIVEIS.items():
+                deslocamento, dtype, unicos = layout['colunas'][col_entidade]
+                codigos = np.ndarray((len(df),), dtype=np.dtype(dtype), buffer=bloco.buf, offset=deslocamento)
+                for entidades in _shards(codigos, len(unicos), processos):
+                    tarefas.append((nivel, executor.submit(_agregar_shard, nivel, entidades)))
+            resultados = [(nivel, future.result()) for nivel, future in tarefas]
+    finally:
+        bloco.close()
+        bloco.unlink()
+    logging.info(f"Agregação particionada: {len(tarefas)} shards em {processos} processos")
+
+    # Reordena as entidades pela primeira ocorrência, como em agregar_dataframe
+    estrutura = {'tribos': {}, 'squads': {}, 'pessoas': set()}
+    insights = {'tribos': {}, 'squads': {}}
+    parciais = {nivel: ({}, {}) for nivel in NIVEIS}
+    for nivel, (estrutura_shard, insights_shard) in resultados:
+        parciais[nivel][0].update(estrutura_shard)
+        parciais[nivel][1].update(insights_shard)
+    for nivel, (col_entidade, _) in NIVEIS.items():
+        estrutura_nivel, insights_nivel = parciais[nivel]
+        for entidade in layout['colunas'][col_entidade][2]:
+            estrutura[nivel][entidade] = estrutura_nivel[entidade]
+            insights[nivel][entidade] = insights_nivel[entidade]
+            estrutura['pessoas'].update(estrutura_nivel[entidade]['pessoas'])
+    estrutura['pessoas'] = list(estrutura['pessoas'])
+    return estrutura, insights['tribos'], insights['squads']
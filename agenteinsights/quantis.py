@@ -0,0 +1,194 @@
+"""
+Agente Insights - Módulo de Esboços de Quantis
+=============================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Esboço de quantis mesclável no estilo t-digest, para reportar p50, p75, p85
+e p95 de lead time e cycle time sem manter todos os valores em memória. Um
+esboço pode ser montado por bloco ou por quarter e mesclado até squad, tribo
+e organização; a mesclagem é associativa e não depende da ordem dos blocos.
+
+Os valores são resumidos em centroides (média, peso). A compressão usa a
+função de escala k1 do t-digest com δ = π / erro: o peso máximo de um
+centroide é de erro × N no centro da distribuição e diminui nas caudas, de
+modo que o erro de posto de p50 fica limitado por `erro` e o de p95 por uma
+fração dele, também depois de mesclas. A memória é O(1 / erro) centroides,
+independente do histórico. Enquanto houver
+poucos valores distintos, nada é comprimido e os percentis são exatos (iguais
+a np.percentile com interpolação linear).
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+ERRO_PADRAO = 0.01
+PERCENTIS_PADRAO = (50, 75, 85, 95)
+# Os centroides só são comprimidos quando passam deste múltiplo do limite
+FATOR_BUFFER = 4
+
+
+class EsbocoQuantis:
+    """
+    Esboço t-digest de uma distribuição de valores. Mantém total, média,
+    mínimo e máximo exatos; os percentis são exatos até a primeira compressão.
+    """
+
+    def __init__(self, erro: float = ERRO_PADRAO):
+        if not 0 < erro < 1:
+            raise ValueError(f"erro deve estar entre 0 e 1, recebido {erro}")
+        self.erro = erro
+        # k1 cobre π / δ do posto por unidade em q = 0.5; δ = π / erro limita
+        # cada centroide central a erro × N valores
+        self.compressao = math.ceil(math.pi / erro)
+        self._medias = np.array([], dtype=float)
+        self._pesos = np.array([], dtype=float)
+        self.total = 0.0
+        self.soma = 0.0
+        self.minimo = math.inf
+        self.maximo = -math.inf
+        self.comprimido = False
+
+    def __len__(self) -> int:
+        return len(self._medias)
+
+    def vazio(self) -> bool:
+        return self.total == 0
+
+    def adicionar(self, valores: Iterable[float], pesos: Optional[Iterable[float]] = None) -> 'EsbocoQuantis':
+        """Incorpora valores (opcionalmente com pesos/ocorrências); NaN é ignorado"""
+        v = np.asarray(valores, dtype=float).ravel()
+        p = np.ones(len(v)) if pesos is None else np.asarray(pesos, dtype=float).ravel()
+        validos = ~np.isnan(v) & (p > 0)
+        v, p = v[validos], p[validos]
+        if len(v) == 0:
+            return self
+        self.total += float(p.sum())
+        self.soma += float(np.dot(v, p))
+        self.minimo = min(self.minimo, float(v.min()))
+        self.maximo = max(self.maximo, float(v.max()))
+        self._incorporar(v, p)
+        return self
+
+    def mesclar(self, outro: 'EsbocoQuantis') -> 'EsbocoQuantis':
+        """Incorpora outro esboço; o erro resultante é o maior dos dois"""
+        if outro.vazio():
+            return self
+        self.erro = max(self.erro, outro.erro)
+        self.compressao = min(self.compressao, outro.compressao)
+        self.total += outro.total
+        self.soma += outro.soma
+        self.minimo = min(self.minimo, outro.minimo)
+        self.maximo = max(self.maximo, outro.maximo)
+        self.comprimido = self.comprimido or outro.comprimido
+        self._incorporar(outro._medias, outro._pesos)
+        return self
+
+    def _incorporar(self, medias: np.ndarray, pesos: np.ndarray) -> None:
+        medias = np.concatenate((self._medias, medias))
+        pesos = np.concatenate((self._pesos, pesos))
+        ordem = np.argsort(medias, kind='stable')
+        medias, pesos = medias[ordem], pesos[ordem]
+        # Valores repetidos viram um único centroide exato
+        if len(medias) > 1:
+            novo = np.concatenate(([True], medias[1:] != medias[:-1]))
+            if not novo.all():
+                grupo = np.cumsum(novo) - 1
+                pesos = np.bincount(grupo, weights=pesos)
+                medias = medias[novo]
+        self._medias, self._pesos = medias, pesos
+        if len(medias) > FATOR_BUFFER * self.compressao:
+            self._comprimir()
+
+    def _comprimir(self) -> None:
+        """
+        Agrupa centroides vizinhos cujo posto central cai na mesma unidade da
+        escala k1(q) = δ / (2π) · asin(2q − 1). Cada grupo cobre no máximo uma
+        unidade de k, ou seja, cerca de 2π · √(q(1 − q)) · N / δ valores (erro × N
+        na mediana).
+        """
+        acumulado = np.cumsum(self._pesos)
+        q = (acumulado - self._pesos / 2) / acumulado[-1]
+        k = self.compressao / (2 * math.pi) * np.arcsin(2 * q - 1)
+        grupo = np.floor(k).astype(np.int64)
+        grupo -= grupo[0]
+        pesos = np.bincount(grupo, weights=self._pesos)
+        somas = np.bincount(grupo, weights=self._medias * self._pesos)
+        ocupados = pesos > 0
+        self._pesos = pesos[ocupados]
+        self._medias = somas[ocupados] / self._pesos
+        self.comprimido = True
+
+    def media(self) -> float:
+        return self.soma / self.total if self.total else 0.0
+
+    def percentis(self, percentis: Iterable[float] = PERCENTIS_PADRAO) -> List[float]:
+        """
+        Percentis com a interpolação linear de np.percentile: o alvo é a
+        posição q · (N − 1), e cada centroide ocupa o posto central da sua
+        faixa, com mínimo e máximo fixos nas extremidades.
+        """
+        percentis = list(percentis)
+        if self.vazio():
+            return [0.0] * len(percentis)
+        antes = np.cumsum(self._pesos) - self._pesos
+        if self.comprimido:
+            # Centroide de valores distintos: sua média fica no posto central
+            centro = antes + (self._pesos - 1) / 2
+            posicoes = np.concatenate(([0.0], centro, [self.total - 1]))
+            valores = np.concatenate(([self.minimo], self._medias, [self.maximo]))
+        else:
+            # Valor repetido ocupa uma faixa de postos, como no array expandido
+            faixas = np.column_stack((antes, antes + self._pesos - 1)).ravel()
+            posicoes = np.concatenate(([0.0], faixas, [self.total - 1]))
+            valores = np.concatenate(([self.minimo], np.repeat(self._medias, 2), [self.maximo]))
+        alvos = np.asarray(percentis, dtype=float) / 100 * (self.total - 1)
+        return [float(x) for x in np.interp(alvos, posicoes, valores)]
+
+    def estatisticas(self) -> Dict[str, float]:
+        """Mesmo formato de agregacao.estatisticas_ponderadas"""
+        if self.vazio():
+            return {'medio': 0, 'mediana': 0, 'p75': 0, 'p85': 0, 'p95': 0}
+        mediana, p75, p85, p95 = self.percentis((50, 75, 85, 95))
+        return {'medio': self.media(), 'mediana': mediana, 'p75': p75, 'p85': p85, 'p95': p95}
+
+    def para_dict(self) -> Dict:
+        """Representação serializável (JSON) do esboço"""
+        return {
+            'erro': self.erro,
+            'comprimido': self.comprimido,
+            'medias': self._medias.tolist(),
+            'pesos': self._pesos.tolist(),
+            'total': self.total,
+            'soma': self.soma,
+            'minimo': self.minimo if self.total else None,
+            'maximo': self.maximo if self.total else None
+        }
+
+    @classmethod
+    def de_dict(cls, dados: Dict) -> 'EsbocoQuantis':
+        esboco = cls(dados['erro'])
+        esboco._medias = np.asarray(dados['medias'], dtype=float)
+        esboco._pesos = np.asarray(dados['pesos'], dtype=float)
+        esboco.total = dados['total']
+        esboco.soma = dados['soma']
+        esboco.comprimido = dados.get('comprimido', True)
+        if esboco.total:
+            esboco.minimo = dados['minimo']
+            esboco.maximo = dados['maximo']
+        return esboco
+
+
+def mesclar_esbocos(esbocos: Iterable[EsbocoQuantis], erro: float = ERRO_PADRAO) -> EsbocoQuantis:
+    """Mescla vários esboços (por exemplo, dos squads de uma tribo) em um novo"""
+    resultado = EsbocoQuantis(erro)
+    for esboco in esbocos:
+        resultado.mesclar(esboco)
+    return resultado
@@ -0,0 +1,158 @@
+"""
+Agente Insights - Módulo de Snapshots dos Dados
+==============================================
+Versão: 1.0.0
+Release: 8
+Data: 17/10/2026
+
+Histórico:
+- 1.0.0 (Release 8): Versão inicial
+
+Descrição:
+Armazenamento versionado das fontes de dados entre execuções. Cada snapshot
+é um diretório com carimbo de data/hora contendo um arquivo Arrow IPC
+(Feather v2) por fonte e um meta.json. Sem compressão, os arquivos podem ser
+abertos por memory-map, sem cópia; com compressão (lz4/zstd) ocupam menos
+disco. A gravação é atômica (diretório temporário + rename) e os snapshots
+mais antigos são removidos conforme a retenção configurada.
+"""
+
+import json
+import logging
+import os
+import pickle
+import shutil
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import pandas as pd
+
+DIRETORIO_SNAPSHOTS = 'output/snapshots'
+VERSAO_SNAPSHOT = 1
+RETENCAO_PADRAO = 5
+
+
+def _pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        return pyarrow
+    except ImportError:
+        return None
+
+
+def listar_snapshots(diretorio: str = DIRETORIO_SNAPSHOTS) -> List[str]:
+    """Lista as versões de snapshot disponíveis, da mais antiga para a mais recente"""
+    if not os.path.isdir(diretorio):
+        return []
+    return sorted(
+        nome for nome in os.listdir(diretorio)
+        if os.path.isfile(os.path.join(diretorio, nome, 'meta.json'))
+    )
+
+
+def _gravar_fonte(df: pd.DataFrame, destino_base: str, compressao: Optional[str]) -> Dict[str, str]:
+    """Grava uma fonte em Arrow IPC; cai para pickle se a conversão para Arrow falhar"""
+    pa = _pyarrow()
+    if pa is not None:
+        try:
+            tabela = pa.Table.from_pandas(df, preserve_index=False)
+            opcoes = pa.ipc.IpcWriteOptions(compression=compressao)
+            with pa.OSFile(destino_base + '.arrow', 'wb') as sink:
+                with pa.ipc.new_file(sink, tabela.schema, options=opcoes) as writer:
+                    writer.write_table(tabela)
+            return {'arquivo': os.path.basename(destino_base) + '.arrow', 'formato': 'arrow'}
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError) as e:
+            logging.warning(f"Snapshot de {os.path.basename(destino_base)} gravado em pickle: {str(e)}")
+    with open(destino_base + '.pkl', 'wb') as f:
+        pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return {'arquivo': os.path.basename(destino_base) + '.pkl', 'formato': 'pickle'}
+
+
+def salvar_snapshot(dados: Dict[str, pd.DataFrame],
+                    diretorio: str = DIRETORIO_SNAPSHOTS,
+                    compressao: Optional[str] = None,
+                    retencao: int = RETENCAO_PADRAO) -> str:
+    """
+    Grava um novo snapshot das fontes e aplica a retenção.
+
+    Args:
+        dados: Fonte -> DataFrame
+        diretorio: Diretório raiz dos snapshots
+        compressao: None (memory-mappable), 'lz4' ou 'zstd'
+        retencao: Quantidade de snapshots mantidos (os mais antigos são removidos)
+
+    Returns:
+        Identificador (nome do diretório) do snapshot gravado
+    """
+    os.makedirs(diretorio, exist_ok=True)
+    versao = datetime.now().strftime('%Y%m%d_%H%M%S_%f')
+    temporario = os.path.join(diretorio, f".tmp_{versao}_{os.getpid()}")
+    os.makedirs(temporario)
+    try:
+        meta = {
+            'versao_formato': VERSAO_SNAPSHOT,
+            'criado_em': datetime.now().isoformat(),
+            'compressao': compressao,
+            'fontes': {}
+        }
+        for fonte, df in dados.items():
+            info = _gravar_fonte(df, os.path.join(temporario, fonte), compressao)
+            info['linhas'] = len(df)
+            meta['fontes'][fonte] = info
+        with open(os.path.join(temporario, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        os.replace(temporario, os.path.join(diretorio, versao))
+    finally:
+        if os.path.isdir(temporario):
+            shutil.rmtree(temporario, ignore_errors=True)
+    logging.info(f"Snapshot {versao} gravado com {len(dados)} fontes")
+    aplicar_retencao(diretorio, retencao)
+    return versao
+
+
+def aplicar_retencao(diretorio: str = DIRETORIO_SNAPSHOTS, retencao: int = RETENCAO_PADRAO) -> List[str]:
+    """Remove os snapshots mais antigos além da retenção e retorna os removidos"""
+    versoes = listar_snapshots(diretorio)
+    removidos = versoes[:-retencao] if retencao > 0 else versoes
+    for versao in removidos:
+        shutil.rmtree(os.path.join(diretorio, versao), ignore_errors=True)
+    if removidos:
+        logging.info(f"Snapshots removidos pela retenção: {removidos}")
+    return removidos
+
+
+def ler_snapshot(versao: Optional[str] = None,
+                 fontes: Optional[List[str]] = None,
+                 diretorio: str = DIRETORIO_SNAPSHOTS,
+                 como_tabela: bool = False) -> Dict[str, Any]:
+    """
+    Lê um snapshot (padrão: o mais recente).
+
+    Arquivos Arrow sem compressão são abertos por memory-map: com
+    como_tabela=True, as pyarrow.Table retornadas referenciam o arquivo
+    mapeado, sem cópia. Com como_tabela=False, retorna DataFrames.
+
+    Returns:
+        Fonte -> DataFrame (ou pyarrow.Table); dicionário vazio se não houver snapshot
+    """
+    versoes = listar_snapshots(diretorio)
+    if not versoes:
+        return {}
+    versao = versao or versoes[-1]
+    pasta = os.path.join(diretorio, versao)
+    with open(os.path.join(pasta, 'meta.json'), 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+    resultado = {}
+    for fonte, info in meta['fontes'].items():
+        if fontes is not None and fonte not in fontes:
+            continue
+        caminho = os.path.join(pasta, info['arquivo'])
+        if info['formato'] == 'arrow':
+            pa = _pyarrow()
+            tabela = pa.ipc.open_file(pa.memory_map(caminho, 'r')).read_all()
+            resultado[fonte] = tabela if como_tabela else tabela.to_pandas()
+        else:
+            with open(caminho, 'rb') as f:
+                resultado[fonte] = pickle.load(f)
+    return resultado
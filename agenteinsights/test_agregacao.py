@@ -0,0 +1,53 @@
+"""
+Testes da agregação de métricas do Agente Insights
+=================================================
+As estatísticas por grupo de agregar_dataframe, vindas do kernel de
+computacao.py, são comparadas com np.mean/np.median/np.percentile por grupo,
+e o backend informado é o que as calcula.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agenteinsights.agregacao import _estatisticas_por_grupo, agregar_dataframe
+from agenteinsights.computacao import BackendNumpy
+
+
+def test_estatisticas_por_grupo_iguais_ao_laco():
+    rng = np.random.default_rng(11)
+    codigos = rng.integers(-1, 30, 4000)
+    valores = rng.integers(0, 90, 4000).astype(float)
+    valores[rng.random(4000) < 0.05] = np.nan
+    resultado = _estatisticas_por_grupo(codigos, valores, 32)
+    for grupo, stats in enumerate(resultado):
+        v = valores[(codigos == grupo) & ~np.isnan(valores)]
+        if len(v) == 0:
+            assert stats == {'medio': 0, 'mediana': 0, 'p75': 0, 'p85': 0, 'p95': 0}
+            continue
+        assert stats['medio'] == pytest.approx(np.mean(v))
+        assert stats['mediana'] == pytest.approx(np.median(v))
+        for q in (75, 85, 95):
+            assert stats[f'p{q}'] == np.percentile(v, q)
+
+
+class BackendContador(BackendNumpy):
+    chamadas = 0
+
+    def estatisticas_por_grupo(self, *args, **kwargs):
+        self.chamadas += 1
+        return super().estatisticas_por_grupo(*args, **kwargs)
+
+
+def test_agregar_dataframe_usa_o_backend():
+    df = pd.DataFrame({
+        'Tribo': ['A', 'A', 'B'], 'squad': ['s1', 's2', 's3'], 'person': ['p1', 'p2', 'p3'],
+        '[SumLead_Time]': [1.0, 3.0, 5.0], '[SumCycle_Time]': [2.0, 2.0, np.nan],
+        'PBI_Concuidos_Executivo[Key]': [1, 2, 3],
+    })
+    backend = BackendContador()
+    _, tribos, squads = agregar_dataframe(df, backend=backend)
+    # Duas métricas presentes em cada um dos dois níveis
+    assert backend.chamadas == 4
+    assert tribos['A']['lead_time_medio'] == pytest.approx(2.0)
+    assert squads['s3']['cycle_time_medio'] == 0
@@ -0,0 +1,104 @@
+"""
+Testes da análise de alocação do Agente Insights
+===============================================
+O motor vetorizado (analisar_alocacao) é comparado com o cálculo antigo por
+groupby/iterrows, e AlocacaoIndex.consultar com analisar_alocacao sobre o
+DataFrame, para cada tribo, squad e combinação dos dois.
+"""
+
+from collections import Counter
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agenteinsights.alocacao import AlocacaoIndex
+from agenteinsights.analise_insights import analisar_alocacao
+
+
+def alocacoes(n=400, semente=5):
+    rng = np.random.default_rng(semente)
+    hoje = pd.Timestamp.now().normalize()
+    fim = hoje + pd.to_timedelta(rng.integers(-200, 200, n), unit='D')
+    df = pd.DataFrame({
+        'person': [f'p{i}' for i in rng.integers(0, 120, n)],
+        'squad': [f's{i}' for i in rng.integers(0, 15, n)],
+        'tribe': [f't{i}' for i in rng.integers(0, 4, n)],
+        'role': rng.choice(['dev', 'qa', 'po', 'sm'], n),
+        'endDate': pd.Series(fim).where(rng.random(n) < 0.7),
+        'percentageAllocation': [f'{v}%' for v in rng.integers(10, 101, n)],
+    })
+    df.loc[rng.random(n) < 0.05, 'role'] = None
+    df.loc[rng.random(n) < 0.05, 'tribe'] = None
+    return df
+
+
+def analise_por_loop(dados, tribo=None, squad=None):
+    """Cálculo antigo (groupby + iterrows) com os ajustes documentados no motor vetorizado"""
+    df = dados[dados['endDate'].isna() | (pd.to_datetime(dados['endDate']) > pd.Timestamp.now())]
+    if tribo:
+        df = df[df['tribe'] == tribo]
+    if squad:
+        df = df[df['squad'] == squad]
+    df = df.assign(percentageAllocation=pd.to_numeric(
+        df['percentageAllocation'].astype(str).str.replace('%', ''), errors='coerce') / 100)
+    squads_por_pessoa = df.groupby('person')['squad'].nunique()
+    com_papel = df[df['role'].notna()]
+    return {
+        'papeis': com_papel.groupby('role').size().to_dict(),
+        'pessoas_multi_squad': [p for p in df['person'].unique() if squads_por_pessoa[p] > 1],
+        'media_pessoas_squad': float(df.groupby('squad').size().mean()) if len(df) else 0,
+        'pessoas_ativas': df['person'].dropna().unique().tolist(),
+        'squads_ativos': df['squad'].dropna().unique().tolist(),
+        'tribos_ativas': df['tribe'].dropna().unique().tolist(),
+        'alocacoes_ativas': [
+            {'pessoa': row['person'], 'squad': row['squad'], 'tribo': row['tribe']}
+            for _, row in df.iterrows() if pd.notna(row['person']) and pd.notna(row['squad']) and pd.notna(row['tribe'])
+        ],
+        'alocacao_media': df.groupby('squad')['percentageAllocation'].mean().to_dict() if len(df) else {},
+        'composicao_squads': {
+            'role': com_papel.groupby('squad')['role'].agg(lambda x: dict(Counter(x))).to_dict(),
+            'percentageAllocation': df.groupby('squad')['percentageAllocation'].mean().to_dict(),
+        } if len(df) else {},
+    }
+
+
+def comparar(obtido, esperado):
+    assert set(obtido) == set(esperado)
+    for chave, valor in esperado.items():
+        if chave in ('alocacao_media', 'media_pessoas_squad'):
+            assert obtido[chave] == pytest.approx(valor)
+        elif chave == 'composicao_squads' and valor:
+            assert obtido[chave]['role'] == valor['role']
+            assert obtido[chave]['percentageAllocation'] == pytest.approx(valor['percentageAllocation'])
+        else:
+            assert obtido[chave] == valor, chave
+
+
+def test_vetorizado_igual_ao_loop():
+    dados = alocacoes()
+    comparar(analisar_alocacao(dados), analise_por_loop(dados))
+    for tribo, squad in [('t1', None), (None, 's3'), ('t2', 's7'), ('t0', 'inexistente')]:
+        comparar(analisar_alocacao(dados, tribo, squad), analise_por_loop(dados, tribo, squad))
+
+
+def test_colunas_ausentes_retornam_analise_vazia():
+    analise = analisar_alocacao(alocacoes().drop(columns='role'))
+    assert analise['papeis'] == {} and analise['alocacoes_ativas'] == []
+    assert analisar_alocacao(alocacoes().drop(columns='role'), compacto=True) is None
+
+
+def test_indice_igual_a_analise_do_dataframe():
+    dados = alocacoes()
+    indice = AlocacaoIndex(dados)
+    assert len(indice) == int((dados['endDate'].isna() | (dados['endDate'] > pd.Timestamp.now())).sum())
+    consultas = [(None, None)] + [(t, None) for t in indice.tribos()] + [(None, s) for s in indice.squads()]
+    consultas += [('t1', 's3'), ('t2', 'inexistente'), ('inexistente', None)]
+    for tribo, squad in consultas:
+        comparar(indice.consultar(tribo, squad), analisar_alocacao(dados, tribo, squad))
+        comparar(analisar_alocacao(indice, tribo, squad), analise_por_loop(dados, tribo, squad))
+
+
+def test_indice_exige_colunas_base():
+    with pytest.raises(ValueError):
+        AlocacaoIndex(alocacoes().drop(columns='endDate'))
@@ -0,0 +1,66 @@
+"""
+Testes do armazém de análises do Agente Insights
+===============================================
+O artefato gravado só é reaproveitado com as mesmas entradas e os mesmos
+parâmetros: um mtime novo com o mesmo conteúdo ainda vale; conteúdo,
+parâmetros ou versão diferentes pedem uma nova execução do pipeline.
+"""
+
+import os
+
+import pytest
+
+from agenteinsights import armazem
+from agenteinsights.armazem import carregar_analises, parametros_pipeline, salvar_analises
+
+ANALISES = [{'tipo': 'tribo', 'nome': 'Vendas', 'insights': {'throughput': 3}},
+            {'tipo': 'squad', 'nome': 'PIX-2', 'insights': {'throughput': 1}}]
+ESTRUTURA = {'tribos': {'Vendas': {'squads': ['PIX-2'], 'pessoas': []}},
+             'squads': {'PIX-2': {'tribos': ['Vendas'], 'pessoas': []}}}
+
+
+@pytest.fixture
+def arquivos(tmp_path):
+    caminhos = {}
+    for fonte in ('maturidade', 'alocacao', 'executivo'):
+        caminho = tmp_path / f'{fonte}.xlsx'
+        caminho.write_bytes(fonte.encode() * 10)
+        caminhos[fonte] = str(caminho)
+    return caminhos
+
+
+def test_armazem_reaproveitado_com_as_mesmas_entradas(arquivos, tmp_path):
+    diretorio = str(tmp_path / 'armazem')
+    assert salvar_analises(ANALISES, ESTRUTURA, arquivos=arquivos, diretorio=diretorio)
+    analises, estrutura = carregar_analises(arquivos=arquivos, diretorio=diretorio)
+    assert list(analises) == ANALISES and estrutura == ESTRUTURA
+
+    # Mesmo conteúdo com outro mtime: ainda vale
+    stat = os.stat(arquivos['alocacao'])
+    os.utime(arquivos['alocacao'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert carregar_analises(arquivos=arquivos, diretorio=diretorio) is not None
+
+
+def test_armazem_invalidado(arquivos, tmp_path, monkeypatch):
+    diretorio = str(tmp_path / 'armazem')
+    assert carregar_analises(arquivos=arquivos, diretorio=diretorio) is None
+    salvar_analises(ANALISES, ESTRUTURA, arquivos=arquivos, diretorio=diretorio)
+    assert carregar_analises(parametros_pipeline(executivo_em_blocos=True), arquivos, diretorio) is None
+
+    # Conteúdo alterado com o mesmo tamanho
+    stat = os.stat(arquivos['executivo'])
+    with open(arquivos['executivo'], 'r+b') as f:
+        f.write(b'E')
+    os.utime(arquivos['executivo'], ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert carregar_analises(arquivos=arquivos, diretorio=diretorio) is None
+
+    salvar_analises(ANALISES, ESTRUTURA, arquivos=arquivos, diretorio=diretorio)
+    monkeypatch.setattr(armazem, 'VERSAO_ARMAZEM', armazem.VERSAO_ARMAZEM + 1)
+    assert carregar_analises(arquivos=arquivos, diretorio=diretorio) is None
+
+
+def test_entrada_ausente_nao_grava(arquivos, tmp_path):
+    os.remove(arquivos['maturidade'])
+    diretorio = str(tmp_path / 'armazem')
+    assert not salvar_analises(ANALISES, ESTRUTURA, arquivos=arquivos, diretorio=diretorio)
+    assert not os.path.exists(diretorio)
@@ -0,0 +1,64 @@
+"""
+Testes do cache de planilhas do Agente Insights
+==============================================
+A segunda leitura vem do Parquet; mudar o conteúdo ou o esquema relê a
+planilha, e só mudar o mtime (mesmo conteúdo) mantém o cache.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from agenteinsights import cache_dados
+from agenteinsights.cache_dados import ler_planilha, limpar_cache, parquet_disponivel
+
+pytestmark = pytest.mark.skipif(not parquet_disponivel(), reason="engine Parquet indisponível")
+
+
+@pytest.fixture
+def leituras(monkeypatch):
+    """Substitui a leitura do Excel por uma que registra cada releitura da planilha"""
+    registro = []
+
+    def ler_excel(caminho, sheet_name, esquema, **kwargs):
+        registro.append(caminho)
+        with open(caminho, 'rb') as f:
+            conteudo = f.read()
+        return pd.DataFrame({'linha': range(len(conteudo)), 'valor': [float(b) for b in conteudo]})
+
+    monkeypatch.setattr(cache_dados, '_ler_excel', ler_excel)
+    return registro
+
+
+def test_cache_usado_e_invalidado(tmp_path, leituras):
+    origem = tmp_path / 'planilha.xlsx'
+    origem.write_bytes(b'abc')
+    cache = str(tmp_path / 'cache')
+
+    primeira = ler_planilha(str(origem), cache_dir=cache)
+    segunda = ler_planilha(str(origem), cache_dir=cache)
+    assert len(leituras) == 1
+    pd.testing.assert_frame_equal(primeira, segunda)
+
+    # Só o mtime muda: o hash do conteúdo confirma o cache
+    stat = os.stat(origem)
+    os.utime(origem, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    ler_planilha(str(origem), cache_dir=cache)
+    assert len(leituras) == 1
+
+    # Conteúdo novo (mesmo tamanho) relê a planilha
+    origem.write_bytes(b'abd')
+    os.utime(origem, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10**9))
+    assert ler_planilha(str(origem), cache_dir=cache)['valor'].tolist() == [97.0, 98.0, 100.0]
+    assert len(leituras) == 2
+
+    # Outro esquema ou outra aba também invalidam
+    ler_planilha(str(origem), cache_dir=cache, esquema={'colunas': {'valor': 'float32'}})
+    ler_planilha(str(origem), sheet_name='Outra', cache_dir=cache)
+    assert len(leituras) == 4
+    ler_planilha(str(origem), usar_cache=False)
+    assert len(leituras) == 5
+
+    # Um Parquet e um JSON por aba (o esquema novo sobrescreve o da aba 0)
+    assert limpar_cache(cache) == 4
@@ -0,0 +1,55 @@
+"""
+Testes da carga das planilhas do Agente Insights
+===============================================
+A carga paralela (pool de processos) retorna o mesmo dicionário da carga
+sequencial, e nos dois modos um arquivo ausente ou uma leitura que falha
+fazem carregar_dados retornar vazio.
+"""
+
+import pandas as pd
+import pytest
+
+from agenteinsights import analise_insights
+from agenteinsights.analise_insights import carregar_dados
+
+
+def ler_planilha_falsa(caminho, sheet_name=0, usar_cache=True, esquema=None):
+    """Lê os bytes do arquivo no lugar do Excel; definida no módulo para ir ao pool de processos"""
+    with open(caminho, 'rb') as f:
+        conteudo = f.read()
+    if conteudo == b'corrompido':
+        raise ValueError("planilha corrompida")
+    return pd.DataFrame({'byte': list(conteudo), 'aba': str(sheet_name),
+                         'colunas_esquema': len(esquema['colunas']) if esquema else 0})
+
+
+@pytest.fixture
+def fontes(tmp_path, monkeypatch):
+    caminhos = {}
+    for nome, aba in [('maturidade', 0), ('alocacao', 0), ('executivo', 'NewBusinessAgility')]:
+        caminho = tmp_path / f'{nome}.xlsx'
+        caminho.write_bytes(nome.encode())
+        caminhos[nome] = (str(caminho), aba)
+    monkeypatch.setattr(analise_insights, 'FONTES_DADOS', caminhos)
+    monkeypatch.setattr(analise_insights, 'ler_planilha', ler_planilha_falsa)
+    return caminhos
+
+
+def test_paralelo_igual_ao_sequencial(fontes):
+    sequencial = carregar_dados()
+    paralelo = carregar_dados(paralelo=True)
+    assert list(sequencial) == list(paralelo) == ['maturidade', 'alocacao', 'executivo']
+    for nome in sequencial:
+        pd.testing.assert_frame_equal(paralelo[nome], sequencial[nome])
+    assert sequencial['executivo']['aba'].iloc[0] == 'NewBusinessAgility'
+    assert sequencial['executivo']['colunas_esquema'].iloc[0] > 0
+    assert list(carregar_dados(paralelo=True, fontes=['alocacao'])) == ['alocacao']
+
+
+@pytest.mark.parametrize('paralelo', [False, True])
+def test_falha_retorna_vazio(fontes, paralelo):
+    with open(fontes['alocacao'][0], 'wb') as f:
+        f.write(b'corrompido')
+    assert carregar_dados(paralelo=paralelo) == {}
+    fontes['alocacao'] = (fontes['alocacao'][0] + '.ausente', 0)
+    assert carregar_dados(paralelo=paralelo) == {}
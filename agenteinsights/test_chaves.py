@@ -0,0 +1,40 @@
+"""
+Testes das chaves substitutas do Agente Insights
+===============================================
+Ida e volta das chaves textuais do Executivo pelo empacotamento int64 e
+leitura do quarter em qualquer formato de entrada.
+"""
+
+import numpy as np
+import pandas as pd
+
+from agenteinsights.chaves import (CHAVE_INVALIDA_EXECUTIVO, CHAVE_INVALIDA_PESSOAS,
+                                   chaves_de_colunas, chaves_de_texto, desempacotar,
+                                   quarter_numerico)
+
+
+def test_chaves_de_texto_ida_e_volta():
+    serie = pd.Series(['2024Q110', '2023T4 7', '2025Q3123456789', '2024Q110.0',
+                       '2024Q510', 'sem chave', None, '2024Q110'])
+    chaves = chaves_de_texto(serie)
+    ano, quarter, ident = desempacotar(chaves[:4])
+    assert ano.tolist() == [2024, 2023, 2025, 2024]
+    assert quarter.tolist() == [1, 4, 3, 1]
+    assert ident.tolist() == [10, 7, 123456789, 10]
+    assert (chaves[4:7] == CHAVE_INVALIDA_EXECUTIVO).all()
+    assert chaves[7] == chaves[0]
+
+
+def test_chaves_de_texto_cruzam_com_as_de_colunas():
+    pessoas = chaves_de_colunas(pd.Series(['2024', '2023.0']), pd.Series(['Q1', '4']),
+                                pd.Series([10.0, 7.0]))
+    assert pessoas.tolist() == chaves_de_texto(pd.Series(['2024Q110', '2023Q47'])).tolist()
+
+
+def test_quarter_numerico():
+    serie = pd.Series(['Q1/2024', '2024Q3', '2024-T2', 'q4', '1', '1.0', 'Q5', '2024', 'abc', None])
+    esperado = [1, 3, 2, 4, 1, 1, np.nan, np.nan, np.nan, np.nan]
+    np.testing.assert_array_equal(quarter_numerico(serie), esperado)
+    chaves = chaves_de_colunas(pd.Series(['2024'] * 2), pd.Series(['Q1/2024', '2024']), pd.Series([1, 1]))
+    assert desempacotar(chaves[:1])[1].tolist() == [1]
+    assert chaves[1] == CHAVE_INVALIDA_PESSOAS
@@ -0,0 +1,80 @@
+"""
+Testes da coleção de análises do Agente Insights
+===============================================
+Os índices de ColecaoAnalises (entidade, seção e vínculos tribo/squad)
+respondem como a busca linear na lista, continuam corretos depois de cada
+mutação e sobrevivem ao pickle e ao json.
+"""
+
+import json
+import pickle
+
+from agenteinsights.colecao import ColecaoAnalises
+from agenteinsights.normalizacao import chave_compacta
+
+ESTRUTURA = {'tribos': {'Vendas': {'squads': ['PIX-2', 'Cartões'], 'pessoas': []}},
+             'squads': {'PIX-2': {'tribos': ['Vendas'], 'pessoas': []},
+                        'Cartões': {'tribos': ['Vendas'], 'pessoas': []}}}
+
+
+def analises():
+    return [
+        {'metricas_por_tribo': {'Vendas': {}}},
+        {'tipo': 'tribo', 'nome': 'Vendas', 'insights': {'throughput': 3}},
+        {'tipo': 'squad', 'nome': 'PIX-2', 'insights': {'throughput': 1}},
+        {'tipo': 'squad', 'nome': 'Cartões', 'insights': {'throughput': 2}, 'metricas_por_squad': {}},
+        {'tipo': 'squad', 'nome': 'PIX-2', 'insights': {'throughput': 9}},
+    ]
+
+
+def busca_linear(lista, tipo, nome):
+    for analise in lista:
+        if isinstance(analise, dict) and analise.get('tipo') == tipo and analise.get('nome') == nome:
+            return analise
+    for analise in lista:
+        if (isinstance(analise, dict) and analise.get('tipo') == tipo and analise.get('nome') is not None
+                and chave_compacta(analise['nome']) == chave_compacta(nome)):
+            return analise
+    return None
+
+
+def conferir(colecao):
+    for tipo, nome in [('tribo', 'Vendas'), ('squad', 'PIX-2'), ('squad', 'pix 2'), ('squad', 'cartoes'),
+                       ('squad', 'Vendas'), ('tribo', 'Benefícios')]:
+        assert colecao.obter(tipo, nome) is busca_linear(colecao, tipo, nome)
+    for secoes in [('insights',), ('metricas_por_tribo', 'metricas_por_squad'), ('inexistente',)]:
+        assert colecao.com_secao(*secoes) == [a for a in colecao if any(s in a for s in secoes)]
+
+
+def test_indices_iguais_a_busca_linear():
+    colecao = ColecaoAnalises(analises(), ESTRUTURA)
+    conferir(colecao)
+    assert colecao.obter('squad', 'PIX-2')['insights']['throughput'] == 1
+    assert [a['nome'] for a in colecao.squads_da_tribo('Vendas')] == ['PIX-2', 'Cartões']
+    assert [a['nome'] for a in colecao.tribos_do_squad('Cartões')] == ['Vendas']
+    assert colecao.squads_da_tribo('Benefícios') == []
+
+
+def test_mutacoes_mantem_indices():
+    colecao = ColecaoAnalises(analises(), ESTRUTURA)
+    colecao.append({'tipo': 'tribo', 'nome': 'Benefícios', 'insights': {}})
+    conferir(colecao)
+    del colecao[2]
+    conferir(colecao)
+    assert colecao.obter('squad', 'PIX-2')['insights']['throughput'] == 9
+    colecao.insert(0, {'tipo': 'squad', 'nome': 'PIX-2', 'insights': {'throughput': 0}})
+    colecao.pop()
+    colecao.reverse()
+    colecao += [{'tipo': 'squad', 'nome': 'Novo'}]
+    colecao[1] = {'tipo': 'tribo', 'nome': 'Vendas', 'metricas_por_tribo': {}}
+    conferir(colecao)
+    colecao.clear()
+    assert colecao.obter('tribo', 'Vendas') is None and colecao.com_secao('insights') == []
+
+
+def test_pickle_e_json():
+    colecao = ColecaoAnalises(analises(), ESTRUTURA)
+    copia = pickle.loads(pickle.dumps(colecao))
+    assert isinstance(copia, ColecaoAnalises) and copia == colecao and copia.estrutura == ESTRUTURA
+    conferir(copia)
+    assert json.loads(json.dumps(colecao)) == analises()
@@ -0,0 +1,64 @@
+"""
+Testes dos backends de cálculo do Agente Insights
+================================================
+O BackendNumpy é comparado com as funções de referência do NumPy/pandas e o
+BackendCupy, quando houver GPU, com o BackendNumpy.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agenteinsights.computacao import BackendCupy, BackendNumpy, resumir_dataframe
+from agenteinsights.dependencias import gpu_disponivel
+
+PERCENTIS = (0, 25, 50, 75, 85, 95, 100)
+
+
+def dados_sinteticos(n=5000, n_grupos=40, semente=7):
+    rng = np.random.default_rng(semente)
+    codigos = rng.integers(-1, n_grupos, n)
+    valores = rng.lognormal(2, 1, n)
+    valores[rng.random(n) < 0.05] = np.nan
+    return codigos, valores, n_grupos
+
+
+def test_estatisticas_por_grupo_igual_a_referencia():
+    codigos, valores, n_grupos = dados_sinteticos()
+    resultado = BackendNumpy().estatisticas_por_grupo(codigos, valores, n_grupos + 2, PERCENTIS)
+    for grupo in range(n_grupos + 2):
+        v = valores[(codigos == grupo) & ~np.isnan(valores)]
+        assert resultado['contagem'][grupo] == len(v)
+        if len(v) == 0:
+            assert resultado['media'][grupo] == 0 and resultado['p50'][grupo] == 0
+            continue
+        assert resultado['media'][grupo] == pytest.approx(np.mean(v))
+        assert resultado['desvio'][grupo] == pytest.approx(np.std(v))
+        for q in PERCENTIS:
+            assert resultado[f'p{q}'][grupo] == pytest.approx(np.percentile(v, q))
+
+
+def test_normalizacao_e_percentis():
+    matriz = np.column_stack([np.arange(10.0), np.full(10, 3.0)])
+    normalizada = BackendNumpy().normalizar(matriz)
+    assert normalizada[:, 0].mean() == pytest.approx(0)
+    assert normalizada[:, 0].std() == pytest.approx(1)
+    assert (normalizada[:, 1] == 0).all()
+    assert BackendNumpy().percentis([np.nan, 1, 2, 3], (50,)) == pytest.approx([2])
+
+
+def test_resumir_dataframe():
+    df = pd.DataFrame({'a': [1.0, 2.0, np.nan, 4.0], 'b': pd.array([1, 2, 3, None], dtype='Int64'), 'c': list('wxyz')})
+    resumo = resumir_dataframe(df, BackendNumpy())
+    assert list(resumo.index) == ['a', 'b']
+    assert resumo.loc['a', 'media'] == pytest.approx(7 / 3)
+    assert resumo.loc['b', 'p50'] == pytest.approx(2)
+
+
+@pytest.mark.skipif(not gpu_disponivel(), reason="GPU/cupy indisponível")
+def test_cupy_igual_a_numpy():
+    codigos, valores, n_grupos = dados_sinteticos()
+    cpu = BackendNumpy().estatisticas_por_grupo(codigos, valores, n_grupos, PERCENTIS)
+    gpu = BackendCupy().estatisticas_por_grupo(codigos, valores, n_grupos, PERCENTIS)
+    for chave, esperado in cpu.items():
+        np.testing.assert_allclose(gpu[chave], esperado, rtol=1e-12)
@@ -0,0 +1,130 @@
+"""
+Testes do cubo de métricas do Agente Insights
+============================================
+Ano e Quarter em qualquer formato de entrada (inteiro, float com nulos,
+texto 'Qn') caem nas mesmas células e respondem aos mesmos filtros. O cubo
+pré-agregado é comparado com o do cruzamento completo, e os insights do
+rollup com os do acumulador em blocos.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agenteinsights.agregacao import COLUNA_PBI, agregar_em_blocos
+from agenteinsights.analise_insights import cruzar_pessoas_executivo
+from agenteinsights.chaves import empacotar
+from agenteinsights.cubo import (construir_cubo, construir_cubo_pre_agregado, insights_do_cubo,
+                                 quarter_citado)
+
+LEAD = '[SumLead_Time]'
+
+
+def cruzamento(anos, quarters):
+    return pd.DataFrame({
+        'Tribo': ['A', 'A', 'B'],
+        'squad': ['s1', 's2', 's3'],
+        'Ano': anos,
+        'Quarter': quarters,
+        LEAD: [1.0, 3.0, 5.0],
+        COLUNA_PBI: ['p1', 'p2', 'p3'],
+    })
+
+
+@pytest.mark.parametrize('anos, quarters', [
+    ([2024, 2024, 2025], [1, 1, 2]),
+    ([2024.0, 2024.0, 2025.0], [1.0, 1.0, 2.0]),
+    (['2024', '2024', '2025'], ['Q1', 'T1', 'Q2']),
+    (['2024.0', '2024.0', '2025.0'], ['1.0', '1.0', '2.0']),
+])
+def test_ano_e_quarter_normalizados(anos, quarters):
+    cubo = construir_cubo(cruzamento(anos, quarters))
+    assert sorted(cubo.celulas) == [('A', 's1', 2024, 1), ('A', 's2', 2024, 1), ('B', 's3', 2025, 2)]
+    for ano, quarter in [(2024, 1), (2024.0, 'Q1'), ('2024', '1')]:
+        total = cubo.consultar(ano=ano, quarter=quarter)
+        assert total['linhas'] == 2 and total['throughput'] == 2
+        assert total['lead_time']['medio'] == pytest.approx(2.0)
+    assert cubo.consultar(tribo='B', ano=2025)['linhas'] == 1
+    assert cubo.consultar(ano='ano inválido')['linhas'] == 0
+    assert set(cubo.rollup(['Ano', 'Quarter'])) == {(2024, 1), (2025, 2)}
+
+
+def test_ano_float_com_nulos():
+    cubo = construir_cubo(cruzamento([2024.0, np.nan, 2024.0], ['Q1', 'Q1', 'Q5']))
+    assert cubo.consultar(ano=2024)['linhas'] == 2
+    assert cubo.consultar(ano=2024, quarter=1)['linhas'] == 1
+    assert cubo.valores('Ano') == [2024]
+    assert cubo.consultar()['linhas'] == 3
+
+
+def pessoas_e_executivo(n=300, m=1500, semente=3):
+    rng = np.random.default_rng(semente)
+    ano = rng.choice([2023, 2024], n).astype(float)
+    quarter = rng.integers(1, 5, n).astype(float)
+    tribo = rng.integers(0, 4, n).astype(float)
+    squad = rng.integers(0, 20, n).astype(float)
+    pessoas = pd.DataFrame({
+        'Tribo': [f'T{int(t)}' for t in tribo],
+        'squad': [f'S{int(s)}' for s in squad],
+        'Ano': ano.astype(str),
+        'Quarter': quarter.astype(str),
+        'person': rng.integers(0, 200, n).astype(str),
+        'Chave_IntTribo': empacotar(ano, quarter, tribo, -1),
+        'Chave_IntSquad': empacotar(ano, quarter, squad, -1),
+    })
+    ano_e = rng.choice([2023, 2024], m).astype(float)
+    quarter_e = rng.integers(1, 5, m).astype(float)
+    executivo = pd.DataFrame({
+        'Chave_IntTribo': empacotar(ano_e, quarter_e, rng.integers(0, 5, m).astype(float), -2),
+        'Chave_IntSquad': empacotar(ano_e, quarter_e, rng.integers(0, 22, m).astype(float), -2),
+        'Chave_DataSquad': 'x',
+        COLUNA_PBI: rng.integers(0, 5000, m),
+        LEAD: np.where(rng.random(m) < 0.1, np.nan, rng.integers(0, 60, m)),
+        '[SumCycle_Time]': rng.integers(0, 30, m).astype(float),
+        '[SumStory_Points]': rng.integers(0, 13, m).astype(float),
+    })
+    return pessoas, executivo
+
+
+def test_cubo_pre_agregado_igual_ao_do_cruzamento():
+    pessoas, executivo = pessoas_e_executivo()
+    completo = construir_cubo(cruzar_pessoas_executivo(pessoas, executivo.assign(Chave_DataTribo='y')))
+    pre_agregado = construir_cubo_pre_agregado(pessoas, executivo)
+    assert set(completo.celulas) == set(pre_agregado.celulas)
+    for chave, celula in completo.celulas.items():
+        esperado, obtido = celula.resumo(), pre_agregado.celulas[chave].resumo()
+        assert obtido['linhas'] == esperado['linhas'] and obtido['throughput'] == esperado['throughput']
+        for metrica in ('lead_time', 'cycle_time', 'story_points'):
+            assert obtido[metrica] == pytest.approx(esperado[metrica])
+
+
+def test_insights_do_cubo_iguais_aos_do_acumulador():
+    pessoas, executivo = pessoas_e_executivo()
+    cruzado = cruzar_pessoas_executivo(pessoas, executivo.assign(Chave_DataTribo='y'))
+    blocos = [cruzado.iloc[i::3] for i in range(3)]
+    estrutura, tribos, squads = agregar_em_blocos(blocos, erro_quantis=0.01)
+    tribos_cubo, squads_cubo = insights_do_cubo(construir_cubo(blocos, 0.01), estrutura)
+    assert list(tribos_cubo) == list(tribos) and list(squads_cubo) == list(squads)
+    for esperado, obtido in ((tribos, tribos_cubo), (squads, squads_cubo)):
+        for entidade, insight in esperado.items():
+            assert obtido[entidade] == pytest.approx(insight)
+
+
+def test_quarter_citado():
+    assert quarter_citado('como foi a tribo Vendas no Q2 2024?') == (2024, 2)
+    assert quarter_citado('2023-T4') == (2023, 4)
+    assert quarter_citado('no 1º trimestre de 2025') == (2025, 1)
+    assert quarter_citado('squad q1') is None
+
+
+def test_estatisticas_da_organizacao():
+    pessoas, executivo = pessoas_e_executivo()
+    cruzado = cruzar_pessoas_executivo(pessoas, executivo.assign(Chave_DataTribo='y'))
+    blocos = [cruzado.iloc[i::3] for i in range(3)]
+    estrutura, _, _ = agregar_em_blocos(blocos, erro_quantis=0.01)
+    organizacao = construir_cubo(blocos, 0.01).organizacao()
+    for metrica, stats in estrutura['organizacao'].items():
+        assert {k: organizacao[metrica][k] for k in stats} == pytest.approx(stats)
+    valores = cruzado.loc[cruzado['Tribo'].notna(), LEAD].dropna()
+    assert organizacao['lead_time']['medio'] == pytest.approx(valores.mean())
+    assert organizacao['lead_time']['contagem'] == len(valores)
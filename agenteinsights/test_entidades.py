@@ -0,0 +1,92 @@
+"""
+Testes do índice de entidades do Agente Insights
+===============================================
+Extração de várias menções (EntidadeIndex.extrair), a quebra em palavras
+compartilhada por nomes e consultas, o squad qualificado pela própria tribo
+e a resposta de uma comparação em uma única chamada à IA.
+"""
+
+from types import SimpleNamespace
+
+from agenteinsights.analise_insights import (gerar_resposta_contextualizada, identificar_entidades_consulta,
+                                             preparar_dados_comparacao)
+from agenteinsights.colecao import ColecaoAnalises
+from agenteinsights.entidades import EntidadeIndex, palavras
+
+ANALISES = [
+    {'tipo': 'tribo', 'nome': 'Vendas'},
+    {'tipo': 'tribo', 'nome': 'Benefícios'},
+    {'tipo': 'squad', 'nome': 'PIX-2'},
+    {'tipo': 'squad', 'nome': 'Cartões Crédito'},
+    {'tipo': 'squad', 'nome': 'Vendas'},
+]
+
+
+def mencoes(consulta):
+    return [(m['tipo'], m['nome'], consulta[m['inicio']:m['fim']])
+            for m in EntidadeIndex(ANALISES).extrair(consulta)]
+
+
+def test_palavras_quebram_em_pontuacao():
+    assert palavras('PIX-2') == [('pix', 0, 3), ('2', 4, 5)]
+    assert [p for p, _, _ in palavras('squad pix 2?')] == ['squad', 'pix', '2']
+
+
+def test_nome_com_hifen_extraido_da_consulta():
+    assert mencoes('como está o squad pix 2?') == [('squad', 'PIX-2', 'pix 2')]
+    assert mencoes('e o PIX-2') == [('squad', 'PIX-2', 'PIX-2')]
+
+
+def test_varias_mencoes_e_tipo_indicado():
+    assert mencoes('compare tribo Vendas com tribo Benefícios') == [
+        ('tribo', 'Vendas', 'Vendas'), ('tribo', 'Benefícios', 'Benefícios')]
+    assert mencoes('squad vendas e cartões crédito?') == [
+        ('squad', 'Vendas', 'vendas'), ('squad', 'Cartões Crédito', 'cartões crédito')]
+    assert mencoes('nada aqui') == []
+
+
+def colecao():
+    estrutura = {'tribos': {'Vendas': {'squads': ['PIX-2'], 'pessoas': []},
+                            'Benefícios': {'squads': ['Cartões Crédito'], 'pessoas': []}},
+                 'squads': {'PIX-2': {'tribos': ['Vendas'], 'pessoas': []},
+                            'Cartões Crédito': {'tribos': ['Benefícios'], 'pessoas': []}}}
+    analises = [dict(a, insights={'lead_time_medio': 10.0 * i, 'throughput': i})
+                for i, a in enumerate(ANALISES, 1) if a['nome'] != 'Vendas' or a['tipo'] == 'tribo']
+    return ColecaoAnalises(analises, estrutura)
+
+
+def test_squad_qualificado_pela_propria_tribo():
+    analises = colecao()
+
+    def nomes(consulta):
+        return [(m['tipo'], m['nome']) for m in identificar_entidades_consulta(consulta, analises)]
+
+    assert nomes('como está o squad PIX-2 da tribo Vendas?') == [('squad', 'PIX-2')]
+    assert nomes('squad pix 2 na Vendas') == [('squad', 'PIX-2')]
+    # Outra tribo ou sem preposição: continua sendo uma comparação
+    assert nomes('squad PIX-2 da tribo Benefícios') == [('squad', 'PIX-2'), ('tribo', 'Benefícios')]
+    assert nomes('squad PIX-2 e tribo Vendas') == [('squad', 'PIX-2'), ('tribo', 'Vendas')]
+
+
+class ClienteFalso:
+    def __init__(self):
+        self.chamadas = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.criar))
+
+    def criar(self, **kwargs):
+        self.chamadas.append(kwargs)
+        conteudo = f"resposta {len(self.chamadas)}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=conteudo))])
+
+
+def test_comparacao_respondida_em_uma_chamada():
+    analises = colecao()
+    mencoes = identificar_entidades_consulta('compare tribo Vendas com tribo Benefícios', analises)
+    dados = preparar_dados_comparacao(mencoes, analises)
+    cliente = ClienteFalso()
+    entidade = {'tipo': 'comparacao', 'nome': 'Vendas x Benefícios', 'entidades': mencoes}
+    assert gerar_resposta_contextualizada('qual entrega mais?', entidade, dados, cliente) == 'resposta 1'
+    assert gerar_resposta_contextualizada('e o lead time?', entidade, dados, cliente) == 'resposta 2'
+    assert len(cliente.chamadas) == 2
+    prompt = cliente.chamadas[1]['messages'][-1]['content']
+    assert 'e o lead time?' in prompt and 'tribo Vendas' in prompt and 'tribo Benefícios' in prompt
@@ -0,0 +1,59 @@
+"""
+Testes dos esquemas das fontes do Agente Insights
+================================================
+Projeção das colunas declaradas na leitura, tipos compactos, conversões que
+falham mantendo a coluna original e a conversão de chaves category para
+texto.
+"""
+
+import numpy as np
+import pandas as pd
+
+from agenteinsights import cache_dados
+from agenteinsights.esquemas import (aplicar_esquema, assinatura_esquema, filtro_colunas, obter_esquema,
+                                     serie_como_texto)
+
+ESQUEMA = {'colunas': {'Chave': 'category', 'ID': 'Int64', 'Tempo': 'float32'}}
+
+
+def planilha():
+    return pd.DataFrame({
+        ' Chave ': ['a', 'b', 'a', None],
+        'ID': [1, 2, None, 4],
+        'Tempo': [1.5, 2.0, None, 3.25],
+        'Sobra': ['x', 'y', 'z', 'w'],
+    })
+
+
+def test_leitura_projeta_e_tipa(monkeypatch):
+    def read_excel(caminho, sheet_name=0, usecols=None, **kwargs):
+        df = planilha()
+        return df[[c for c in df.columns if usecols(c)]] if usecols else df
+
+    monkeypatch.setattr(cache_dados.pd, 'read_excel', read_excel)
+    df = cache_dados._ler_excel('fonte.xlsx', 0, ESQUEMA)
+    assert list(df.columns) == ['Chave', 'ID', 'Tempo']
+    assert isinstance(df['Chave'].dtype, pd.CategoricalDtype)
+    assert str(df['ID'].dtype) == 'Int64' and df['ID'].isna().tolist() == [False, False, True, False]
+    assert df['Tempo'].dtype == np.float32
+    assert list(cache_dados._ler_excel('fonte.xlsx', 0, None).columns) == list(planilha().columns)
+
+
+def test_conversao_invalida_mantem_coluna():
+    df = aplicar_esquema(pd.DataFrame({'ID': ['1', 'dois'], 'Tempo': ['1,5', '2']}), ESQUEMA)
+    assert df['ID'].tolist() == ['1', 'dois'] and df['Tempo'].tolist() == ['1,5', '2']
+
+
+def test_filtro_e_assinatura():
+    filtro = filtro_colunas(ESQUEMA)
+    assert filtro(' ID ') and not filtro('Sobra')
+    assert filtro_colunas(None) is None and assinatura_esquema(None) == ''
+    assert assinatura_esquema(ESQUEMA) == assinatura_esquema({'colunas': dict(reversed(ESQUEMA['colunas'].items()))})
+    assert obter_esquema('executivo') is not None and obter_esquema('maturidade') is None
+
+
+def test_serie_como_texto_igual_a_astype():
+    serie = pd.Series([' a', 'b ', None, 'a', 3], dtype=object)
+    esperado = serie.astype(str).str.strip()
+    assert serie_como_texto(serie.astype('category')).tolist() == esperado.tolist()
+    assert serie_como_texto(serie).tolist() == esperado.tolist()
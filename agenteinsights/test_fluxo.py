@@ -0,0 +1,141 @@
+"""
+Testes das métricas de fluxo do Agente Insights
+==============================================
+Os kernels de TabelaItens (lead time, cycle time, WIP, retrabalho e bugs)
+são comparados com os laços item a item que substituíram, para itens em
+dicionários e em DataFrame. A contagem de entregas por período é conferida
+contra o agrupamento antigo por strptime, o calendário ISO do pandas e o
+preenchimento dos períodos vazios.
+"""
+
+from collections import defaultdict
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agenteinsights.analise_insights import agrupar_entregas_por_periodo
+from agenteinsights.fluxo import (TabelaItens, codigos_periodo, contagens_qualidade, contar_por_periodo,
+                                  cycle_times, datas_conclusao, lead_times, wip_por_status)
+
+
+def itens(n=500, semente=2):
+    rng = np.random.default_rng(semente)
+    base = datetime(2024, 1, 1)
+    lista = []
+    for i in range(n):
+        item = {}
+        if rng.random() < 0.8:
+            item['created_date'] = base + timedelta(hours=int(rng.integers(0, 5000)))
+            item['done_date'] = item['created_date'] + timedelta(hours=int(rng.integers(0, 2000)))
+        if rng.random() < 0.9:
+            item['status'] = rng.choice(['Backlog', 'Em andamento', 'Revisão', 'Concluído', 'Cancelado'])
+        if rng.random() < 0.7:
+            item['status_changes'] = {s: float(rng.integers(0, 20)) for s in
+                                      rng.choice(['Backlog', 'Em andamento', 'Revisão'], rng.integers(0, 4), replace=False)}
+        if rng.random() < 0.2:
+            item['retrabalho'] = True
+        item['tipo'] = rng.choice(['bug', 'historia', 'tarefa'])
+        lista.append(item)
+    return lista
+
+
+def metricas_por_loop(items):
+    """Laços item a item de extrair_metricas_ageis e analisar_qualidade_entrega antes da TabelaItens"""
+    leads = [(item['done_date'] - item['created_date']).days
+             for item in items if 'created_date' in item and 'done_date' in item]
+    cycles, por_status = [], defaultdict(list)
+    for item in items:
+        if 'status_changes' in item:
+            cycle = 0
+            for status, tempo in item['status_changes'].items():
+                cycle += tempo
+                por_status[status].append(tempo)
+            cycles.append(cycle)
+    wip, wip_status = 0, defaultdict(int)
+    for item in items:
+        if item.get('status') != 'Concluído' and item.get('status') != 'Cancelado':
+            wip += 1
+            wip_status[item.get('status', 'Desconhecido')] += 1
+    retrabalho = sum(1 for item in items if item.get('retrabalho', False))
+    bugs = sum(1 for item in items if item.get('tipo') == 'bug')
+    medias = {status: np.mean(tempos) for status, tempos in por_status.items()}
+    return leads, cycles, medias, wip, dict(wip_status), retrabalho, bugs
+
+
+def comparar(tabela, items):
+    leads, cycles, medias, wip, wip_status, retrabalho, bugs = metricas_por_loop(items)
+    assert lead_times(tabela).tolist() == leads
+    obtidos, medias_obtidas = cycle_times(tabela)
+    assert obtidos.tolist() == pytest.approx(cycles)
+    assert list(medias_obtidas) == list(medias) and medias_obtidas == pytest.approx(medias)
+    total, por_status = wip_por_status(tabela)
+    assert total == wip and list(por_status.items()) == list(wip_status.items())
+    assert contagens_qualidade(tabela) == (retrabalho, bugs)
+
+
+def test_kernels_iguais_aos_lacos():
+    items = itens()
+    comparar(TabelaItens(items), items)
+
+
+def test_itens_em_dataframe():
+    items = itens()
+    comparar(TabelaItens(pd.DataFrame(items)), items)
+
+
+def test_sem_itens():
+    tabela = TabelaItens([])
+    assert lead_times(tabela).tolist() == [] and cycle_times(tabela)[0].tolist() == []
+    assert wip_por_status(tabela) == (0, {}) and contagens_qualidade(tabela) == (0, 0)
+
+
+def entregas(n=400, semente=4):
+    rng = np.random.default_rng(semente)
+    datas = pd.Timestamp('2023-11-20') + pd.to_timedelta(rng.integers(0, 500, n), unit='D')
+    return [{'data_conclusao': d.strftime('%Y-%m-%d')} if i % 7 else {} for i, d in enumerate(datas)]
+
+
+def test_meses_iguais_ao_agrupamento_antigo():
+    items = entregas()
+    periodos = defaultdict(int)
+    for item in items:
+        if 'data_conclusao' in item:
+            data = datetime.strptime(item['data_conclusao'], '%Y-%m-%d')
+            periodos[f"{data.year}-{data.month:02d}"] += 1
+    assert agrupar_entregas_por_periodo(items, preencher_vazios=False) == dict(sorted(periodos.items()))
+    assert agrupar_entregas_por_periodo(TabelaItens(items)) == agrupar_entregas_por_periodo(items)
+
+
+def test_periodos_vazios_preenchidos_com_zero():
+    datas = datas_conclusao([{'data_conclusao': d} for d in ['2024-01-15', '2024-04-02', '2024-04-30']])
+    assert contar_por_periodo(datas) == {'2024-01': 1, '2024-02': 0, '2024-03': 0, '2024-04': 2}
+    assert contar_por_periodo(datas, preencher_vazios=False) == {'2024-01': 1, '2024-04': 2}
+    assert contar_por_periodo(datas, 'quarter') == {'2024-Q1': 1, '2024-Q2': 2}
+    semanas = {f'2024-W{s:02d}': int(s in (3, 14, 18)) for s in range(3, 19)}
+    assert contar_por_periodo(datas, 'semana') == semanas
+    assert list(contar_por_periodo(datas, 'semana')) == list(semanas)
+
+
+def test_semanas_iso():
+    # Viradas de ano em que a semana ISO pertence ao ano vizinho
+    datas = pd.to_datetime(['2020-12-31', '2021-01-03', '2021-01-04', '2024-12-30', '2026-01-01', '2027-01-03'])
+    esperado = [f"{a}-W{s:02d}" for a, s, _ in (d.isocalendar() for d in datas)]
+    assert esperado[:3] == ['2020-W53', '2020-W53', '2021-W01'] and esperado[3] == '2025-W01'
+    for data, rotulo in zip(datas, esperado):
+        assert list(contar_por_periodo(np.array([data.to_datetime64()]), 'semana')) == [rotulo]
+    aleatorias = datas_conclusao(entregas())
+    semanas = contar_por_periodo(aleatorias, 'semana', preencher_vazios=False)
+    calendario = pd.Series(aleatorias[~np.isnat(aleatorias)]).dt.isocalendar()
+    rotulos = (calendario['year'].astype(str) + '-W' + calendario['week'].astype(str).str.zfill(2)).value_counts()
+    assert semanas == rotulos.sort_index().to_dict()
+
+
+def test_datas_invalidas_e_periodo_desconhecido():
+    items = [{'data_conclusao': '2024-02-30'}, {'data_conclusao': 'ontem'}, {'data_conclusao': None},
+             {'data_conclusao': '2024-03-01'}]
+    assert agrupar_entregas_por_periodo(items) == {'2024-03': 1}
+    assert contar_por_periodo(datas_conclusao([])) == {}
+    with pytest.raises(ValueError):
+        codigos_periodo(datas_conclusao(items), 'ano')
@@ -0,0 +1,53 @@
+"""
+Teste de orçamento de importação do Agente Insights
+==================================================
+Executa `import agenteinsights` + identificar_entidade_consulta em um
+interpretador limpo e verifica o tempo e que nenhuma dependência pesada foi
+carregada. O orçamento pode ser ajustado por AGENTE_INSIGHTS_ORCAMENTO_IMPORT.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+ORCAMENTO_SEGUNDOS = float(os.environ.get('AGENTE_INSIGHTS_ORCAMENTO_IMPORT', '2.0'))
+DEPENDENCIAS_PESADAS = ('torch', 'cupy', 'sklearn', 'matplotlib', 'seaborn', 'docx', 'openai')
+
+SCRIPT = """
+import json, sys, time
+inicio = time.perf_counter()
+import agenteinsights
+identificar = agenteinsights.identificar_entidade_consulta
+entidade = identificar('como está a tribo alfa?', [{'tipo': 'tribo', 'nome': 'Alfa', 'insights': {}}])
+print(json.dumps({
+    'segundos': time.perf_counter() - inicio,
+    'entidade': entidade,
+    'carregados': [m for m in %r if m in sys.modules]
+}))
+""" % (DEPENDENCIAS_PESADAS,)
+
+
+def medir_importacao():
+    raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    saida = subprocess.run([sys.executable, '-c', SCRIPT], cwd=raiz, capture_output=True,
+                           text=True, check=True)
+    return json.loads(saida.stdout.strip().splitlines()[-1])
+
+
+def test_importacao_sem_dependencias_pesadas():
+    resultado = medir_importacao()
+    assert resultado['carregados'] == []
+    assert resultado['entidade'] == {'tipo': 'tribo', 'nome': 'Alfa'}
+
+
+def test_orcamento_de_importacao():
+    resultado = medir_importacao()
+    assert resultado['segundos'] < ORCAMENTO_SEGUNDOS, (
+        f"import + identificar_entidade_consulta levou {resultado['segundos']:.2f}s "
+        f"(orçamento: {ORCAMENTO_SEGUNDOS:.2f}s)")
+
+
+if __name__ == "__main__":
+    resultado = medir_importacao()
+    print(f"Importação: {resultado['segundos']:.3f}s; dependências pesadas carregadas: {resultado['carregados']}")
@@ -0,0 +1,76 @@
+"""
+Testes do modo incremental do Agente Insights
+============================================
+Depois de uma alteração no Executivo, a execução incremental reaproveita as
+tribos não afetadas e produz o mesmo resultado de um recálculo completo.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agenteinsights.agregacao import agregar_dataframe
+from agenteinsights.analise_insights import cruzar_dados_completo
+from agenteinsights.incremental import gerar_estrutura_e_insights_incremental
+
+CHAVE_TRIBO = 'PBI_Concuidos_Executivo[Chave_DataTribo]'
+CHAVE_SQUAD = 'PBI_Concuidos_Executivo[Chave_DataSquad]'
+LEAD = '[SumLead_Time]'
+
+
+def fontes(semente=21, pessoas=40, pbis=300):
+    rng = np.random.default_rng(semente)
+    maturidade = pd.DataFrame([(f'Tribo {t}', 2024, q) for t in range(3) for q in range(1, 5)],
+                              columns=['Tribo', 'Ano', 'Quarter'])
+    tribo = rng.integers(0, 3, pessoas)
+    squad = tribo * 3 + rng.integers(0, 3, pessoas)
+    alocacao = pd.DataFrame({
+        'person': [f'p{i}' for i in range(pessoas)],
+        'tribe': [f'Tribo {t}' for t in tribo],
+        'squad': [f'Squad {s}' for s in squad],
+        'tribeID': tribo + 1,
+        'squadID': squad + 10,
+        'endDate': None,
+    })
+    quarter = rng.integers(1, 5, pbis)
+    tribo_pbi = rng.integers(0, 3, pbis)
+    executivo = pd.DataFrame({
+        CHAVE_TRIBO: [f'2024Q{q}{t + 1}' for q, t in zip(quarter, tribo_pbi)],
+        CHAVE_SQUAD: [f'2024Q{q}{s}' for q, s in zip(quarter, tribo_pbi * 3 + 10 + rng.integers(0, 3, pbis))],
+        'PBI_Concuidos_Executivo[Key]': np.arange(pbis),
+        LEAD: rng.integers(0, 60, pbis).astype(float),
+        '[SumCycle_Time]': rng.integers(0, 30, pbis).astype(float),
+        '[SumStory_Points]': rng.integers(0, 13, pbis).astype(float),
+    })
+    return {'maturidade': maturidade, 'alocacao': alocacao, 'executivo': executivo}
+
+
+def copia(dados):
+    return {fonte: df.copy() for fonte, df in dados.items()}
+
+
+def incremental(dados, diretorio):
+    colunas = {fonte: list(df.columns) for fonte, df in dados.items()}
+    return gerar_estrutura_e_insights_incremental(copia(dados), colunas, diretorio)
+
+
+def test_incremental_igual_ao_recalculo_completo(tmp_path):
+    diretorio = str(tmp_path)
+    dados = fontes()
+    _, tribos_antes, _ = incremental(dados, diretorio)
+
+    # PBIs da Tribo 0 (tribeID 1) ficam mais lentos; as demais tribos não mudam
+    alterados = dados['executivo'][CHAVE_TRIBO].str.endswith('1')
+    dados['executivo'].loc[alterados, LEAD] += 100
+    estrutura, tribos, squads = incremental(dados, diretorio)
+
+    completo = agregar_dataframe(cruzar_dados_completo(*copia(dados).values()))
+    for esperado, obtido in ((completo[1], tribos), (completo[2], squads)):
+        assert set(obtido) == set(esperado)
+        for entidade, insight in esperado.items():
+            assert obtido[entidade] == pytest.approx(insight)
+    for nivel in ('tribos', 'squads'):
+        assert {e: sorted(v['pessoas']) for e, v in estrutura[nivel].items()} == \
+               {e: sorted(v['pessoas']) for e, v in completo[0][nivel].items()}
+    assert tribos['Tribo 0']['lead_time_medio'] > tribos_antes['Tribo 0']['lead_time_medio']
+    assert tribos['Tribo 2'] == tribos_antes['Tribo 2']
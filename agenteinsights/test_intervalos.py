@@ -0,0 +1,73 @@
+"""
+Testes do índice de alocações por intervalo do Agente Insights
+==============================================================
+As consultas no tempo (em, contar_em, no_periodo, no_quarter) são
+comparadas com máscaras de força bruta sobre startDate/endDate, incluindo
+datas ausentes e alocações invertidas.
+"""
+
+import numpy as np
+import pandas as pd
+
+from agenteinsights.intervalos import IndiceAlocacoes, alocacoes_por_quarter, limites_quarter
+
+
+def alocacoes(n=300, semente=11):
+    rng = np.random.default_rng(semente)
+    inicio = pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, 700, n), unit='D')
+    fim = inicio + pd.to_timedelta(rng.integers(-30, 300, n), unit='D')
+    return pd.DataFrame({
+        'person': [f'p{i}' for i in rng.integers(0, 60, n)],
+        'squad': [f's{i}' for i in rng.integers(0, 8, n)],
+        'tribe': [f't{i}' for i in rng.integers(0, 3, n)],
+        'startDate': pd.Series(inicio).where(rng.random(n) > 0.1),
+        'endDate': pd.Series(fim).where(rng.random(n) > 0.2),
+    })
+
+
+def sobrepostas(df, inicio, fim):
+    """Força bruta: início < fim do período, fim > início do período, intervalo não invertido"""
+    comeca = df['startDate'].isna() | (df['startDate'] < fim)
+    termina = df['endDate'].isna() | (df['endDate'] > inicio)
+    invertida = df['startDate'] > df['endDate']
+    return comeca & termina & ~invertida
+
+
+def test_em_e_contar_em_iguais_a_forca_bruta():
+    df = alocacoes()
+    indice = IndiceAlocacoes(df)
+    for data in pd.date_range('2023-12-01', '2026-03-01', freq='37D'):
+        data = pd.Timestamp(data)
+        vigente = ((df['startDate'].isna() | (df['startDate'] <= data))
+                   & (df['endDate'].isna() | (df['endDate'] > data))
+                   & ~(df['startDate'] > df['endDate']))
+        assert list(indice.em(data)) == list(np.flatnonzero(vigente))
+        assert indice.contar_em(data) == int(vigente.sum())
+        for squad in ['s0', 's5', 'inexistente']:
+            assert list(indice.em(data, 'squad', squad)) == list(np.flatnonzero(vigente & (df['squad'] == squad)))
+
+
+def test_no_quarter_igual_a_forca_bruta():
+    df = alocacoes()
+    indice = IndiceAlocacoes(df)
+    for ano in (2024, 2025):
+        for quarter in range(1, 5):
+            inicio, fim = limites_quarter(ano, quarter)
+            mascara = sobrepostas(df, inicio, fim)
+            assert list(indice.no_quarter(ano, quarter)) == list(np.flatnonzero(mascara))
+            for pessoa in ['p1', 'p7']:
+                esperado = np.flatnonzero(mascara & (df['person'] == pessoa))
+                assert list(indice.no_quarter(ano, quarter, 'person', pessoa)) == list(esperado)
+
+
+def test_alocacoes_por_quarter():
+    df = alocacoes().assign(tribe_norm=lambda d: d['tribe'])
+    maturidade = pd.DataFrame({'tribo_norm': ['t0', 't1', 't2', 't0'], 'Ano': [2024, '2025', 2024.0, 2024],
+                               'Quarter': ['Q2', 3, 'T4', 'inválido'], 'nota': [1, 2, 3, 4]})
+    cruzado = alocacoes_por_quarter(maturidade, df)
+    for nota, (tribo, ano, quarter) in zip([1, 2, 3], [('t0', 2024, 2), ('t1', 2025, 3), ('t2', 2024, 4)]):
+        inicio, fim = limites_quarter(ano, quarter)
+        esperado = df[sobrepostas(df, inicio, fim) & (df['tribe_norm'] == tribo)]
+        obtido = cruzado[cruzado['nota'] == nota]
+        assert obtido['person'].tolist() == esperado['person'].tolist()
+    assert 4 not in set(cruzado['nota'])
@@ -0,0 +1,96 @@
+"""
+Testes dos cruzamentos do Agente Insights
+========================================
+O cruzamento em blocos (com os pesos do merge por squad) e a junção
+pré-agregada produzem os mesmos insights do cruzamento completo.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from agenteinsights.analise_insights import (cruzar_dados_completo, cruzar_dados_em_blocos,
+                                             gerar_estrutura_e_insights, normalizar_chaves_executivo,
+                                             preparar_pessoas_ativas)
+from agenteinsights.agregacao import agregar_dataframe
+from agenteinsights.cubo import CuboMetricas
+from agenteinsights.juncao import gerar_estrutura_e_insights_pre_agregado
+
+CHAVE_TRIBO = 'PBI_Concuidos_Executivo[Chave_DataTribo]'
+CHAVE_SQUAD = 'PBI_Concuidos_Executivo[Chave_DataSquad]'
+
+
+def fontes(semente=5, pessoas=60, pbis=400):
+    rng = np.random.default_rng(semente)
+    maturidade = pd.DataFrame([(f'Tribo {t}', ano, q) for t in range(3) for ano in (2023, 2024)
+                               for q in range(1, 5)], columns=['Tribo', 'Ano', 'Quarter'])
+    tribo = rng.integers(0, 3, pessoas)
+    squad = tribo * 4 + rng.integers(0, 4, pessoas)
+    alocacao = pd.DataFrame({
+        'person': [f'p{i}' for i in range(pessoas)],
+        'tribe': [f'Tribo {t}' for t in tribo],
+        'squad': [f'Squad {s}' for s in squad],
+        'tribeID': tribo + 1,
+        'squadID': squad + 10,
+        'startDate': pd.Timestamp('2023-01-01'),
+        'endDate': np.where(rng.random(pessoas) < 0.1, '2020-01-01', None),
+    })
+    ano = rng.choice([2023, 2024], pbis)
+    quarter = rng.integers(1, 5, pbis)
+    tribo_pbi = rng.integers(1, 5, pbis)
+    executivo = pd.DataFrame({
+        CHAVE_TRIBO: [f'{a}Q{q}{t}' for a, q, t in zip(ano, quarter, tribo_pbi)],
+        CHAVE_SQUAD: [f'{a}Q{q}{s}' for a, q, s in zip(ano, quarter, (tribo_pbi - 1) * 4 + 10 + rng.integers(0, 5, pbis))],
+        'PBI_Concuidos_Executivo[Key]': np.arange(pbis),
+        '[SumLead_Time]': np.where(rng.random(pbis) < 0.1, np.nan, rng.integers(0, 60, pbis)),
+        '[SumCycle_Time]': rng.integers(0, 30, pbis).astype(float),
+        '[SumStory_Points]': rng.integers(0, 13, pbis).astype(float),
+    })
+    return maturidade, alocacao, executivo
+
+
+def assert_iguais(esperado, obtido):
+    estrutura, tribos, squads = esperado
+    estrutura_obtida, tribos_obtidas, squads_obtidos = obtido
+    for nivel in ('tribos', 'squads'):
+        assert {e: sorted(map(sorted, v.values())) for e, v in estrutura[nivel].items()} == \
+               {e: sorted(map(sorted, v.values())) for e, v in estrutura_obtida[nivel].items()}
+    assert sorted(estrutura['pessoas']) == sorted(estrutura_obtida['pessoas'])
+    for insights, insights_obtidos in ((tribos, tribos_obtidas), (squads, squads_obtidos)):
+        assert set(insights) == set(insights_obtidos)
+        for entidade, insight in insights.items():
+            assert insights_obtidos[entidade] == pytest.approx(insight)
+
+
+def completo():
+    maturidade, alocacao, executivo = fontes()
+    return agregar_dataframe(cruzar_dados_completo(maturidade, alocacao, executivo))
+
+
+def test_blocos_iguais_ao_cruzamento_completo():
+    maturidade, alocacao, executivo = fontes()
+    blocos = [executivo.iloc[i:i + 70].copy() for i in range(0, len(executivo), 70)]
+    assert_iguais(completo(), gerar_estrutura_e_insights(cruzar_dados_em_blocos(maturidade, alocacao, blocos)))
+
+
+def test_blocos_alimentam_o_cubo_como_o_cruzamento_completo():
+    maturidade, alocacao, executivo = fontes()
+    cubo_completo = CuboMetricas()
+    cubo_completo.adicionar(cruzar_dados_completo(*fontes()))
+    blocos = [executivo.iloc[i:i + 70].copy() for i in range(0, len(executivo), 70)]
+    cubo_blocos = CuboMetricas()
+    for bloco in cruzar_dados_em_blocos(maturidade, alocacao, blocos):
+        cubo_blocos.adicionar(bloco)
+    assert set(cubo_blocos.celulas) == set(cubo_completo.celulas)
+    for chave, celula in cubo_completo.celulas.items():
+        esperado, obtido = celula.resumo(), cubo_blocos.celulas[chave].resumo()
+        assert obtido['linhas'] == esperado['linhas'] and obtido['throughput'] == esperado['throughput']
+        for metrica in ('lead_time', 'cycle_time', 'story_points'):
+            assert obtido[metrica]['contagem'] == esperado[metrica]['contagem']
+            assert obtido[metrica]['medio'] == pytest.approx(esperado[metrica]['medio'])
+
+
+def test_pre_agregado_igual_ao_cruzamento_completo():
+    maturidade, alocacao, executivo = fontes()
+    pessoas = preparar_pessoas_ativas(maturidade, alocacao)
+    assert_iguais(completo(), gerar_estrutura_e_insights_pre_agregado(pessoas, normalizar_chaves_executivo(executivo)))
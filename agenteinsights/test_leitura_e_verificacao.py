@@ -0,0 +1,50 @@
+"""
+Testes da detecção de alterações do Agente Insights
+==================================================
+detectar_alteracoes compara os dados atuais com o manifesto gravado e
+aponta linhas adicionadas, modificadas e removidas por fonte.
+"""
+
+import numpy as np
+import pandas as pd
+
+from agenteinsights.leitura_e_verificacao import detectar_alteracoes, salvar_manifesto, verificar_alteracoes
+
+
+def executivo(chaves, lead):
+    return pd.DataFrame({'PBI_Concuidos_Executivo[Key]': chaves, '[SumLead_Time]': lead})
+
+
+def test_sem_manifesto_tudo_e_adicionado(tmp_path):
+    alteracoes = detectar_alteracoes({'executivo': executivo([1, 2], [3.0, 4.0])}, str(tmp_path))
+    assert alteracoes['executivo']['alterado']
+    assert alteracoes['executivo']['adicionadas'].tolist() == [0, 1]
+
+
+def test_diferencas_do_manifesto(tmp_path):
+    diretorio = str(tmp_path)
+    anterior = {'executivo': executivo([1, 2, 3, 4], [10.0, 20.0, 30.0, 40.0]),
+                'maturidade': pd.DataFrame({'Tribo': ['A'], 'Ano': [2024], 'Quarter': ['Q1']})}
+    salvar_manifesto(anterior, diretorio)
+
+    inalterado = detectar_alteracoes(anterior, diretorio)
+    assert not any(info['alterado'] for info in inalterado.values())
+
+    # Chave 2 removida, chave 3 modificada, chave 5 adicionada e linhas reordenadas
+    atual = dict(anterior, executivo=executivo([4, 5, 3, 1], [40.0, 50.0, 31.0, 10.0]))
+    alteracoes = detectar_alteracoes(atual, diretorio)
+    info = alteracoes['executivo']
+    assert info['alterado'] and not alteracoes['maturidade']['alterado']
+    assert info['adicionadas'].tolist() == [1]
+    assert info['modificadas'].tolist() == [2]
+    assert info['removidas'].tolist() == [1]
+    assert verificar_alteracoes(anterior['maturidade'], pd.DataFrame({'a': [1]}), atual['executivo'], diretorio)
+
+
+def test_chaves_repetidas_pela_ordem(tmp_path):
+    diretorio = str(tmp_path)
+    salvar_manifesto({'executivo': executivo([7, 7], [1.0, 2.0])}, diretorio)
+    info = detectar_alteracoes({'executivo': executivo([7, 7, 7], [1.0, 2.5, 3.0])}, diretorio)['executivo']
+    assert info['modificadas'].tolist() == [1]
+    assert info['adicionadas'].tolist() == [2]
+    assert len(info['removidas']) == 0 and isinstance(info['removidas'], np.ndarray)
@@ -0,0 +1,47 @@
+"""
+Testes da agregação particionada do Agente Insights
+==================================================
+Os shards processados em um pool de processos, com as tabelas de valores
+enviadas pelo initializer, produzem a mesma saída de agregar_dataframe.
+"""
+
+import numpy as np
+import pandas as pd
+
+from agenteinsights.agregacao import COLUNA_PBI, agregar_dataframe
+from agenteinsights.particionamento import agregar_particionado
+
+
+def cruzado(n=3000, semente=13):
+    rng = np.random.default_rng(semente)
+    tribo = rng.integers(0, 6, n)
+    df = pd.DataFrame({
+        'Tribo': [f'T{t}' for t in tribo],
+        'squad': [f'S{s}' for s in tribo * 3 + rng.integers(0, 4, n)],
+        'person': [f'p{p}' for p in rng.integers(0, 400, n)],
+        COLUNA_PBI: rng.integers(0, 1500, n).astype(float),
+        '[SumLead_Time]': np.where(rng.random(n) < 0.1, np.nan, rng.integers(0, 60, n)),
+        '[SumCycle_Time]': rng.integers(0, 30, n).astype(float),
+        '[SumStory_Points]': rng.integers(0, 13, n).astype(float),
+    })
+    df.loc[rng.random(n) < 0.05, 'squad'] = None
+    df.loc[rng.random(n) < 0.05, COLUNA_PBI] = np.nan
+    return df
+
+
+def test_particionado_igual_a_um_processo():
+    df = cruzado()
+    esperado = agregar_dataframe(df)
+    obtido = agregar_particionado(df, processos=2, linhas_minimas=0)
+    for nivel in ('tribos', 'squads'):
+        assert list(obtido[0][nivel]) == list(esperado[0][nivel])
+        assert obtido[0][nivel] == esperado[0][nivel]
+    assert sorted(obtido[0]['pessoas']) == sorted(esperado[0]['pessoas'])
+    assert obtido[1] == esperado[1] and obtido[2] == esperado[2]
+
+
+def test_abaixo_do_limite_nao_particiona(monkeypatch):
+    import agenteinsights.particionamento as particionamento
+    monkeypatch.setattr(particionamento, '_publicar', None)
+    df = cruzado(200)
+    assert agregar_particionado(df, processos=2, linhas_minimas=201) == agregar_dataframe(df)
@@ -0,0 +1,43 @@
+"""
+Testes do esboço de quantis do Agente Insights
+=============================================
+Erro de posto de p50 e p95 dentro de `erro`, tanto alimentando um único
+esboço em blocos quanto mesclando esboços de blocos separados.
+"""
+
+import numpy as np
+import pytest
+
+from agenteinsights.quantis import EsbocoQuantis, mesclar_esbocos
+
+
+def erro_de_posto(ordenados, estimativa, percentil):
+    # Posto da estimativa: meio da faixa de valores iguais a ela
+    esquerda = np.searchsorted(ordenados, estimativa, side='left')
+    direita = np.searchsorted(ordenados, estimativa, side='right')
+    return abs((esquerda + direita) / 2 / len(ordenados) - percentil / 100)
+
+
+@pytest.mark.parametrize('erro, blocos', [(0.05, 20), (0.01, 200)])
+def test_erro_de_posto_em_fluxo_e_mescla(erro, blocos):
+    rng = np.random.default_rng(7)
+    valores = rng.lognormal(3, 1, 20000)
+    partes = np.array_split(valores, blocos)
+    fluxo = EsbocoQuantis(erro)
+    for parte in partes:
+        fluxo.adicionar(parte)
+    mesclado = mesclar_esbocos((EsbocoQuantis(erro).adicionar(parte) for parte in partes), erro)
+    ordenados = np.sort(valores)
+    for esboco in (fluxo, mesclado):
+        assert esboco.comprimido and len(esboco) < len(valores)
+        p50, p95 = esboco.percentis((50, 95))
+        assert erro_de_posto(ordenados, p50, 50) <= erro
+        assert erro_de_posto(ordenados, p95, 95) <= erro
+        assert esboco.media() == pytest.approx(valores.mean())
+
+
+def test_exato_sem_compressao():
+    valores = np.repeat(np.arange(10.0), 50)
+    esboco = EsbocoQuantis(0.05).adicionar(valores)
+    assert not esboco.comprimido
+    assert esboco.percentis() == pytest.approx(np.percentile(valores, [50, 75, 85, 95]))
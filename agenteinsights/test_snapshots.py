@@ -0,0 +1,53 @@
+"""
+Testes dos snapshots de dados do Agente Insights
+===============================================
+Ida e volta das fontes em Arrow IPC (com e sem compressão, como DataFrame ou
+pyarrow.Table), queda para pickle de colunas que o Arrow não representa e
+retenção dos snapshots mais antigos.
+"""
+
+import os
+
+import pandas as pd
+import pytest
+
+from agenteinsights.snapshots import listar_snapshots, ler_snapshot, salvar_snapshot
+
+pa = pytest.importorskip('pyarrow')
+
+
+def fontes():
+    return {
+        'maturidade': pd.DataFrame({'Tribo': ['Vendas', 'PIX', None], 'Ano': [2024, 2024, 2025],
+                                    'Nota': [3.5, 4.0, None]}),
+        'alocacao': pd.DataFrame({'person': ['a', 'b'], 'endDate': pd.to_datetime(['2024-01-31', None])}),
+    }
+
+
+@pytest.mark.parametrize('compressao', [None, 'zstd'])
+def test_ida_e_volta(tmp_path, compressao):
+    diretorio = str(tmp_path)
+    versao = salvar_snapshot(fontes(), diretorio, compressao=compressao)
+    assert listar_snapshots(diretorio) == [versao]
+    lidos = ler_snapshot(diretorio=diretorio)
+    for fonte, df in fontes().items():
+        pd.testing.assert_frame_equal(lidos[fonte], df, check_dtype=False)
+    tabelas = ler_snapshot(versao, ['alocacao'], diretorio, como_tabela=True)
+    assert list(tabelas) == ['alocacao'] and isinstance(tabelas['alocacao'], pa.Table)
+    assert tabelas['alocacao'].num_rows == 2
+
+
+def test_coluna_mista_gravada_em_pickle(tmp_path):
+    diretorio = str(tmp_path)
+    misto = pd.DataFrame({'valor': pd.Series([1, 'dois', 3.0], dtype=object)})
+    versao = salvar_snapshot({'executivo': misto}, diretorio)
+    assert os.path.exists(os.path.join(diretorio, versao, 'executivo.pkl'))
+    pd.testing.assert_frame_equal(ler_snapshot(diretorio=diretorio)['executivo'], misto)
+
+
+def test_retencao(tmp_path):
+    diretorio = str(tmp_path)
+    versoes = [salvar_snapshot(fontes(), diretorio, retencao=2) for _ in range(4)]
+    assert listar_snapshots(diretorio) == versoes[-2:]
+    assert not [nome for nome in os.listdir(diretorio) if nome.startswith('.tmp_')]
+    assert ler_snapshot(diretorio=str(tmp_path / 'vazio')) == {}
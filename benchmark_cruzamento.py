@@ -0,0 +1,117 @@
+"""
+Benchmark do cruzamento Pessoas x Executivo
+==========================================
+Compara o cruzamento completo (cruzar_pessoas_executivo, merge duplo por
+chave de tribo e de squad) com a junção pré-agregada (juncao.py) sobre dados
+sintéticos: quantidade de linhas materializadas, tempo e pico de memória
+(RSS) de cada estratégia, medidos em processos separados.
+
+Uso:
+    python benchmark_cruzamento.py [--pbis 4000] [--pessoas 300] [--tribos 4]
+"""
+
+import argparse
+import multiprocessing
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+
+def gerar_dados(n_pbis, n_pessoas, n_tribos, seed=42):
+    """Gera Maturidade, Alocação e Executivo sintéticos com chaves compatíveis"""
+    rng = np.random.default_rng(seed)
+    tribos = [f'Tribo {i}' for i in range(n_tribos)]
+    quarters = ['Q1', 'Q2', 'Q3', 'Q4']
+    maturidade = pd.DataFrame([{'Tribo': t, 'Ano': 2024, 'Quarter': q} for t in tribos for q in quarters])
+    ti = rng.integers(0, n_tribos, n_pessoas)
+    si = rng.integers(0, 3, n_pessoas)
+    alocacao = pd.DataFrame({
+        'person': [f'p{i}' for i in range(n_pessoas)],
+        'tribe': [tribos[t] for t in ti],
+        'tribeID': ti + 10,
+        'squad': [f'{tribos[t]} Squad {s}' for t, s in zip(ti, si)],
+        'squadID': (ti + 1) * 100 + si,
+        'endDate': None
+    })
+    ti = rng.integers(0, n_tribos, n_pbis)
+    si = rng.integers(0, 3, n_pbis)
+    q = rng.choice(quarters, n_pbis)
+    executivo = pd.DataFrame({
+        'PBI_Concuidos_Executivo[Chave_DataTribo]': [f'2024{a}{b}' for a, b in zip(q, ti + 10)],
+        'PBI_Concuidos_Executivo[Chave_DataSquad]': [f'2024{a}{b}' for a, b in zip(q, (ti + 1) * 100 + si)],
+        'PBI_Concuidos_Executivo[Key]': np.arange(n_pbis),
+        '[SumLead_Time]': rng.integers(1, 60, n_pbis).astype(float),
+        '[SumCycle_Time]': rng.integers(1, 30, n_pbis).astype(float),
+        '[SumStory_Points]': rng.integers(1, 13, n_pbis).astype(float)
+    })
+    return maturidade, alocacao, executivo
+
+
+def _pico_rss_mb():
+    try:
+        import resource
+    except ImportError:
+        return float('nan')
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta em KB, macOS em bytes
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def _executar(estrategia, args, fila):
+    from agenteinsights.analise_insights import (cruzar_pessoas_executivo, gerar_estrutura_e_insights,
+                                                 normalizar_chaves_executivo, preparar_pessoas_ativas)
+    from agenteinsights.juncao import cruzar_pre_agregado, gerar_estrutura_e_insights_pre_agregado
+
+    maturidade, alocacao, executivo = gerar_dados(args.pbis, args.pessoas, args.tribos)
+    pessoas = preparar_pessoas_ativas(maturidade, alocacao)
+    executivo = normalizar_chaves_executivo(executivo)
+    base_rss = _pico_rss_mb()
+    inicio = time.perf_counter()
+    if estrategia == 'completo':
+        df_cruzado = cruzar_pessoas_executivo(pessoas, executivo)
+        linhas = len(df_cruzado)
+        resultado = gerar_estrutura_e_insights(df_cruzado)
+    else:
+        linhas = sum(len(df) for df in cruzar_pre_agregado(pessoas, executivo).values())
+        resultado = gerar_estrutura_e_insights_pre_agregado(pessoas, executivo)
+    fila.put({
+        'estrategia': estrategia,
+        'linhas': linhas,
+        'segundos': time.perf_counter() - inicio,
+        'pico_rss_mb': _pico_rss_mb(),
+        'rss_base_mb': base_rss,
+        'insights_tribos': resultado[1]
+    })
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pbis', type=int, default=4000)
+    parser.add_argument('--pessoas', type=int, default=300)
+    parser.add_argument('--tribos', type=int, default=4)
+    args = parser.parse_args()
+
+    resultados = []
+    for estrategia in ('completo', 'pre_agregado'):
+        fila = multiprocessing.Queue()
+        processo = multiprocessing.Process(target=_executar, args=(estrategia, args, fila))
+        processo.start()
+        resultados.append(fila.get())
+        processo.join()
+
+    print(f"\nPBIs: {args.pbis} | Pessoas: {args.pessoas} | Tribos: {args.tribos}\n")
+    print(f"{'Estratégia':<14}{'Linhas':>14}{'Tempo (s)':>12}{'Pico RSS (MB)':>16}{'RSS base (MB)':>16}")
+    for r in resultados:
+        print(f"{r['estrategia']:<14}{r['linhas']:>14,}{r['segundos']:>12.2f}{r['pico_rss_mb']:>16.1f}{r['rss_base_mb']:>16.1f}")
+    iguais = all(
+        np.isclose(v, resultados[1]['insights_tribos'][tribo][chave])
+        for tribo, insight in resultados[0]['insights_tribos'].items()
+        for chave, v in insight.items()
+    )
+    print(f"\nInsights equivalentes: {'sim' if iguais else 'NÃO'}")
+
+
+if __name__ == '__main__':
+    main()
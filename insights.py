@@ -1,9 +1,9 @@
 """
 Agente Insights - Módulo Principal
 =================================
-Versão: 1.5.3
-Release: 7
-Data: 05/06/2025
+Versão: 1.6.0
+Release: 8
+Data: 17/10/2026
 
 Histórico:
 - 1.0.0 (Release 0): Versão inicial
@@ -14,6 +14,7 @@ Histórico:
 - 1.5.1 (Release 5): Corrigido merge de tribos usando nomes ao invés de IDs
 - 1.5.2 (Release 6): Melhorias na identificação de entidades e tratamento de NoneType
 - 1.5.3 (Release 7): Implementação de análises consultivas avançadas e validações robustas
+- 1.6.0 (Release 8): Abertura direta do armazém de análises quando as entradas não mudaram
 
 Descrição:
 Módulo principal que coordena o fluxo de execução do pipeline de análise.
@@ -40,6 +41,7 @@ from agenteinsights.analise_insights import (
     preparar_dados_consulta,
     extrair_metricas_ageis
 )
+from agenteinsights.armazem import carregar_analises
 from setup_env import configurar_ambiente
 
 def configurar_logging():
@@ -86,12 +88,16 @@ def validar_ambiente() -> bool:
         logging.error(f"Erro na validação do ambiente: {str(e)}")
         return False
 
-def main() -> int:
-    """Função principal com tratamento robusto de erros"""
+def main(recalcular: bool = False) -> int:
+    """
+    Função principal com tratamento robusto de erros.
+    Com recalcular=True (--recalcular na linha de comando), ignora o armazém de
+    análises e executa o pipeline completo.
+    """
     try:
         # Configurar logging
         configurar_logging()
-        logging.info("Iniciando Agente Insights v1.5.3")
+        logging.info("Iniciando Agente Insights v1.6.0")
         
         # Validar ambiente
         logging.info("Validando ambiente de execução...")
@@ -99,17 +105,21 @@ def main() -> int:
             logging.error("Falha na validação do ambiente")
             return 1
         
-        # Executar pipeline
-        logging.info("Iniciando execução do pipeline principal...")
-        analises = executar_pipeline()
+        # Reaproveitar análises persistidas ou executar pipeline
+        armazenadas = None if recalcular else carregar_analises()
+        if armazenadas:
+            analises, _ = armazenadas
+        else:
+            logging.info("Iniciando execução do pipeline principal...")
+            analises = executar_pipeline()
         
         if not analises:
             logging.error("Pipeline não gerou análises válidas")
             return 1
             
         # Resumo das análises
-        logging.info("Pipeline executado com sucesso!")
-        print("\n=== Agente Insights v1.5.3 ===")
+        logging.info("Análises carregadas do armazém" if armazenadas else "Pipeline executado com sucesso!")
+        print("\n=== Agente Insights v1.6.0 ===")
         print(f"Análises geradas: {len(analises)}")
         print("Tipos de análise:")
         for analise in analises:
@@ -129,4 +139,4 @@ def main() -> int:
         return 1
 
 if __name__ == "__main__":
-    sys.exit(main())
\ No newline at end of file
+    sys.exit(main(recalcular='--recalcular' in sys.argv[1:]))
\ No newline at end of file